@@ -13,8 +13,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Now we can import our app modules
 from app.core.config import settings
 from app.models.base import (
-    Base, User, UserProject, Report, 
-    Comment, Attachment, Mention
+    Base, User, UserProject, Report, ReportRevision, CompressionDictionary,
+    Comment, Attachment, Mention, DailyActivity
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,53 @@
+"""compressed report bodies
+
+Revision ID: b81c4e2a9d07
+Revises: 578f67d5d3fc
+Create Date: 2026-10-19 09:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81c4e2a9d07'
+down_revision = '578f67d5d3fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('compression_dictionaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_compression_dictionaries_id'), 'compression_dictionaries', ['id'], unique=False)
+
+    # Batch mode rebuilds the table on SQLite, which can't alter columns
+    # or add constraints in place
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.alter_column('content', existing_type=sa.String(), nullable=True)
+        batch_op.add_column(sa.Column('content_compressed', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('content_dict_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=300), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_reports_content_dict_id', 'compression_dictionaries',
+            ['content_dict_id'], ['id']
+        )
+
+    # Existing bodies stay uncompressed until app.scripts.compress_reports runs
+    op.execute("UPDATE reports SET excerpt = substr(content, 1, 300)")
+
+
+def downgrade() -> None:
+    # Compressed bodies must be decompressed first (compress_reports --decompress)
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_constraint('fk_reports_content_dict_id', type_='foreignkey')
+        batch_op.drop_column('excerpt')
+        batch_op.drop_column('content_dict_id')
+        batch_op.drop_column('content_compressed')
+        batch_op.alter_column('content', existing_type=sa.String(), nullable=False)
+    op.drop_index(op.f('ix_compression_dictionaries_id'), table_name='compression_dictionaries')
+    op.drop_table('compression_dictionaries')
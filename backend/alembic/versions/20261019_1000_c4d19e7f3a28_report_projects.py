@@ -0,0 +1,29 @@
+"""report projects
+
+Revision ID: c4d19e7f3a28
+Revises: b81c4e2a9d07
+Create Date: 2026-10-19 10:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d19e7f3a28'
+down_revision = 'b81c4e2a9d07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('project', sa.String(), nullable=True))
+    op.create_index('ix_reports_project_created_at', 'reports', ['project', 'created_at'], unique=False)
+    # Membership lookups for the visibility predicate
+    op.create_index('ix_user_projects_user_id_project', 'user_projects', ['user_id', 'project'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_projects_user_id_project', table_name='user_projects')
+    op.drop_index('ix_reports_project_created_at', table_name='reports')
+    op.drop_column('reports', 'project')
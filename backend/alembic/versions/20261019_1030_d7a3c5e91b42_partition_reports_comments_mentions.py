@@ -0,0 +1,135 @@
+"""partition reports, comments and mentions by month
+
+Revision ID: d7a3c5e91b42
+Revises: c4d19e7f3a28
+Create Date: 2026-10-19 10:30:00.000000+00:00
+
+PostgreSQL only: the tables are rebuilt as range-partitioned tables on
+created_at, one partition per month. A partitioned table's primary key must
+include the partition key, so the keys become (id, created_at) and foreign
+keys *into* these tables (attachments, report_revisions, comment parents,
+mentions), which reference id alone, are dropped here; f1b7d3c9a842
+declares them again on (id, created_at). Other databases keep plain tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.core.partitions import PARTITIONED_TABLES, ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3c5e91b42'
+down_revision = 'c4d19e7f3a28'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    'reports': [
+        ('ix_reports_id', ['id']),
+        ('ix_reports_project_created_at', ['project', 'created_at']),
+    ],
+    'comments': [
+        ('ix_comments_id', ['id']),
+        ('ix_comments_report_id_created_at', ['report_id', 'created_at']),
+    ],
+    'mentions': [
+        ('ix_mentions_id', ['id']),
+        ('ix_mentions_user_id_created_at', ['user_id', 'created_at']),
+    ],
+}
+
+# Outgoing foreign keys, which partitioned tables support
+FOREIGN_KEYS = {
+    'reports': [
+        ('reports_user_id_fkey', 'user_id', 'users', 'CASCADE'),
+        ('fk_reports_content_dict_id', 'content_dict_id', 'compression_dictionaries', None),
+    ],
+    'comments': [('comments_user_id_fkey', 'user_id', 'users', 'CASCADE')],
+    'mentions': [('mentions_user_id_fkey', 'user_id', 'users', 'CASCADE')],
+}
+
+# Foreign keys into the partitioned tables, restored on downgrade
+INCOMING_FOREIGN_KEYS = [
+    ('attachments', 'attachments_report_id_fkey', 'report_id', 'reports'),
+    ('report_revisions', 'report_revisions_report_id_fkey', 'report_id', 'reports'),
+    ('comments', 'comments_report_id_fkey', 'report_id', 'reports'),
+    ('comments', 'comments_parent_id_fkey', 'parent_id', 'comments'),
+    ('mentions', 'mentions_report_id_fkey', 'report_id', 'reports'),
+    ('mentions', 'mentions_comment_id_fkey', 'comment_id', 'comments'),
+]
+
+
+def _add_indexes_and_keys(table: str) -> None:
+    for name, columns in INDEXES[table]:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.create_index(name, table, columns, unique=False)
+    for name, column, target, ondelete in FOREIGN_KEYS[table]:
+        op.create_foreign_key(name, table, target, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    # created_at becomes the partition key and must be set. A report's
+    # comments must not predate it, or pruned comment reads would miss them.
+    op.execute(
+        "UPDATE reports SET created_at = coalesce("
+        "least(updated_at, (SELECT min(c.created_at) FROM comments c WHERE c.report_id = reports.id)), now()"
+        ") WHERE created_at IS NULL"
+    )
+    op.execute("UPDATE comments SET created_at = coalesce(updated_at, now()) WHERE created_at IS NULL")
+    op.execute("UPDATE mentions SET created_at = now() WHERE created_at IS NULL")
+
+    first = None
+    for table in PARTITIONED_TABLES:
+        oldest = conn.execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+        if oldest is not None and (first is None or oldest < first):
+            first = oldest
+
+    for table in PARTITIONED_TABLES:
+        legacy = f"{table}_unpartitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        # Also drops the foreign keys that point at the old table
+        op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {table}_pkey CASCADE")
+        for name, column, target, ondelete in FOREIGN_KEYS[table]:
+            op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {name}")
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+        sequence = conn.execute(sa.text(f"SELECT pg_get_serial_sequence('{legacy}', 'id')")).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        _add_indexes_and_keys(table)
+
+    ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD, since=first.date() if first else None)
+
+    for table in PARTITIONED_TABLES:
+        legacy = f"{table}_unpartitioned"
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy} CASCADE")
+    op.execute("DROP INDEX IF EXISTS ix_reports_title")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    for table in PARTITIONED_TABLES:
+        flat = f"{table}_flat"
+        op.execute(f"CREATE TABLE {flat} (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {flat} SELECT * FROM {table}")
+        sequence = conn.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {flat}.id")
+        op.execute(f"DROP TABLE {table} CASCADE")
+        op.execute(f"ALTER TABLE {flat} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        _add_indexes_and_keys(table)
+
+    for table, name, column, target in INCOMING_FOREIGN_KEYS:
+        op.create_foreign_key(name, table, target, [column], ['id'], ondelete='CASCADE')
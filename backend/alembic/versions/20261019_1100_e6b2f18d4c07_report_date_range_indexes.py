@@ -0,0 +1,29 @@
+"""report date range indexes
+
+Revision ID: e6b2f18d4c07
+Revises: d7a3c5e91b42
+Create Date: 2026-10-19 11:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b2f18d4c07'
+down_revision = 'd7a3c5e91b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reports_user_id_created_at', 'reports', ['user_id', 'created_at'], unique=False)
+    op.create_index(
+        'ix_reports_created_at_brin', 'reports', ['created_at'], unique=False,
+        postgresql_using='brin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_created_at_brin', table_name='reports')
+    op.drop_index('ix_reports_user_id_created_at', table_name='reports')
@@ -0,0 +1,40 @@
+"""activity rollups
+
+Revision ID: f3a8d2b6e915
+Revises: e6b2f18d4c07
+Create Date: 2026-10-19 11:30:00.000000+00:00
+
+Populate with: python -m app.scripts.rebuild_rollups
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d2b6e915'
+down_revision = 'e6b2f18d4c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('activity_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('project', sa.String(), nullable=False),
+        sa.Column('reports', sa.Integer(), nullable=False),
+        sa.Column('comments', sa.Integer(), nullable=False),
+        sa.Column('mentions', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'user_id', 'project', name='uq_activity_daily_day_user_project')
+    )
+    op.create_index(op.f('ix_activity_daily_id'), 'activity_daily', ['id'], unique=False)
+    op.create_index('ix_activity_daily_project_day', 'activity_daily', ['project', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_daily_project_day', table_name='activity_daily')
+    op.drop_index(op.f('ix_activity_daily_id'), table_name='activity_daily')
+    op.drop_table('activity_daily')
@@ -0,0 +1,61 @@
+"""report counters
+
+Revision ID: a9e4c7b2d583
+Revises: f3a8d2b6e915
+Create Date: 2026-10-19 12:00:00.000000+00:00
+
+Existing reports are backfilled here; afterwards the counters can be
+checked and fixed with: python -m app.scripts.repair_report_counters
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e4c7b2d583'
+down_revision = 'f3a8d2b6e915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Batch mode rebuilds the table on SQLite, which can't add a column
+    # with a CURRENT_TIMESTAMP default or make one NOT NULL in place
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('attachment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_activity_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+
+    # GREATEST skips NULLs; SQLite's max() returns NULL if any argument is,
+    # so its arguments fall back to created_at
+    if op.get_bind().dialect.name == 'postgresql':
+        greatest, fallback = "GREATEST", "{}"
+    else:
+        greatest, fallback = "max", "coalesce({}, reports.created_at)"
+    activity = [
+        "reports.updated_at",
+        "(SELECT max(created_at) FROM comments WHERE comments.report_id = reports.id)",
+        "(SELECT max(created_at) FROM attachments WHERE attachments.report_id = reports.id)",
+    ]
+    op.execute(f"""
+        UPDATE reports SET
+            comment_count = (SELECT count(*) FROM comments WHERE comments.report_id = reports.id),
+            attachment_count = (SELECT count(*) FROM attachments WHERE attachments.report_id = reports.id),
+            last_activity_at = {greatest}(
+                coalesce(reports.created_at, CURRENT_TIMESTAMP),
+                {", ".join(fallback.format(expression) for expression in activity)}
+            )
+    """)
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.alter_column('last_activity_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+    op.create_index('ix_reports_user_id_last_activity_at', 'reports', ['user_id', 'last_activity_at'], unique=False)
+    op.create_index('ix_reports_project_last_activity_at', 'reports', ['project', 'last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_project_last_activity_at', table_name='reports')
+    op.drop_index('ix_reports_user_id_last_activity_at', table_name='reports')
+    op.drop_column('reports', 'last_activity_at')
+    op.drop_column('reports', 'attachment_count')
+    op.drop_column('reports', 'comment_count')
@@ -0,0 +1,39 @@
+"""user suggest indexes
+
+Revision ID: b5d81f6c2e47
+Revises: a9e4c7b2d583
+Create Date: 2026-10-19 12:30:00.000000+00:00
+
+Trigram indexes for the database fallback of GET /api/users/suggest
+(PostgreSQL only).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d81f6c2e47'
+down_revision = 'a9e4c7b2d583'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_username_trgm', 'users', [sa.text('lower(username) gin_trgm_ops')],
+        unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_users_full_name_trgm', 'users', [sa.text('lower(full_name) gin_trgm_ops')],
+        unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_full_name_trgm', table_name='users')
+    op.drop_index('ix_users_username_trgm', table_name='users')
@@ -0,0 +1,30 @@
+"""report title trigram index
+
+Revision ID: c7f29a4e1d06
+Revises: b5d81f6c2e47
+Create Date: 2026-10-19 13:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f29a4e1d06'
+down_revision = 'b5d81f6c2e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A trigram index on PostgreSQL, a plain one elsewhere
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_reports_title_trgm', 'reports', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_title_trgm', table_name='reports')
@@ -0,0 +1,31 @@
+"""search queue
+
+Revision ID: d3a6b8e52f19
+Revises: c7f29a4e1d06
+Create Date: 2026-10-19 13:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a6b8e52f19'
+down_revision = 'c7f29a4e1d06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The embedded index itself is built by the indexer on first start
+    # (or app.scripts.rebuild_search_index), not here
+    op.create_table('search_queue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('queued_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('search_queue')
@@ -0,0 +1,51 @@
+"""upload sessions
+
+Revision ID: e8c2f5a7b931
+Revises: d3a6b8e52f19
+Create Date: 2026-10-19 14:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c2f5a7b931'
+down_revision = 'd3a6b8e52f19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # No foreign key into the partitioned reports table, which would need
+    # the report's created_at as well; completing an upload checks that the
+    # report still exists, and expiry clears sessions left behind
+    op.create_table('upload_sessions',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=16), server_default='open', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_sessions_expires_at'), 'upload_sessions', ['expires_at'], unique=False)
+    op.create_table('upload_chunks',
+        sa.Column('session_id', sa.String(length=32), nullable=False),
+        sa.Column('index', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('session_id', 'index')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('upload_chunks')
+    op.drop_index(op.f('ix_upload_sessions_expires_at'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,105 @@
+"""foreign keys into the partitioned tables, default partitions
+
+Revision ID: f1b7d3c9a842
+Revises: e8c2f5a7b931
+Create Date: 2026-10-19 14:30:00.000000+00:00
+
+The created_at columns are added everywhere, to match the models; the rest
+is PostgreSQL only (13 or later, for row triggers on partitioned tables). A
+foreign key into a partitioned table has to cover its whole primary key,
+(id, created_at), so each referencing table now carries the referenced
+row's created_at alongside its id. A BEFORE INSERT/UPDATE trigger fills it
+in, so inserts only need the id, as before. Rows left behind by deletes
+while the keys were missing are removed first.
+
+Each partitioned table also gets a DEFAULT partition, so inserts outside
+the months ensure_partitions has created still succeed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.partitions import PARTITIONED_TABLES, default_partition_name
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7d3c9a842'
+down_revision = 'e8c2f5a7b931'
+branch_labels = None
+depends_on = None
+
+
+# (table, constraint, id column, created_at column, referenced table), in
+# dependency order: comments before the mentions that point at them
+FOREIGN_KEYS = [
+    ('attachments', 'attachments_report_id_fkey', 'report_id', 'report_created_at', 'reports'),
+    ('report_revisions', 'report_revisions_report_id_fkey', 'report_id', 'report_created_at', 'reports'),
+    ('comments', 'comments_report_id_fkey', 'report_id', 'report_created_at', 'reports'),
+    ('comments', 'comments_parent_id_fkey', 'parent_id', 'parent_created_at', 'comments'),
+    ('mentions', 'mentions_report_id_fkey', 'report_id', 'report_created_at', 'reports'),
+    ('mentions', 'mentions_comment_id_fkey', 'comment_id', 'comment_created_at', 'comments'),
+]
+
+
+def _function_name(table: str, column: str) -> str:
+    return f"{table}_set_{column}"
+
+
+def upgrade() -> None:
+    for table, name, column, created_column, target in FOREIGN_KEYS:
+        op.add_column(table, sa.Column(created_column, sa.DateTime(timezone=True), nullable=True))
+
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT")
+
+    for table, name, column, created_column, target in FOREIGN_KEYS:
+        op.execute(
+            f"UPDATE {table} t SET {created_column} = r.created_at FROM {target} r "
+            f"WHERE r.id = t.{column}"
+        )
+        op.execute(f"DELETE FROM {table} WHERE {column} IS NOT NULL AND {created_column} IS NULL")
+        op.create_foreign_key(
+            name, table, target, [column, created_column], ['id', 'created_at'],
+            ondelete='CASCADE', onupdate='CASCADE'
+        )
+        function = _function_name(table, created_column)
+        op.execute(f"""
+            CREATE FUNCTION {function}() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.{column} IS NULL THEN
+                    NEW.{created_column} := NULL;
+                ELSE
+                    SELECT created_at INTO NEW.{created_column} FROM {target} WHERE id = NEW.{column};
+                    IF NOT FOUND THEN
+                        RAISE EXCEPTION 'insert or update on table "{table}" violates foreign key constraint "{name}"'
+                            USING ERRCODE = 'foreign_key_violation',
+                                  DETAIL = format('Key ({column})=(%s) is not present in table "{target}".', NEW.{column});
+                    END IF;
+                END IF;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(
+            f"CREATE TRIGGER {function} BEFORE INSERT OR UPDATE OF {column} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        for table, name, column, created_column, target in reversed(FOREIGN_KEYS):
+            function = _function_name(table, created_column)
+            op.execute(f"DROP TRIGGER IF EXISTS {function} ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+            op.drop_constraint(name, table, type_='foreignkey')
+        # Detached rather than dropped: rows that landed there are kept as a plain table
+        for table in PARTITIONED_TABLES:
+            op.execute(f"ALTER TABLE {table} DETACH PARTITION {default_partition_name(table)}")
+
+    for table, name, column, created_column, target in reversed(FOREIGN_KEYS):
+        op.drop_column(table, created_column)
@@ -0,0 +1,28 @@
+"""upload chunk claims
+
+Revision ID: a4c8e2f6b913
+Revises: f1b7d3c9a842
+Create Date: 2026-10-19 15:00:00.000000+00:00
+
+Chunk rows are now inserted before their bytes are written, with
+claimed_at set until the write is verified. Existing rows are stored
+chunks, so the column starts out NULL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e2f6b913'
+down_revision = 'f1b7d3c9a842'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('upload_chunks', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM upload_chunks WHERE claimed_at IS NOT NULL")
+    op.drop_column('upload_chunks', 'claimed_at')
@@ -4,7 +4,7 @@ from typing import List, Any, Optional
 from sqlalchemy import desc
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
-from app.core.storage import save_upload_file, delete_upload_file
+from app.core.storage import save_upload_file, deletion_queue
 from app.models.base import User, Report, Attachment  # Updated imports
 from app.schemas.report import (
     ReportCreate,
@@ -164,11 +164,18 @@ def delete_report(
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     # First delete all attachments
+    file_paths = [
+        row.file_path
+        for row in db.query(Attachment.file_path).filter(Attachment.report_id == report_id)
+    ]
     db.query(Attachment).filter(Attachment.report_id == report_id).delete()
     
     # Then delete the report
     db.delete(report)
     db.commit()
+
+    # Remove the files in the background
+    deletion_queue.enqueue(file_paths)
     
     return {"status": "success", "message": "Report deleted successfully"}
 
@@ -194,12 +201,12 @@ def delete_attachment(
     if not current_user.is_superuser and attachment.report.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Delete the file
-    delete_upload_file(attachment.file_path)
-    
     # Delete the database record
     db.delete(attachment)
     db.commit()
+
+    # Delete the file
+    deletion_queue.enqueue([attachment.file_path])
     
     return {"status": "success", "message": "Attachment deleted"}
 
@@ -214,7 +221,7 @@ async def upload_inline_image(
         raise HTTPException(status_code=400, detail="File must be an image")
     
     # Save the file
-    file_path = save_upload_file(file)
+    file_path = save_upload_file(file, "inline")
     
     # Return the URL that can be used in markdown
     file_url = f"{settings.API_URL}/uploads/{file_path}"
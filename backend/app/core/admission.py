@@ -0,0 +1,309 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from ipaddress import ip_address, ip_network
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.auth import decode_access_token
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    priority: int  # lower is served first when requests queue for the shared pool
+    concurrency: int  # requests of this class in flight at once
+    queue: int  # requests of this class allowed to wait for a slot
+    rate: float  # sustained requests per second per user (token refill rate)
+    burst: int  # token bucket size
+
+
+# Interactive reads first; bcrypt, uploads and unindexed scans last
+ROUTE_CLASSES: Dict[str, RouteClass] = {
+    "read": RouteClass(priority=0, concurrency=48, queue=200, rate=20, burst=60),
+    "write": RouteClass(priority=1, concurrency=16, queue=100, rate=5, burst=20),
+    "auth": RouteClass(priority=2, concurrency=4, queue=20, rate=0.5, burst=10),
+    "search": RouteClass(priority=3, concurrency=4, queue=20, rate=1, burst=5),
+    "upload": RouteClass(priority=3, concurrency=4, queue=10, rate=0.5, burst=5),
+    # Resumable upload chunks: many per file, sent a few at a time by one client
+    "chunk": RouteClass(priority=3, concurrency=8, queue=32, rate=10, burst=30),
+}
+
+SEARCH_PATHS = ("/api/reports/export", "/api/stats/activity")
+EXEMPT_PREFIXES = ("/api/system/",)  # Metrics must stay reachable under load
+
+
+def classify(method: str, path: str, query_string: bytes) -> Optional[str]:
+    """The route class of a request, or None for requests admitted unconditionally."""
+    path = path.rstrip("/")
+    if path.startswith(EXEMPT_PREFIXES) or path.endswith("/stream"):
+        return None  # Long-lived streams hold no worker or connection
+    if method in ("GET", "HEAD"):
+        if path in SEARCH_PATHS:
+            return "search"
+        if path == "/api/reports" and parse_qs(query_string.decode("latin-1")).get("search"):
+            return "search"
+        return "read"
+    if method == "POST" and path == "/api/reports/batch":
+        return "read"
+    if method == "POST" and path.startswith("/api/auth/"):
+        return "auth"
+    if method == "POST" and (path == "/api/reports/upload-inline" or path.endswith("/attachments")):
+        return "upload"
+    if path.startswith("/api/uploads"):
+        if method == "PUT" and "/chunks/" in path:
+            return "chunk"
+        if method == "POST":
+            return "upload"  # Starting and completing (which hashes the whole file)
+    if method == "OPTIONS":
+        return None
+    return "write"
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class Limiter:
+    """A concurrency limit with a bounded priority queue of waiters.
+
+    Runs on the event loop only. A released slot is handed straight to the
+    best waiting request (lowest priority value, then arrival order), so
+    queued requests are never overtaken by newcomers.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.queue_full = 0
+        self.timed_out = 0
+        self.peak_queued = 0
+        self.avg_seconds = 0.0  # moving average of time holding a slot
+
+    def retry_after(self) -> float:
+        return self.avg_seconds * (self.queued + 1) / max(self.limit, 1)
+
+    async def acquire(self, priority: int, timeout: float) -> None:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return
+        if self.queued >= self.max_queue:
+            self.queue_full += 1
+            raise Overloaded(503, f"Too many {self.name} requests queued", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Woken as the timeout fired; pass the slot on
+            self.timed_out += 1
+            raise Overloaded(503, f"Timed out waiting for a {self.name} slot", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            self.queued -= 1
+        self.admitted += 1
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        if held_seconds is not None:
+            self.avg_seconds += (held_seconds - self.avg_seconds) * 0.1
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # The slot moves to the waiter
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.queue_full,
+            "rejected_timeout": self.timed_out,
+            "avg_ms": round(self.avg_seconds * 1000, 1),
+        }
+
+
+class TokenBuckets:
+    """Per-key token buckets, least recently used keys forgotten first."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 50000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.limited = 0
+
+    def take(self, key: str) -> float:
+        """Take a token for ``key``; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None) or [float(self.burst), now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        self._buckets[key] = bucket
+        bucket[1] = now
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+
+class AdmissionController:
+    """Per-route-class admission control and per-user rate limiting.
+
+    A request is first charged to its user's token bucket for its class
+    (429 when empty), then needs a slot in its class's limiter and in the
+    pool shared by all classes, where queued requests are served by class
+    priority. When a queue is full or the wait exceeds ``queue_timeout``
+    it fails fast with 503. Both carry Retry-After. Limits are per worker
+    process.
+    """
+
+    def __init__(self, classes: Dict[str, RouteClass], max_concurrency: int, queue_timeout: float):
+        self.classes = classes
+        self.queue_timeout = queue_timeout
+        self.shared = Limiter("shared", max_concurrency, sum(c.queue for c in classes.values()))
+        self.limiters = {name: Limiter(name, c.concurrency, c.queue) for name, c in classes.items()}
+        self.buckets = {name: TokenBuckets(c.rate, c.burst) for name, c in classes.items()}
+
+    async def admit(self, route_class: str, key: str) -> None:
+        wait = self.buckets[route_class].take(key)
+        if wait:
+            raise Overloaded(429, "Rate limit exceeded", wait)
+        priority = self.classes[route_class].priority
+        limiter = self.limiters[route_class]
+        await limiter.acquire(priority, self.queue_timeout)
+        try:
+            await self.shared.acquire(priority, self.queue_timeout)
+        except BaseException:
+            limiter.release()
+            raise
+
+    def release(self, route_class: str, held_seconds: float) -> None:
+        self.shared.release(held_seconds)
+        self.limiters[route_class].release(held_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "shared": self.shared.stats(),
+            "classes": {
+                name: {**limiter.stats(), "rate_limited": self.buckets[name].limited}
+                for name, limiter in self.limiters.items()
+            },
+        }
+
+
+def _configured_classes() -> Dict[str, RouteClass]:
+    classes = dict(ROUTE_CLASSES)
+    for name, overrides in settings.ADMISSION_LIMITS.items():
+        classes[name] = replace(classes[name], **overrides)
+    return classes
+
+
+admission = AdmissionController(
+    _configured_classes(), settings.ADMISSION_MAX_CONCURRENCY, settings.ADMISSION_QUEUE_TIMEOUT
+)
+
+
+_trusted_proxies = [ip_network(proxy, strict=False) for proxy in settings.ADMISSION_TRUSTED_PROXIES]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_address(scope: Scope) -> str:
+    """The peer's address, or behind ADMISSION_TRUSTED_PROXIES the client's from X-Forwarded-For.
+
+    Hops are read right to left, past trusted proxies; the first one that
+    isn't is the client. Anything further left was written by the client
+    and can't be believed.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not _is_trusted_proxy(address):
+        return address
+    forwarded = ",".join(Headers(scope=scope).getlist("x-forwarded-for"))
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        address = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return address
+
+
+def client_key(scope: Scope) -> str:
+    """The authenticated user id if the request carries a valid token, else the client address."""
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_access_token(token)}"
+        except HTTPException:
+            pass
+    return f"ip:{client_address(scope)}"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope["method"], scope["path"], scope.get("query_string", b""))
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.admit(route_class, client_key(scope))
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": e.detail}, status_code=e.status_code, headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class, time.monotonic() - started)
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.base import User
+from app.crud import auth as auth_crud
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -43,10 +44,8 @@ def create_access_token(*, user_id: int, expires_delta: timedelta | None = None)
     )
     return encoded_jwt
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def decode_access_token(token: str) -> int:
+    """Return the user id in an access token, or raise 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -61,13 +60,23 @@ async def get_current_user(
         user_id = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-        user_id = int(user_id)  # Convert to int
+        return int(user_id)  # Convert to int
     except (JWTError, ValueError):
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+async def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    user_id = decode_access_token(token)
+    user = auth_crud.get_user(db, user_id)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db.info["user_id"] = user.id  # Read-your-writes tracking (app.core.replicas)
     return user
 
 async def get_current_active_user(
@@ -76,3 +85,10 @@ async def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+async def get_current_active_superuser(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
@@ -0,0 +1,242 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Hashable, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    """Interface for response cache storage backends."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter and return the new value."""
+
+    @abstractmethod
+    def get_int(self, key: str) -> int:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU bounded by entry count and total value size.
+
+    Counters are an LRU of ``max_entries`` too. An evicted counter reads as
+    the highest value evicted so far, the floor, so a counter never goes
+    backwards: one that was evicted and is read again may only have moved
+    forward (its resource's entries are retired early, never served stale).
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items: "OrderedDict[Hashable, tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._counters: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._counter_floor = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[1] is not None and item[1] < time.monotonic():
+                self._remove(key)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: bytes, ttl: Optional[int] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._remove(key)
+            self._items[key] = (value, expires_at)
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes or len(self._items) > self.max_entries:
+                oldest = next(iter(self._items))
+                self._remove(oldest)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def incr(self, key: Hashable) -> int:
+        with self._lock:
+            value = self._counters.pop(key, self._counter_floor) + 1
+            self._counters[key] = value
+            while len(self._counters) > self.max_entries:
+                _, evicted = self._counters.popitem(last=False)
+                self._counter_floor = max(self._counter_floor, evicted)
+            return value
+
+    def get_int(self, key: Hashable) -> int:
+        with self._lock:
+            value = self._counters.get(key)
+            if value is None:
+                return self._counter_floor
+            self._counters.move_to_end(key)
+            return value
+
+    def _remove(self, key: Hashable) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.current_bytes -= len(item[0])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._items),
+                "counters": len(self._counters),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class RedisCache(CacheBackend):
+    """Shared cache backend for multi-worker deployments (requires `redis`)."""
+
+    def __init__(self, url: str, prefix: str = "report-sys:"):
+        import redis  # Optional dependency, only needed for the shared backend
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self._client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(self.prefix + "gen:" + key)
+
+    def get_int(self, key: str) -> int:
+        value = self._client.get(self.prefix + "gen:" + key)
+        return int(value) if value else 0
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+@dataclass
+class CachedResponse:
+    """A serialized response plus what is needed to authorize and revalidate it.
+
+    ``etag`` is empty for responses that carry no validator; ``project`` is
+    the report's project, if any.
+    """
+    owner_id: int
+    etag: str
+    body: bytes
+    project: Optional[str] = None
+
+    def dumps(self) -> bytes:
+        return f"{self.owner_id}\n{self.project or ''}\n{self.etag}\n".encode() + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        owner_id, project, etag, body = data.split(b"\n", 3)
+        return cls(owner_id=int(owner_id), etag=etag.decode(), body=body, project=project.decode() or None)
+
+
+class ResponseCache:
+    """Cache of serialized responses grouped by resource.
+
+    Each resource (e.g. ``report:42``) has a generation counter that is part
+    of every key stored for it; invalidating the resource bumps the
+    generation, which atomically retires every cached variant (detail,
+    comment pages) without having to enumerate them. Permission checks are
+    not cached: callers authorize each hit against ``CachedResponse.owner_id``
+    and ``CachedResponse.project``.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, resource: str) -> int:
+        return self.backend.get_int(resource)
+
+    def key(self, resource: str, variant: str = "", generation: Optional[int] = None) -> str:
+        if generation is None:
+            generation = self.generation(resource)
+        return f"{resource}:{generation}:{variant}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        data = self.backend.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse.loads(data)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        self.backend.set(key, entry.dumps(), ttl=self.ttl)
+
+    def invalidate(self, resource: str) -> None:
+        self.backend.incr(resource)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+def _create_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCache(settings.RESPONSE_CACHE_URL)
+    return MemoryCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    )
+
+
+response_cache = ResponseCache(_create_backend(), ttl=settings.RESPONSE_CACHE_TTL)
+
+
+def report_resource(report_id: int) -> str:
+    return f"report:{report_id}"
+
+
+def comments_resource(report_id: int) -> str:
+    return f"comments:{report_id}"
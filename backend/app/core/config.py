@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Optional
 import os
 from datetime import timedelta
 
@@ -16,11 +16,117 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "report_system")
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SCHEMA_CHECK: str = "error"  # at startup, if migrations are not applied: "error", "warn" or "off"
+    DB_POOL_SIZE: int = 5  # per worker process
+    DB_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: int = 100  # the database's connection budget for all workers
+    DB_PREPARE_THRESHOLD: Optional[int] = 5  # psycopg 3 only; None disables (e.g. behind PgBouncer)
+
+    # Read replicas for GET requests, e.g. '["postgresql://...@replica1/report_system"]'
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind get no reads
+    REPLICA_CHECK_INTERVAL: float = 2.0  # seconds between health and lag checks
+    REPLICA_PIN_SECONDS: int = 10  # reads stay on the primary this long after a user's write
 
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_CONTENT_LENGTH: int = 16 * 1024 * 1024  # 16MB
 
+    # Resumable attachment uploads (app.routers.uploads)
+    UPLOAD_PARTIAL_DIR: str = "uploads_partial"  # unfinished uploads; same filesystem as UPLOAD_DIR
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # offered to clients that don't choose
+    UPLOAD_MAX_CHUNK_SIZE: int = 64 * 1024 * 1024
+    UPLOAD_MAX_SIZE: int = 2 * 1024 * 1024 * 1024  # 2GB per file
+    UPLOAD_SESSION_TTL: int = 24 * 3600  # seconds an upload may sit idle before it is discarded
+    UPLOAD_CHUNK_CLAIM_TIMEOUT: int = 600  # seconds before a chunk write that never finished may be retried
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_BYTES: int = 32 * 1024 * 1024  # 32MB of precompressed bodies
+
+    # HTTP caching (ETag revalidation)
+    HTTP_CACHE_MAX_AGE: int = 0
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 60
+
+    # Server-side response cache
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" or "redis"
+    RESPONSE_CACHE_URL: Optional[str] = None  # e.g. redis://localhost:6379/0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB
+    RESPONSE_CACHE_TTL: int = 3600  # seconds
+
+    # Server-side markdown rendering
+    MARKDOWN_RENDER_WORKERS: int = 2  # 0 disables prerendering at write time
+
+    # Report revision history
+    REVISION_MAX_DELTA_CHAIN: int = 20  # deltas between full snapshots
+
+    # Compressed storage of large report bodies (requires zstandard)
+    REPORT_COMPRESSION_ENABLED: bool = False
+    REPORT_COMPRESSION_THRESHOLD: int = 16 * 1024  # characters
+    REPORT_COMPRESSION_LEVEL: int = 10
+    REPORT_COMPRESSION_DICT_SIZE: int = 112 * 1024  # bytes
+    REPORT_COMPRESSION_MIN_TRAINING_SAMPLES: int = 50
+    REPORT_COMPRESSION_DICT_REFRESH_SECONDS: int = 300  # how often workers look for a newer dictionary
+
+    # Live comment streams (SSE / WebSocket)
+    LIVE_QUEUE_SIZE: int = 100  # events buffered per subscriber before it is dropped
+    LIVE_REPLAY_EVENTS: int = 200  # recent events kept per report for Last-Event-ID resume
+    LIVE_HEARTBEAT_SECONDS: int = 15
+
+    # Monthly partitions of reports/comments/mentions (PostgreSQL)
+    PARTITION_MONTHS_AHEAD: int = 3  # future partitions kept ready
+    PARTITION_RETENTION_MONTHS: int = 0  # detach older partitions; 0 keeps everything
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+
+    # Admission control and load shedding (per worker process)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 64  # requests in flight across all route classes
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0  # seconds a request may wait for a slot before a 503
+    ADMISSION_LIMITS: dict = {}  # per-class overrides, e.g. {"search": {"concurrency": 8, "rate": 2}}
+    # Anonymous requests (login, register) are rate limited per client address.
+    # Behind a reverse proxy or load balancer, list its addresses or networks
+    # (e.g. ["10.0.0.0/8"]) so the client is taken from X-Forwarded-For
+    # instead; otherwise every anonymous client shares the proxy's bucket.
+    # Not needed if uvicorn already rewrites the client (--proxy-headers with
+    # --forwarded-allow-ips).
+    ADMISSION_TRUSTED_PROXIES: List[str] = []
+
+    # @mention typeahead (GET /api/users/suggest)
+    USER_SUGGEST_INDEX_MAX_USERS: int = 200000  # above this, suggestions come from the database (0 always)
+    USER_SUGGEST_INTERACTION_DAYS: int = 90  # how far back comments count as an interaction
+    USER_SUGGEST_INTERACTION_TTL: int = 300  # seconds a user's interaction ranking is cached
+
+    # Report title typeahead (GET /api/reports/suggest)
+    REPORT_SUGGEST_MIN_SIMILARITY: float = 0.3  # trigram word similarity a title needs to match (0-1)
+    REPORT_SUGGEST_RECENCY_HALF_LIFE_DAYS: float = 30.0  # how fast the bonus for recent reports fades
+    REPORT_SUGGEST_CACHE_TTL: int = 30  # seconds a user's recent query results are reused
+    REPORT_SUGGEST_CACHE_USERS: int = 1000
+    REPORT_SUGGEST_CACHE_PER_USER: int = 32  # recent queries kept per user
+
+    # Embedded full-text search for report lists (app.services.search)
+    SEARCH_BACKEND: str = "auto"  # "index", "sql" (title ILIKE), or "auto": the index on SQLite
+    SEARCH_INDEX_DIR: str = "search_index"  # relative to the backend directory
+    SEARCH_INDEX_INTERVAL: float = 1.0  # seconds between checks for changed reports
+    SEARCH_INDEX_BATCH_SIZE: int = 500  # reports indexed per segment
+    SEARCH_INDEX_MAX_SEGMENTS: int = 8  # merge in the background above this
+    SEARCH_MAX_RESULTS: int = 1000  # best matches a search considers
+
+    # Production server (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 derives the count from CPUs and DB_MAX_CONNECTIONS
+    SERVER_MAX_REQUESTS: int = 5000  # recycle a worker after this many requests (0 never)
+    SERVER_MAX_REQUESTS_JITTER: int = 500
+    SERVER_MAX_WORKER_RSS_MB: int = 512  # recycle a worker above this resident size (0 never)
+    SERVER_TIMEOUT: int = 60  # seconds a worker may go without a heartbeat
+    SERVER_GRACEFUL_TIMEOUT: int = 120  # seconds to finish in-flight requests on shutdown
+    SERVER_KEEPALIVE: int = 5
+    SERVER_ACCESS_LOG: bool = False
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
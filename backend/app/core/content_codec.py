@@ -0,0 +1,103 @@
+import time
+from threading import Lock
+from typing import Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; compressed storage is then disabled
+    zstandard = None
+
+_dictionaries: dict = {}
+_current_dict_id: Optional[int] = None
+_current_checked_at: Optional[float] = None
+_lock = Lock()
+
+
+def compression_enabled() -> bool:
+    return settings.REPORT_COMPRESSION_ENABLED and zstandard is not None
+
+
+def _load_dictionary(dict_id: int):
+    """Fetch a trained dictionary from the database (cached per process)."""
+    with _lock:
+        if dict_id in _dictionaries:
+            return _dictionaries[dict_id]
+
+    from app.core.database import SessionLocal
+    from app.models.base import CompressionDictionary
+
+    db = SessionLocal()
+    try:
+        row = db.query(CompressionDictionary).filter(CompressionDictionary.id == dict_id).first()
+        if row is None:
+            raise LookupError(f"Compression dictionary {dict_id} not found")
+        data = zstandard.ZstdCompressionDict(row.data)
+    finally:
+        db.close()
+
+    with _lock:
+        _dictionaries[dict_id] = data
+    return data
+
+
+def current_dictionary_id() -> Optional[int]:
+    """Id of the newest trained dictionary, used for new writes.
+
+    Re-read every REPORT_COMPRESSION_DICT_REFRESH_SECONDS, so long-running
+    workers pick up a dictionary trained by another process.
+    """
+    global _current_dict_id, _current_checked_at
+    now = time.monotonic()
+    if _current_checked_at is not None and now - _current_checked_at < settings.REPORT_COMPRESSION_DICT_REFRESH_SECONDS:
+        return _current_dict_id
+
+    from app.core.database import SessionLocal
+    from app.models.base import CompressionDictionary
+    from sqlalchemy import func
+
+    db = SessionLocal()
+    try:
+        _current_dict_id = db.query(func.max(CompressionDictionary.id)).scalar()
+    finally:
+        db.close()
+    _current_checked_at = now
+    return _current_dict_id
+
+
+def reset_current_dictionary() -> None:
+    """Forget the cached newest dictionary id (after training a new one here)."""
+    global _current_checked_at
+    _current_checked_at = None
+
+
+def should_compress(content: str) -> bool:
+    return compression_enabled() and len(content) >= settings.REPORT_COMPRESSION_THRESHOLD
+
+
+def compress_content(content: str) -> Tuple[bytes, Optional[int]]:
+    """Compress report content with the current dictionary, if any."""
+    dict_id = current_dictionary_id()
+    dict_data = _load_dictionary(dict_id) if dict_id is not None else None
+    compressor = zstandard.ZstdCompressor(level=settings.REPORT_COMPRESSION_LEVEL, dict_data=dict_data)
+    return compressor.compress(content.encode()), dict_id
+
+
+def decompress_content(blob: bytes, dict_id: Optional[int]) -> str:
+    dict_data = _load_dictionary(dict_id) if dict_id is not None else None
+    return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(blob).decode()
+
+
+def train_dictionary(samples: Iterable[str]) -> Optional[bytes]:
+    """Train a zstd dictionary from sample report bodies.
+
+    Returns None when there are too few samples for training to succeed.
+    """
+    samples = [sample.encode() for sample in samples]
+    if len(samples) < settings.REPORT_COMPRESSION_MIN_TRAINING_SAMPLES:
+        return None
+    try:
+        return zstandard.train_dictionary(settings.REPORT_COMPRESSION_DICT_SIZE, samples).as_bytes()
+    except zstandard.ZstdError:
+        return None
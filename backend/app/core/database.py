@@ -1,15 +1,61 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _create_engine(uri: str):
+    if uri.startswith("sqlite"):
+        return create_engine(uri)
+    connect_args = {}
+    if make_url(uri).drivername == "postgresql+psycopg":
+        # psycopg 3 prepares a statement server-side once it has run this
+        # many times on a connection; psycopg2 cannot prepare statements
+        connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD
+    return create_engine(
+        uri,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI)
+replica_engines = [_create_engine(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS]
+
+
+class RoutingSession(Session):
+    """Session that reads from ``info["replica"]`` until it writes.
+
+    get_db picks a replica for GET requests. The first flush (or a
+    published event) drops it, so writes, and everything after them in
+    the session, go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self._flushing:
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _leave_replica(session: Session, flush_context, instances) -> None:
+    session.info.pop("replica", None)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    if replica_engines and request.method in ("GET", "HEAD"):
+        from app.core.replicas import replicas
+        db.info["replica"] = replicas.choose(request)
     try:
         yield db
     finally:
@@ -0,0 +1,181 @@
+import json
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "report_events"
+# Postgres caps NOTIFY payloads at 8000 bytes
+MAX_PAYLOAD = 7900
+# Kept when an event's data has to be trimmed to fit
+ID_FIELDS = ("id", "report_id", "comment_id", "user_id", "parent_id")
+
+
+@dataclass
+class DomainEvent:
+    type: str  # e.g. "comment.created"
+    data: dict
+    id: int = field(default_factory=lambda: time.time_ns() // 1000)
+
+    def to_json(self) -> str:
+        payload = json.dumps({"type": self.type, "id": self.id, "data": self.data}, default=str)
+        if len(payload.encode()) > MAX_PAYLOAD:
+            trimmed = {key: value for key, value in self.data.items() if key in ID_FIELDS}
+            payload = json.dumps({"type": self.type, "id": self.id, "data": trimmed, "truncated": True})
+        return payload
+
+    @classmethod
+    def from_json(cls, payload: str) -> "DomainEvent":
+        message = json.loads(payload)
+        return cls(type=message["type"], data=message["data"], id=message["id"])
+
+
+def _notifications(dbapi_connection, timeout: float) -> List[str]:
+    """Payloads of the notifications received within ``timeout`` seconds."""
+    if hasattr(dbapi_connection, "poll"):  # psycopg2
+        payloads = []
+        if select.select([dbapi_connection], [], [], timeout)[0]:
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                payloads.append(dbapi_connection.notifies.pop(0).payload)
+        return payloads
+    # psycopg 3
+    return [notify.payload for notify in dbapi_connection.notifies(timeout=timeout)]
+
+
+class EventBus:
+    """Domain events (report/comment/mention/user changes) delivered to every worker.
+
+    CRUD code calls ``publish(db, ...)`` inside its transaction. On
+    PostgreSQL the events are sent with ``pg_notify`` just before commit, so
+    Postgres delivers them if and only if the transaction commits; one
+    LISTEN connection per process (``start``) hands them to subscribers,
+    including in the publishing process. On other databases (SQLite, tests)
+    events are dispatched in-process right after commit. Subscribers run on
+    the listener thread (or the committing thread) and must be quick and
+    thread-safe.
+    """
+
+    def __init__(self):
+        self._subscribers: List[tuple] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, prefix: str, handler: Callable[[DomainEvent], None]) -> None:
+        """Call ``handler`` for events whose type starts with ``prefix``."""
+        self._subscribers.append((prefix, handler))
+
+    def publish(self, db: Session, event_type: str, data: dict) -> DomainEvent:
+        """Queue an event to go out when ``db``'s transaction commits."""
+        domain_event = DomainEvent(type=event_type, data=data)
+        db.info.pop("replica", None)  # NOTIFY must go out on the primary
+        db.info.setdefault("pending_events", []).append(domain_event)
+        return domain_event
+
+    def dispatch(self, domain_event: DomainEvent) -> None:
+        self.received += 1
+        for prefix, handler in self._subscribers:
+            if domain_event.type.startswith(prefix):
+                try:
+                    handler(domain_event)
+                except Exception as e:
+                    logger.error(f"Event handler for {domain_event.type} failed: {e}")
+
+    # Session hooks
+
+    def _before_commit(self, session: Session) -> None:
+        pending = session.info.get("pending_events")
+        if not pending or session.bind.dialect.name != "postgresql":
+            return
+        connection = session.connection()
+        for domain_event in pending:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": domain_event.to_json()}
+            )
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop("pending_events", None)
+        if not pending:
+            return
+        self.published += len(pending)
+        if session.bind.dialect.name != "postgresql":
+            for domain_event in pending:
+                self.dispatch(domain_event)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop("pending_events", None)
+
+    # Listener
+
+    def start(self, engine: Engine) -> None:
+        """Start this process's LISTEN thread (PostgreSQL, with psycopg2 or psycopg 3.2+)."""
+        if engine.dialect.name != "postgresql" or self._thread is not None:
+            return
+        if engine.dialect.driver == "psycopg":
+            import psycopg
+            if tuple(int(part) for part in psycopg.__version__.split(".")[:2]) < (3, 2):
+                raise RuntimeError(f"The event listener needs psycopg 3.2 or later, found {psycopg.__version__}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, args=(engine,), name="event-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self, engine: Engine) -> None:
+        backoff = 1
+        while not self._stop.is_set():
+            connection = None
+            try:
+                # A dedicated connection, taken out of the pool for good
+                connection = engine.raw_connection()
+                connection.detach()
+                dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                backoff = 1
+                while not self._stop.is_set():
+                    for payload in _notifications(dbapi_connection, 1.0):
+                        self.dispatch(DomainEvent.from_json(payload))
+            except Exception as e:
+                logger.error(f"Event listener error, reconnecting in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "received": self.received,
+            "subscribers": len(self._subscribers),
+            "listening": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+event_bus = EventBus()
+
+event.listen(SessionLocal, "before_commit", event_bus._before_commit)
+event.listen(SessionLocal, "after_commit", event_bus._after_commit)
+event.listen(SessionLocal, "after_rollback", event_bus._after_rollback)
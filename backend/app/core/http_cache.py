@@ -0,0 +1,42 @@
+import hashlib
+from fastapi import Request, Response
+from app.core.config import settings
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the versions of the entities behind a response."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an ETag against the request's If-None-Match header."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses weak comparison
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict:
+    """Validator and freshness headers for a private, revalidatable response."""
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"private, max-age={settings.HTTP_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+    }
+
+
+def not_modified(etag: str) -> Response:
+    """A 304 response carrying the current validators."""
+    return Response(status_code=304, headers=cache_headers(etag))
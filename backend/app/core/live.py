@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Set
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    id: int
+    type: str
+    data: str  # JSON
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "type": self.type, "data": json.loads(self.data)}
+
+
+# Queued for a subscriber that fell too far behind; its stream then ends and
+# the client resumes from its Last-Event-ID.
+LAGGED = LiveEvent(id=0, type="lagged", data="{}")
+
+
+class Subscription:
+    """One connected client: replayed events first, then a bounded live queue."""
+
+    def __init__(self, hub: "LiveHub", channel: str, replay: List[LiveEvent], reset: bool):
+        self.hub = hub
+        self.channel = channel
+        self.reset = reset
+        self.loop = asyncio.get_running_loop()
+        self._backlog: Deque[LiveEvent] = deque(replay)
+        self._queue: "asyncio.Queue[LiveEvent]" = asyncio.Queue(maxsize=hub.queue_size)
+        self.lagged = False
+
+    def _deliver(self, event: LiveEvent) -> None:
+        if self.lagged:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop what it has not read and tell it to resume
+            self.lagged = True
+            self.hub.dropped += 1
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(LAGGED)
+
+    async def get(self, timeout: float) -> Optional[LiveEvent]:
+        """Next event, or None if nothing arrived within ``timeout`` (time for a heartbeat)."""
+        if self._backlog:
+            return self._backlog.popleft()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class _Channel:
+    def __init__(self, replay_size: int):
+        self.events: Deque[LiveEvent] = deque(maxlen=replay_size)
+        # Events up to this id are unknown here (before the channel existed, or evicted)
+        self.complete_after = time.time_ns() // 1000
+        self.subscribers: Set[Subscription] = set()
+        self.last_id = 0
+
+
+class LiveHub:
+    """In-process pub/sub for live streams, keyed by channel (e.g. ``comments:42``).
+
+    Publishing is thread-safe and never blocks: events are appended to a
+    per-channel replay buffer and handed to each subscriber's event loop.
+    Event ids are microsecond timestamps (strictly increasing per channel),
+    so a reconnecting client can resume from its Last-Event-ID; if the
+    buffer no longer covers that id the subscription starts with ``reset``
+    and the client should refetch. Channels without subscribers are kept,
+    for resumption, up to ``max_channels``, least recently used first out.
+    """
+
+    def __init__(self, queue_size: int, replay_size: int, max_channels: int = 10000):
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.max_channels = max_channels
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def _channel(self, name: str) -> _Channel:
+        channel = self._channels.get(name)
+        if channel is None:
+            channel = self._channels[name] = _Channel(self.replay_size)
+            self._evict()
+        else:
+            self._channels.move_to_end(name)
+        return channel
+
+    def _evict(self) -> None:
+        for name in list(self._channels):
+            if len(self._channels) <= self.max_channels:
+                return
+            if not self._channels[name].subscribers:
+                del self._channels[name]
+
+    def publish(self, channel_name: str, event_type: str, data: dict, event_id: Optional[int] = None) -> LiveEvent:
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        with self._lock:
+            channel = self._channel(channel_name)
+            if event_id is None or event_id <= channel.last_id:
+                event_id = max(time.time_ns() // 1000, channel.last_id + 1)
+            channel.last_id = event_id
+            event = LiveEvent(id=event_id, type=event_type, data=payload)
+            if len(channel.events) == channel.events.maxlen:
+                channel.complete_after = channel.events[0].id
+            channel.events.append(event)
+            subscribers = list(channel.subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:  # Loop closed; the subscription is going away
+                pass
+        return event
+
+    def subscribe(self, channel_name: str, last_event_id: Optional[int] = None) -> Subscription:
+        """Subscribe from the running event loop, replaying events after ``last_event_id``."""
+        with self._lock:
+            channel = self._channel(channel_name)
+            replay, reset = [], False
+            if last_event_id is not None:
+                reset = last_event_id < channel.complete_after
+                replay = [event for event in channel.events if event.id > last_event_id]
+            subscription = Subscription(self, channel_name, replay, reset)
+            channel.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            channel = self._channels.get(subscription.channel)
+            if channel is not None:
+                channel.subscribers.discard(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(channel.subscribers) for channel in self._channels.values()),
+                "published": self.published,
+                "dropped_subscribers": self.dropped,
+            }
+
+
+live_hub = LiveHub(settings.LIVE_QUEUE_SIZE, settings.LIVE_REPLAY_EVENTS)
+
+
+def comments_channel(report_id: int) -> str:
+    return f"comments:{report_id}"
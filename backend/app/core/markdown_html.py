@@ -0,0 +1,72 @@
+"""Markdown to sanitized HTML.
+
+Kept apart from app.core.rendering so that python-markdown and nh3 are only
+imported when something is actually rendered, not on every worker boot.
+"""
+import xml.etree.ElementTree as etree
+from typing import Iterable
+
+import markdown
+import nh3
+from markdown.inlinepatterns import InlineProcessor
+
+
+MENTION_PATTERN = r'(?<![\w.])@([\w.-]+)'
+
+ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    "a": {"href", "hreflang", "title", "class"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "code": {"class"},
+    "th": {"align"},
+    "td": {"align"},
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+}
+
+
+class MentionProcessor(InlineProcessor):
+    """Turn @username into a profile link for users that exist."""
+
+    def __init__(self, pattern: str, usernames: frozenset):
+        super().__init__(pattern)
+        self.usernames = usernames
+
+    def handleMatch(self, m, data):
+        username = m.group(1).rstrip(".")
+        if username not in self.usernames:
+            return None, None, None
+        link = etree.Element("a")
+        link.set("href", f"/users/{username}")
+        link.set("class", "mention")
+        link.text = f"@{username}"
+        return link, m.start(0), m.start(0) + len(username) + 1
+
+
+class MentionExtension(markdown.Extension):
+    def __init__(self, usernames: Iterable[str]):
+        super().__init__()
+        self.usernames = frozenset(usernames)
+
+    def extendMarkdown(self, md):
+        md.inlinePatterns.register(MentionProcessor(MENTION_PATTERN, self.usernames), "mention", 175)
+
+
+def _toc_entries(tokens: list) -> list:
+    return [
+        {
+            "level": token["level"],
+            "id": token["id"],
+            "name": token["name"],
+            "children": _toc_entries(token["children"]),
+        }
+        for token in tokens
+    ]
+
+
+def render(content: str, usernames: Iterable[str] = ()) -> dict:
+    md = markdown.Markdown(extensions=["extra", "sane_lists", "toc", MentionExtension(usernames)])
+    html = md.convert(content)
+    return {
+        "html": nh3.clean(html, attributes=ALLOWED_ATTRIBUTES),
+        "toc": _toc_entries(md.toc_tokens),
+    }
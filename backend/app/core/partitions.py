@@ -0,0 +1,161 @@
+"""Monthly range partitions for the append-mostly tables (PostgreSQL only).
+
+``reports``, ``comments`` and ``mentions`` are partitioned by ``created_at``
+with one partition per calendar month (UTC), named ``<table>_pYYYY_MM``.
+``ensure_partitions`` creates them ahead of time, at startup and from
+app.scripts.manage_partitions, which also detaches partitions past the
+retention window into an archive schema. Rows outside every monthly
+partition land in ``<table>_default`` rather than failing to insert. On
+other databases the tables are plain and these are no-ops.
+"""
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("reports", "comments", "mentions")
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection, table: str) -> List[date]:
+    """Months that currently have an attached partition, oldest first."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table}
+    ).scalars()
+    months = []
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return sorted(months)
+
+
+def create_partition(conn: Connection, table: str, month: date) -> str:
+    """Create the partition holding ``month`` (idempotent)."""
+    name = partition_name(table, month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    ))
+    return name
+
+
+def _in_default_partition(conn: Connection, table: str, month: date) -> bool:
+    return conn.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {default_partition_name(table)} "
+            "WHERE created_at >= :start AND created_at < :end)"
+        ),
+        {"start": month, "end": add_months(month, 1)}
+    ).scalar()
+
+
+def ensure_partitions(conn: Connection, months_ahead: int, since: Optional[date] = None) -> List[str]:
+    """Create missing partitions from ``since`` (default: this month) up to ``months_ahead`` months out.
+
+    Also creates each table's default partition. A month whose rows
+    already went to the default partition is skipped with a warning:
+    Postgres refuses to create a partition over rows the default holds, and
+    moving them would fire the cascading foreign keys. Detach the default
+    partition, create the month, copy its rows over and re-attach to fix it.
+
+    Returns the names of partitions that were created.
+    """
+    today = datetime.now(timezone.utc).date()
+    first = month_start(since or today)
+    last = add_months(month_start(today), months_ahead)
+    created, skipped = [], []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+        ))
+        existing = set(list_partitions(conn, table))
+        month = first
+        while month <= last:
+            if month not in existing:
+                if _in_default_partition(conn, table, month):
+                    skipped.append(partition_name(table, month))
+                else:
+                    created.append(create_partition(conn, table, month))
+            month = add_months(month, 1)
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    if skipped:
+        logger.warning(f"Not creating partitions whose rows are in the default partition: {', '.join(skipped)}")
+    return created
+
+
+def detach_partitions(conn: Connection, retention_months: int, archive_schema: str) -> List[str]:
+    """Detach partitions older than ``retention_months`` and move them to ``archive_schema``.
+
+    Archived partitions are ordinary tables and can be dumped and dropped, or
+    re-attached with ALTER TABLE ... ATTACH PARTITION. Mentions go first,
+    then comments, then reports; a partition that rows elsewhere still refer
+    to through a foreign key (say, old reports with newer comments or any
+    attachments) can't be detached, and is kept with a warning.
+    """
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -retention_months)
+    detached, kept = [], []
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+    for table in reversed(PARTITIONED_TABLES):
+        if not is_partitioned(conn, table):
+            continue
+        for month in list_partitions(conn, table):
+            if month >= cutoff:
+                break
+            name = partition_name(table, month)
+            try:
+                with conn.begin_nested():
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                    conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            except IntegrityError:
+                kept.append(name)
+                continue
+            detached.append(name)
+    if detached:
+        logger.info(f"Detached partitions to {archive_schema}: {', '.join(detached)}")
+    if kept:
+        logger.warning(f"Kept partitions that other rows still refer to: {', '.join(kept)}")
+    return detached
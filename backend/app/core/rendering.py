@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def render_markdown(content: str, usernames: Iterable[str] = ()) -> dict:
+    """Render report markdown to sanitized HTML plus a heading table of contents.
+
+    ``usernames`` are the mentioned users that exist; other @names are left as text.
+    """
+    from app.core.markdown_html import render
+    return render(content, usernames)
+
+
+def render_key(content: str, usernames: Iterable[str]) -> str:
+    """Cache key for a rendering: content hash plus the resolved mentions."""
+    digest = hashlib.sha256(content.encode())
+    digest.update("\0".join(sorted(usernames)).encode())
+    return f"markdown:{digest.hexdigest()}"
+
+
+def _cache():
+    from app.core.cache import response_cache  # Not needed in worker processes
+    return response_cache.backend
+
+
+def get_cached_rendering(content: str, usernames: Iterable[str]) -> Optional[dict]:
+    data = _cache().get(render_key(content, usernames))
+    return json.loads(data) if data is not None else None
+
+
+def get_rendering(content: str, usernames: Iterable[str]) -> dict:
+    """Return the rendering for some content, rendering inline on a cache miss."""
+    usernames = sorted(usernames)
+    rendered = get_cached_rendering(content, usernames)
+    if rendered is None:
+        rendered = render_markdown(content, usernames)
+        _cache().set(render_key(content, usernames), json.dumps(rendered).encode())
+    return rendered
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.MARKDOWN_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def schedule_render(content: str, usernames: Iterable[str]) -> None:
+    """Precompute a rendering in the worker pool so the first read is a cache hit."""
+    if settings.MARKDOWN_RENDER_WORKERS <= 0:
+        return
+    usernames = sorted(usernames)
+    key = render_key(content, usernames)
+    if _cache().get(key) is not None:
+        return
+
+    def store(future):
+        try:
+            _cache().set(key, json.dumps(future.result()).encode())
+        except Exception as e:
+            logger.warning(f"Markdown prerender failed: {e}")
+
+    try:
+        _get_pool().submit(render_markdown, content, usernames).add_done_callback(store)
+    except RuntimeError as e:  # Pool shut down or broken; reads render inline
+        logger.warning(f"Markdown prerender unavailable: {e}")
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,206 @@
+"""Read-replica selection with read-your-writes.
+
+GET requests read from a replica (see app.core.database.get_db) when one
+is healthy, no more than REPLICA_MAX_LAG_SECONDS behind, and has caught
+up with the requesting user's last write. Anything else reads from the
+primary.
+
+Writes are marked per user when a session that flushed changes commits.
+On PostgreSQL the mark is the primary's WAL position after the commit, and
+a replica may serve the user once it has replayed past it. Other databases
+(two SQLite files work for trying this out locally) have no positions, so
+the user simply reads from the primary for REPLICA_PIN_SECONDS. The marks
+live in the response cache backend, so with Redis they are shared by all
+workers; with the in-memory backend a worker only knows its own writes.
+"""
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, MemoryCache, response_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_LSN = text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")
+REPLICA_STATUS = text(
+    "SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn() - '0/0'::pg_lsn, "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class ReplicaState:
+    engine: Engine
+    healthy: bool = False
+    lag_seconds: Optional[float] = None
+    replay_lsn: Optional[int] = None  # bytes of WAL replayed (PostgreSQL)
+    checked_at: float = 0.0
+    error: Optional[str] = None
+    reads: int = 0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    def __init__(self, engines: List[Engine], marks: CacheBackend):
+        self.replicas = [ReplicaState(replica) for replica in engines]
+        self.marks = marks
+        self._next = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+    # Routing
+
+    def choose(self, request: Request) -> Optional[Engine]:
+        """A replica engine for this request, or None to use the primary."""
+        mark = self.write_mark(_user_id(request))
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and replica.lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+        ]
+        if mark is not None:
+            candidates = [
+                replica for replica in candidates
+                if mark > 0 and replica.replay_lsn is not None and replica.replay_lsn >= mark
+            ]
+            if not candidates:
+                self.pinned_reads += 1
+                return None
+        if not candidates:
+            self.primary_reads += 1
+            return None
+        replica = candidates[next(self._next) % len(candidates)]
+        replica.reads += 1
+        return replica.engine
+
+    def write_mark(self, user_id: Optional[int]) -> Optional[int]:
+        if user_id is None:
+            return None
+        value = self.marks.get(f"rw:{user_id}")
+        return int(value) if value is not None else None
+
+    def record_write(self, user_id: int) -> None:
+        """Note that a user committed a write: their reads need a replica that has it."""
+        lsn = 0
+        if engine.dialect.name == "postgresql":
+            try:
+                with engine.connect() as conn:
+                    lsn = int(conn.execute(PRIMARY_LSN).scalar())
+            except Exception as e:
+                logger.warning(f"Could not read the primary's WAL position: {e}")
+        self.marks.set(f"rw:{user_id}", str(lsn).encode(), ttl=settings.REPLICA_PIN_SECONDS)
+
+    # Health and lag
+
+    def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    if replica.engine.dialect.name == "postgresql":
+                        in_recovery, replay_lsn, lag = conn.execute(REPLICA_STATUS).one()
+                        if not in_recovery:
+                            raise RuntimeError("not a standby (pg_is_in_recovery() is false)")
+                        replica.replay_lsn, replica.lag_seconds = int(replay_lsn), float(lag)
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        replica.lag_seconds = 0.0
+                replica.healthy, replica.error = True, None
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"Replica {replica.name} is unavailable, reading from the primary: {e}")
+                replica.healthy, replica.error = False, str(e)
+            replica.checked_at = time.time()
+
+    def start(self) -> None:
+        """Check the replicas now and then every REPLICA_CHECK_INTERVAL seconds."""
+        if not self.replicas or self._thread is not None:
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-checker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.REPLICA_CHECK_INTERVAL):
+            self.check()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "url": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "replay_lsn": replica.replay_lsn,
+                    "checked_at": replica.checked_at,
+                    "error": replica.error,
+                    "reads": replica.reads,
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+        }
+
+
+def _user_id(request: Request) -> Optional[int]:
+    from app.core.auth import decode_access_token
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token)
+    except HTTPException:
+        return None
+
+
+def _marks_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return response_cache.backend
+    return MemoryCache(max_entries=100000)
+
+
+replicas = ReplicaSet(replica_engines, _marks_backend())
+
+
+# Sessions record who they act for (app.core.auth.get_current_user) and
+# whether they wrote anything; committed writes mark the user.
+
+@event.listens_for(SessionLocal, "after_flush")
+def _note_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_writer(session: Session) -> None:
+    wrote = session.info.pop("wrote", False)
+    user_id = session.info.get("user_id")
+    if wrote and user_id is not None and replicas.replicas:
+        replicas.record_write(user_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
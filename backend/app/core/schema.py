@@ -0,0 +1,123 @@
+import logging
+import re
+from pathlib import Path
+from typing import Set
+
+from sqlalchemy import Column, MetaData, PrimaryKeyConstraint, String, Table, inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+# The schema create_all produced before migrations became the only way to
+# build it; databases created that way are adopted with `alembic stamp`
+CREATE_ALL_REVISION = "e2273bbe30dc"
+
+# Alembic's own version table, for stamping a database built by bootstrap()
+_version_table = Table(
+    "alembic_version", MetaData(),
+    Column("version_num", String(32), nullable=False),
+    PrimaryKeyConstraint("version_num", name="alembic_version_pkc"),
+)
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def expected_heads(versions_dir: Path = VERSIONS_DIR) -> Set[str]:
+    """Head revisions of the migration scripts.
+
+    Reads the revision identifiers straight from the files rather than
+    loading them through Alembic, which would import every migration (and
+    Alembic itself) on each worker boot.
+    """
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision is not None:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def current_revisions(engine: Engine) -> Set[str]:
+    with engine.connect() as conn:
+        if not engine.dialect.has_table(conn, "alembic_version"):
+            return set()
+        return set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+
+def built_by_create_all(engine: Engine) -> bool:
+    """Whether the database has the app's tables but no migration history."""
+    with engine.connect() as conn:
+        return (
+            engine.dialect.has_table(conn, "users")
+            and not engine.dialect.has_table(conn, "alembic_version")
+        )
+
+
+def bootstrap(engine: Engine) -> bool:
+    """Build an empty database with create_all and stamp it at the migration heads.
+
+    The early migrations were only ever run against databases create_all
+    had already built and can't build one from scratch, so a new database
+    starts from the models instead; ``alembic upgrade head`` takes it from
+    there. Returns whether the database was empty. On PostgreSQL the
+    tables come out unpartitioned.
+    """
+    from app.core.database import Base
+    import app.models.base  # noqa: F401  Registers the models on Base.metadata
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Workers start together; one builds, the rest find it built
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_bootstrap'))"))
+        if inspect(conn).get_table_names():
+            return False
+        Base.metadata.create_all(conn)
+        _version_table.create(conn)
+        heads = sorted(expected_heads())
+        conn.execute(_version_table.insert(), [{"version_num": head} for head in heads])
+    logger.info(f"Created the database schema, stamped at {', '.join(heads)}")
+    return True
+
+
+def check_schema(engine: Engine, mode: str) -> None:
+    """Compare the database's migration version with the scripts' heads.
+
+    ``mode`` is "error" (raise SchemaOutOfDate on a mismatch), "warn" or
+    "off". An unreachable database is only logged: the pool connects lazily
+    and the app should come up once it is back.
+    """
+    if mode == "off":
+        return
+    try:
+        current = current_revisions(engine)
+        unversioned = not current and built_by_create_all(engine)
+    except Exception as e:
+        logger.warning(f"Could not check the schema version, database unavailable: {e}")
+        return
+    expected = expected_heads()
+    if current == expected:
+        return
+    message = (
+        f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+        f"migrations are at {', '.join(sorted(expected))}; run `alembic upgrade head`"
+    )
+    if unversioned:
+        message += (
+            f". It has tables but no migration history, so it was built by create_all: "
+            f"run `alembic stamp {CREATE_ALL_REVISION}` first"
+        )
+    if mode == "error":
+        raise SchemaOutOfDate(message)
+    logger.warning(message)
@@ -0,0 +1,483 @@
+"""Embedded full-text index: positional postings, BM25 ranking and phrase queries.
+
+The index is a directory of immutable segment files plus a manifest
+listing them oldest first. Each batch of changed documents becomes a new
+segment; a document's newest segment (or tombstone) wins, so an update
+is just the new version in a newer segment. Segments are memory-mapped
+for reading, and every process searching the directory picks up a new
+manifest on its next search. Only one process at a time (the holder of
+``write.lock``) adds or merges segments; a merge rewrites a run of
+adjacent small segments as one and drops the copies they shadow.
+
+Segment layout (little-endian, sections 8-byte aligned)::
+
+    header      magic, version, doc/tombstone/term counts, total length, section offsets
+    doc_ids     int64 per document, ascending
+    lengths     uint32 tokens per document
+    tombstones  int64 per deleted document
+    term_offs   uint64 per term + 1, into the term blob
+    terms       UTF-8 terms, concatenated in byte order
+    post_offs   uint64 per term, into postings (in uint32 units)
+    postings    per term: doc count, then per doc: doc index, tf, tf positions
+
+Queries are words (all must match) and "quoted phrases" (consecutive
+positions), ranked with BM25 over the live documents of all segments.
+This module knows nothing about reports; app.services.search feeds it.
+"""
+import fcntl
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict, defaultdict
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RSIX"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIQ7Q")
+MAX_TOKEN_LENGTH = 64
+# Positions skipped between a document's parts so phrases can't span them
+PART_GAP = 16
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[^\W_]+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, accent-stripped words."""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return [token for token in _WORD.findall(folded) if len(token) <= MAX_TOKEN_LENGTH]
+
+
+def parse_query(query: str) -> List[Tuple[str, ...]]:
+    """Terms and phrases of a query, each as a tuple of tokens (one token for a plain word)."""
+    clauses = []
+    for phrase, word in _QUERY.findall(query):
+        tokens = tuple(tokenize(phrase if phrase else word))
+        if phrase and tokens:
+            clauses.append(tokens)
+        else:
+            clauses.extend((token,) for token in tokens)
+    return list(dict.fromkeys(clauses))
+
+
+def _pad(f) -> None:
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def write_segment(path: str, docs: Dict[int, List[str]], tombstones: Iterable[int] = ()) -> None:
+    """Write a segment of ``docs`` (id -> tokens, "" for a gap) and deleted ids, atomically."""
+    doc_ids = sorted(docs)
+    postings: Dict[bytes, Dict[int, array]] = defaultdict(dict)
+    for doc_index, doc_id in enumerate(doc_ids):
+        for position, token in enumerate(docs[doc_id]):
+            if token:  # "" marks a gap between parts
+                positions = postings[token.encode()].get(doc_index)
+                if positions is None:
+                    positions = postings[token.encode()][doc_index] = array("I")
+                positions.append(position)
+    lengths = [sum(1 for token in docs[doc_id] if token) for doc_id in doc_ids]
+    _write(path, doc_ids, lengths, sorted(set(tombstones) - set(docs)), postings)
+
+
+def _write(path: str, doc_ids: Sequence[int], lengths: Sequence[int], tombstones: Sequence[int], postings: Dict[bytes, Dict[int, array]]) -> None:
+    terms = sorted(postings)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        _pad(f)
+        offsets = []
+        offsets.append(f.tell())
+        f.write(array("q", doc_ids).tobytes())
+        _pad(f)
+        offsets.append(f.tell())
+        f.write(array("I", lengths).tobytes())
+        _pad(f)
+        offsets.append(f.tell())
+        f.write(array("q", tombstones).tobytes())
+        _pad(f)
+
+        term_offsets, blob = array("Q", [0]), bytearray()
+        for term in terms:
+            blob += term
+            term_offsets.append(len(blob))
+        offsets.append(f.tell())
+        f.write(term_offsets.tobytes())
+        _pad(f)
+        offsets.append(f.tell())
+        f.write(blob)
+        _pad(f)
+
+        stream, posting_offsets = array("I"), array("Q")
+        for term in terms:
+            posting_offsets.append(len(stream))
+            by_doc = postings[term]
+            stream.append(len(by_doc))
+            for doc_index in sorted(by_doc):
+                positions = by_doc[doc_index]
+                stream.append(doc_index)
+                stream.append(len(positions))
+                stream.extend(positions)
+        offsets.append(f.tell())
+        f.write(posting_offsets.tobytes())
+        _pad(f)
+        offsets.append(f.tell())
+        f.write(stream.tobytes())
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(doc_ids), len(tombstones), len(terms), sum(lengths), *offsets))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Segment:
+    """A read-only, memory-mapped segment."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+        magic, version, n_docs, n_tombstones, n_terms, self.total_length, *offsets = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} search segment")
+        docs_off, lengths_off, tombstones_off, term_offs_off, blob_off, post_offs_off, postings_off = offsets
+        self.doc_ids = view[docs_off:docs_off + 8 * n_docs].cast("q")
+        self.lengths = view[lengths_off:lengths_off + 4 * n_docs].cast("I")
+        self.tombstones = view[tombstones_off:tombstones_off + 8 * n_tombstones].cast("q")
+        self._term_offsets = view[term_offs_off:term_offs_off + 8 * (n_terms + 1)].cast("Q")
+        self._blob = view[blob_off:blob_off + (self._term_offsets[n_terms] if n_terms else 0)]
+        self._posting_offsets = view[post_offs_off:post_offs_off + 8 * n_terms].cast("Q")
+        self._postings = view[postings_off:].cast("I") if len(view) > postings_off else memoryview(array("I"))
+        self.n_terms = n_terms
+        self.size = len(self._mmap)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def term(self, i: int) -> bytes:
+        return bytes(self._blob[self._term_offsets[i]:self._term_offsets[i + 1]])
+
+    def find(self, term: bytes) -> Optional[int]:
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n_terms and self.term(lo) == term else None
+
+    def postings(self, term_index: int) -> Iterable[Tuple[int, memoryview]]:
+        """(doc index, positions) for a term."""
+        p = self._postings
+        i = self._posting_offsets[term_index]
+        count = p[i]
+        i += 1
+        for _ in range(count):
+            doc_index, tf = p[i], p[i + 1]
+            yield doc_index, p[i + 2:i + 2 + tf]
+            i += 2 + tf
+
+    def close(self) -> None:
+        """Unmap now if nothing still holds a view of the file; otherwise when the last one goes."""
+        try:
+            for name in ("doc_ids", "lengths", "tombstones", "_term_offsets", "_blob", "_posting_offsets", "_postings", "_view"):
+                getattr(self, name).release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+class _Snapshot:
+    """The segments of one manifest generation, with which documents each one still owns."""
+
+    def __init__(self, generation: int, segments: List[Segment]):
+        self.generation = generation
+        self.segments = segments
+        self.live: List[Set[int]] = []  # per segment, indexes of docs not shadowed by a newer segment
+        seen: Set[int] = set()
+        total_length = 0
+        for segment in reversed(segments):
+            live = set()
+            for doc_index, doc_id in enumerate(segment.doc_ids):
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    live.add(doc_index)
+                    total_length += segment.lengths[doc_index]
+            seen.update(segment.tombstones)
+            self.live.append(live)
+        self.live.reverse()
+        self.n_docs = sum(len(live) for live in self.live)
+        self.avg_length = total_length / self.n_docs if self.n_docs else 0.0
+
+    def matches(self, clause: Tuple[str, ...]) -> Dict[int, Tuple[int, int]]:
+        """doc_id -> (occurrences, doc length) for live docs containing the term or phrase."""
+        found = {}
+        for segment, live in zip(self.segments, self.live):
+            per_token = []
+            for token in clause:
+                term_index = segment.find(token.encode())
+                if term_index is None:
+                    break
+                per_token.append({d: pos for d, pos in segment.postings(term_index) if d in live})
+            else:
+                first, rest = per_token[0], per_token[1:]
+                for doc_index, positions in first.items():
+                    if any(doc_index not in other for other in rest):
+                        continue
+                    if rest:
+                        following = [set(other[doc_index]) for other in rest]
+                        tf = sum(
+                            1 for start in positions
+                            if all(start + k + 1 in offsets for k, offsets in enumerate(following))
+                        )
+                    else:
+                        tf = len(positions)
+                    if tf:
+                        found[segment.doc_ids[doc_index]] = (tf, segment.lengths[doc_index])
+        return found
+
+    def search(self, query: str, limit: int, allowed: Optional[AbstractSet[int]] = None) -> List[Tuple[int, float]]:
+        clauses = parse_query(query)
+        if not clauses or not self.n_docs:
+            return []
+        scores: Optional[Dict[int, float]] = None
+        for clause in clauses:
+            found = self.matches(clause)
+            idf = math.log(1 + (self.n_docs - len(found) + 0.5) / (len(found) + 0.5))
+            clause_scores = {}
+            for doc_id, (tf, length) in found.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avg_length or 1))
+                clause_scores[doc_id] = idf * tf * (BM25_K1 + 1) / (tf + norm)
+            if scores is None:
+                if allowed is not None:
+                    clause_scores = {doc_id: score for doc_id, score in clause_scores.items() if doc_id in allowed}
+                scores = clause_scores
+            else:  # Every clause must match
+                scores = {doc_id: score + clause_scores[doc_id] for doc_id, score in scores.items() if doc_id in clause_scores}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+
+
+class SearchIndex:
+    """A segment directory: searched by any process, written by the one holding its lock."""
+
+    def __init__(self, directory: str, max_segments: int = 8, cache_size: int = 256):
+        self.directory = directory
+        self.max_segments = max_segments
+        self._snapshot: Optional[_Snapshot] = None
+        self._manifest_stat = None
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._results: "OrderedDict[tuple, list]" = OrderedDict()
+        self._cache_size = cache_size
+        self.searches = 0
+        self.merges = 0
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    # Reading
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"generation": 0, "next_segment": 1, "segments": []}
+
+    def snapshot(self) -> _Snapshot:
+        """The current segments, reopened if the manifest changed since the last call."""
+        try:
+            st = os.stat(self.manifest_path)
+            stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            stat = None
+        with self._lock:
+            if self._snapshot is not None and stat == self._manifest_stat:
+                return self._snapshot
+            manifest = self._read_manifest()
+            current = {segment.name: segment for segment in (self._snapshot.segments if self._snapshot else [])}
+            # Dropped segments are unmapped once searches still using them finish
+            segments = [
+                current.pop(name, None) or Segment(os.path.join(self.directory, name))
+                for name in manifest["segments"]
+            ]
+            self._snapshot = _Snapshot(manifest["generation"], segments)
+            self._manifest_stat = stat
+            self._results.clear()
+            return self._snapshot
+
+    def search(self, query: str, limit: int = 1000, allowed: Optional[AbstractSet[int]] = None) -> List[Tuple[int, float]]:
+        """Ids and BM25 scores of the documents matching every word and phrase, best first.
+
+        With ``allowed``, only those documents are considered, so the
+        ``limit`` best are the best the caller may see. Such searches are
+        not cached.
+        """
+        snapshot = self.snapshot()
+        if allowed is not None:
+            with self._lock:
+                self.searches += 1
+            return snapshot.search(query, limit, allowed)
+        key = (snapshot.generation, query, limit)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+        results = snapshot.search(query, limit)
+        with self._lock:
+            self.searches += 1
+            self._results[key] = results
+            while len(self._results) > self._cache_size:
+                self._results.popitem(last=False)
+        return results
+
+    # Writing (lock holder only)
+
+    def acquire(self, blocking: bool = False) -> bool:
+        """Become this directory's writer; False if another process is."""
+        if self._lock_file is not None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, "write.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lock_file is not None
+
+    def _commit(self, manifest: dict, segments: List[str], obsolete: Sequence[str] = ()) -> None:
+        manifest["generation"] += 1
+        manifest["segments"] = segments
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+        # Readers that still map these keep working until they reload (POSIX)
+        for name in obsolete:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _new_segment_name(self, manifest: dict) -> str:
+        number = manifest.get("next_segment", 1)
+        manifest["next_segment"] = number + 1
+        return f"seg-{number:08d}.idx"
+
+    def add(self, docs: Dict[int, List[str]], deleted: Iterable[int] = ()) -> None:
+        """Add a segment with new versions of ``docs`` and tombstones for ``deleted``."""
+        assert self.is_writer, "acquire() the index before writing"
+        deleted = list(deleted)
+        if not docs and not deleted:
+            return
+        manifest = self._read_manifest()
+        name = self._new_segment_name(manifest)
+        write_segment(os.path.join(self.directory, name), docs, deleted)
+        self._commit(manifest, manifest["segments"] + [name])
+
+    def replace_all(self, batches: Iterable[Dict[int, List[str]]]) -> int:
+        """Rebuild from scratch: write ``batches`` as segments, merge them, and swap them in."""
+        assert self.is_writer, "acquire() the index before writing"
+        manifest = self._read_manifest()
+        names, count = [], 0
+        for docs in batches:
+            name = self._new_segment_name(manifest)
+            write_segment(os.path.join(self.directory, name), docs)
+            names.append(name)
+            count += len(docs)
+        old = manifest["segments"]
+        merged = self._merge_files(manifest, names, drop_tombstones=True) if len(names) > 1 else names
+        self._commit(manifest, merged, obsolete=old + [name for name in names if name not in merged])
+        return count
+
+    def _merge_files(self, manifest: dict, names: List[str], drop_tombstones: bool) -> List[str]:
+        segments = [Segment(os.path.join(self.directory, name)) for name in names]
+        try:
+            snapshot = _Snapshot(0, segments)
+            owners = {}  # doc_id -> (segment, doc index) of its live version
+            for segment, live in zip(segments, snapshot.live):
+                for doc_index in live:
+                    owners[segment.doc_ids[doc_index]] = (segment, doc_index)
+            doc_ids = sorted(owners)
+            new_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+            postings: Dict[bytes, Dict[int, array]] = defaultdict(dict)
+            for segment in segments:
+                for term_index in range(segment.n_terms):
+                    term = segment.term(term_index)
+                    for doc_index, positions in segment.postings(term_index):
+                        doc_id = segment.doc_ids[doc_index]
+                        if owners.get(doc_id) == (segment, doc_index):
+                            postings[term][new_index[doc_id]] = array("I", positions)
+            lengths = [owners[doc_id][0].lengths[owners[doc_id][1]] for doc_id in doc_ids]
+            tombstones = [] if drop_tombstones else sorted(
+                {doc_id for segment in segments for doc_id in segment.tombstones} - set(owners)
+            )
+            name = self._new_segment_name(manifest)
+            _write(os.path.join(self.directory, name), doc_ids, lengths, tombstones, postings)
+        finally:
+            for segment in segments:
+                segment.close()
+        return [name]
+
+    def merge(self) -> bool:
+        """Merge the adjacent run of segments with the smallest total size, if there are too many."""
+        assert self.is_writer, "acquire() the index before writing"
+        manifest = self._read_manifest()
+        names = manifest["segments"]
+        if len(names) <= self.max_segments:
+            return False
+        run = min(4, len(names))
+        sizes = [os.path.getsize(os.path.join(self.directory, name)) for name in names]
+        start = min(range(len(names) - run + 1), key=lambda i: sum(sizes[i:i + run]))
+        window = names[start:start + run]
+        # Tombstones only shadow older segments; with none left they can go
+        merged = self._merge_files(manifest, window, drop_tombstones=start == 0)
+        self._commit(manifest, names[:start] + merged + names[start + run:], obsolete=window)
+        self.merges += 1
+        logger.info(f"Merged search segments {', '.join(window)} into {merged[0]}")
+        return True
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot()
+        return {
+            "directory": self.directory,
+            "writer": self.is_writer,
+            "generation": snapshot.generation,
+            "segments": [{"name": s.name, "docs": len(s), "bytes": s.size} for s in snapshot.segments],
+            "documents": snapshot.n_docs,
+            "searches": self.searches,
+            "merges": self.merges,
+        }
@@ -1,53 +1,184 @@
 import os
+import queue
 import shutil
+import threading
+import time
+import logging
 from datetime import datetime
+from typing import Iterable, Iterator, Tuple, Union
 from fastapi import UploadFile
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+_upload_path = None
+_partial_path = None
+
 def get_upload_path() -> str:
     """Get the upload directory path and create it if it doesn't exist."""
-    upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), settings.UPLOAD_DIR)
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-    return upload_dir
-
-def save_upload_file(upload_file: UploadFile, report_id: int) -> str:
-    """Save an uploaded file and return its path."""
-    # Create year/month based directory structure
+    global _upload_path
+    if _upload_path is None:
+        upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), settings.UPLOAD_DIR)
+        os.makedirs(upload_dir, exist_ok=True)
+        _upload_path = upload_dir
+    return _upload_path
+
+def get_partial_path() -> str:
+    """Directory for unfinished resumable uploads, outside the served upload tree."""
+    global _partial_path
+    if _partial_path is None:
+        partial_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), settings.UPLOAD_PARTIAL_DIR)
+        os.makedirs(partial_dir, exist_ok=True)
+        _partial_path = partial_dir
+    return _partial_path
+
+def upload_relative_path(folder: Union[int, str], filename: str) -> str:
+    """Where a new upload goes: year/month/<folder>/<filename>."""
     now = datetime.now()
-    relative_path = os.path.join(
-        str(now.year),
-        f"{now.month:02d}",
-        f"{report_id}"
-    )
-    
-    upload_dir = os.path.join(get_upload_path(), relative_path)
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-    
+    return os.path.join(str(now.year), f"{now.month:02d}", str(folder), filename)
+
+def save_upload_file(upload_file: UploadFile, folder: Union[int, str]) -> str:
+    """Save an uploaded file under year/month/<folder> and return its relative path."""
+    relative_path = upload_relative_path(folder, upload_file.filename)
+    file_path = os.path.join(get_upload_path(), relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
     # Save the file
-    file_path = os.path.join(upload_dir, upload_file.filename)
     with open(file_path, "wb") as buffer:
         shutil.copyfileobj(upload_file.file, buffer)
-    
+
     # Return the relative path from the upload directory
-    return os.path.join(relative_path, upload_file.filename)
+    return relative_path
 
-def delete_upload_file(file_path: str) -> bool:
+def move_into_uploads(source: str, relative_path: str) -> None:
+    """Rename a finished file into the upload tree (no copy: same filesystem)."""
+    file_path = os.path.join(get_upload_path(), relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.replace(source, file_path)
+
+def prune_empty_dirs(dir_paths: Iterable[str]) -> None:
+    """Remove empty directories (and then-empty parents) below the upload root."""
+    root = get_upload_path()
+    # Deepest first, so children are gone before their parents are checked
+    for dir_path in sorted(set(dir_paths), key=len, reverse=True):
+        while dir_path.startswith(root + os.sep):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                break  # Not empty (or already gone)
+            dir_path = os.path.dirname(dir_path)
+
+def delete_upload_file(file_path: str, prune_dirs: bool = True) -> bool:
     """Delete an uploaded file."""
     try:
         full_path = os.path.join(get_upload_path(), file_path)
         if os.path.exists(full_path):
             os.remove(full_path)
-            # Try to remove empty parent directories
-            dir_path = os.path.dirname(full_path)
-            while dir_path != get_upload_path():
-                if len(os.listdir(dir_path)) == 0:
-                    os.rmdir(dir_path)
-                    dir_path = os.path.dirname(dir_path)
-                else:
-                    break
+            if prune_dirs:
+                prune_empty_dirs([os.path.dirname(full_path)])
         return True
     except Exception as e:
-        print(f"Error deleting file: {e}")
+        logger.error(f"Error deleting file {file_path}: {e}")
         return False
+
+def delete_upload_files(file_paths: Iterable[str]) -> int:
+    """Delete many uploaded files, pruning emptied directories once at the end."""
+    deleted, dirs = 0, set()
+    for file_path in file_paths:
+        if delete_upload_file(file_path, prune_dirs=False):
+            deleted += 1
+            dirs.add(os.path.dirname(os.path.join(get_upload_path(), file_path)))
+    prune_empty_dirs(dirs)
+    return deleted
+
+def iter_upload_files(root: str = None) -> Iterator[Tuple[str, float]]:
+    """Yield (relative path, mtime) for every uploaded file in byte-wise path order.
+
+    Directories are visited as if their name ended in the separator, so the
+    output is sorted exactly like the relative path strings; this lets it be
+    merge-joined against `ORDER BY file_path` without holding the tree in memory.
+    """
+    root = root or get_upload_path()
+
+    def walk(dir_path: str, prefix: str) -> Iterator[Tuple[str, float]]:
+        try:
+            entries = list(os.scandir(dir_path))
+        except FileNotFoundError:
+            return
+        keyed = []
+        for entry in entries:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            keyed.append((entry.name + os.sep if is_dir else entry.name, entry, is_dir))
+        for key, entry, is_dir in sorted(keyed, key=lambda item: item[0].encode()):
+            relative = prefix + entry.name
+            if is_dir:
+                yield from walk(entry.path, relative + os.sep)
+            elif entry.is_file(follow_symlinks=False):
+                yield relative, entry.stat(follow_symlinks=False).st_mtime
+
+    yield from walk(root, "")
+
+
+class FileDeletionQueue:
+    """Background deletion of uploaded files.
+
+    Request handlers enqueue paths after their transaction commits and return
+    immediately; a worker thread deletes them in batches, pausing between
+    batches to limit IO pressure. Anything lost in a crash is picked up later
+    by the orphan reconciler (app.services.file_gc).
+    """
+
+    def __init__(self, batch_size: int = 100, pause: float = 0.05):
+        self.batch_size = batch_size
+        self.pause = pause
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.deleted = 0
+
+    def enqueue(self, file_paths: Iterable[str]) -> None:
+        for file_path in file_paths:
+            self._queue.put(file_path)
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="file-deletion", daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, block: bool) -> list:
+        batch = []
+        try:
+            batch.append(self._queue.get(block=block, timeout=1 if block else None))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch(block=True)
+            if not batch:
+                continue
+            self.deleted += delete_upload_files(batch)
+            for _ in batch:
+                self._queue.task_done()
+            time.sleep(self.pause)
+
+    def drain(self) -> None:
+        """Delete everything still queued in the calling thread (used at shutdown)."""
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return
+            self.deleted += delete_upload_files(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {"pending": self._queue.qsize(), "deleted": self.deleted}
+
+
+deletion_queue = FileDeletionQueue()
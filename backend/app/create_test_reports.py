@@ -114,7 +114,7 @@ def create_test_reports(db: Session, user_id: int, count: int = 25):
 
 def main():
     # Get the test user
-    db = next(get_db())
+    db = SessionLocal()
     user = db.query(User).filter(User.email == "test@example.com").first()
     
     if not user:
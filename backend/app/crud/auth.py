@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
 from app.models.base import User
 from app.core.security import get_password_hash
 from app.schemas.user import UserCreate
+from app.core.events import event_bus
+
+# Looked up on every authenticated request (get_current_user)
+GET_USER = select(User).where(User.id == bindparam("user_id")).limit(1)
 
 def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+    return db.execute(GET_USER, {"user_id": user_id}).scalars().first()
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
@@ -22,6 +27,8 @@ def create_user(db: Session, user: UserCreate):
         role=user.role
     )
     db.add(db_user)
+    db.flush()
+    event_bus.publish(db, "user.created", {"id": db_user.id, "username": db_user.username, "full_name": db_user.full_name})
     db.commit()
     db.refresh(db_user)
     return db_user
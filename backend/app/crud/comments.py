@@ -1,9 +1,28 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from typing import List, Optional
+from datetime import datetime
 
 from app.models.base import Comment, User
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
+from app.core.cache import response_cache, comments_resource, report_resource
+from app.core.events import event_bus
+
+# Hot-path statements, built once so only their parameters change per call
+GET_COMMENT = select(Comment).where(Comment.id == bindparam("comment_id")).limit(1)
+
+_TOP_LEVEL_COMMENTS = select(Comment).where(
+    Comment.report_id == bindparam("report_id"), Comment.parent_id.is_(None)
+)
+REPORT_COMMENTS = _TOP_LEVEL_COMMENTS.offset(bindparam("skip")).limit(bindparam("limit"))
+REPORT_COMMENTS_SINCE = (
+    _TOP_LEVEL_COMMENTS.where(Comment.created_at >= bindparam("since"))
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+def _comment_event(comment: Comment) -> dict:
+    return CommentResponse.model_validate(comment).model_dump(mode="json")
 
 def create_comment(db: Session, comment: CommentCreate, current_user: User) -> Comment:
     """Create a new comment."""
@@ -14,33 +33,51 @@ def create_comment(db: Session, comment: CommentCreate, current_user: User) -> C
         parent_id=comment.parent_id
     )
     db.add(db_comment)
+    db.flush()
+    event_bus.publish(db, "comment.created", _comment_event(db_comment))
     db.commit()
+    response_cache.invalidate(comments_resource(db_comment.report_id))
+    response_cache.invalidate(report_resource(db_comment.report_id))  # Its comment_count changed
     db.refresh(db_comment)
     return db_comment
 
 def get_comment(db: Session, comment_id: int) -> Optional[Comment]:
     """Get a comment by ID."""
-    return db.query(Comment).filter(Comment.id == comment_id).first()
-
-def get_report_comments(db: Session, report_id: int, skip: int = 0, limit: int = 50) -> List[Comment]:
-    """Get all top-level comments for a report."""
-    return (
-        db.query(Comment)
-        .filter(Comment.report_id == report_id, Comment.parent_id.is_(None))
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    return db.execute(GET_COMMENT, {"comment_id": comment_id}).scalars().first()
+
+def get_report_comments(
+    db: Session,
+    report_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    since: Optional[datetime] = None
+) -> List[Comment]:
+    """Get all top-level comments for a report.
+
+    Pass the report's ``created_at`` as ``since``: no comment predates its
+    report, and the bound lets Postgres skip older partitions. (It is not
+    applied elsewhere: SQLite compares timestamps as text.)
+    """
+    params = {"report_id": report_id, "skip": skip, "limit": limit}
+    if since is not None and db.bind.dialect.name == "postgresql":
+        return list(db.execute(REPORT_COMMENTS_SINCE, {**params, "since": since}).scalars())
+    return list(db.execute(REPORT_COMMENTS, params).scalars())
 
 def update_comment(db: Session, db_comment: Comment, comment: CommentUpdate) -> Comment:
     """Update a comment."""
     for field, value in comment.dict(exclude_unset=True).items():
         setattr(db_comment, field, value)
+    db.flush()
+    event_bus.publish(db, "comment.updated", _comment_event(db_comment))
     db.commit()
+    response_cache.invalidate(comments_resource(db_comment.report_id))
     db.refresh(db_comment)
     return db_comment
 
 def delete_comment(db: Session, db_comment: Comment) -> None:
     """Delete a comment."""
+    event_bus.publish(db, "comment.deleted", {"id": db_comment.id, "report_id": db_comment.report_id})
     db.delete(db_comment)
     db.commit()
+    response_cache.invalidate(comments_resource(db_comment.report_id))
+    response_cache.invalidate(report_resource(db_comment.report_id))
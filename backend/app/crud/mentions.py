@@ -1,8 +1,10 @@
 # app/crud/mentions.py
 from sqlalchemy.orm import Session
 from app.models.base import Mention, User
+from app.core.events import event_bus
 from app.schemas.mention import MentionCreate
 from typing import Optional, List
+from datetime import datetime
 import re
 
 def extract_mentions(text: str) -> list[str]:
@@ -17,7 +19,7 @@ def create_mentions(
     report_id: Optional[int] = None,
     comment_id: Optional[int] = None
 ) -> list[Mention]:
-    from app.crud.user import get_user_by_username  # Import here to avoid circular imports
+    from app.crud.auth import get_user_by_username  # Import here to avoid circular imports
     
     mentions = []
     for username in usernames:
@@ -30,18 +32,42 @@ def create_mentions(
             )
             db.add(mention)
             mentions.append(mention)
-    
+
+    if mentions:
+        db.flush()
+        for mention in mentions:
+            event_bus.publish(db, "mention.created", {
+                "id": mention.id,
+                "user_id": mention.user_id,
+                "report_id": mention.report_id,
+                "comment_id": mention.comment_id,
+            })
     db.commit()
     return mentions
 
+def resolve_mentions(db: Session, text: str) -> list[str]:
+    """Return the usernames mentioned in text that belong to existing users."""
+    usernames = extract_mentions(text)
+    if not usernames:
+        return []
+    rows = db.query(User.username).filter(User.username.in_(usernames)).all()
+    return [row.username for row in rows]
+
 def get_mentions_for_entity(
     db: Session,
     report_id: Optional[int] = None,
-    comment_id: Optional[int] = None
+    comment_id: Optional[int] = None,
+    since: Optional[datetime] = None
 ) -> List[Mention]:
+    """Get mentions in a report or comment.
+
+    ``since`` (the entity's created_at) lets Postgres prune older partitions.
+    """
     query = db.query(Mention)
     if report_id:
         query = query.filter(Mention.report_id == report_id)
     if comment_id:
         query = query.filter(Mention.comment_id == comment_id)
+    if since is not None and db.bind.dialect.name == "postgresql":
+        query = query.filter(Mention.created_at >= since)
     return query.all()
\ No newline at end of file
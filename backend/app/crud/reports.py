@@ -1,67 +1,342 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload, undefer_group
+from sqlalchemy import bindparam, desc, select, func, literal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
 from app.models.base import Report, User, Attachment
 from app.schemas.report import ReportCreate, ReportUpdate
-from app.core.storage import save_upload_file, delete_upload_file
+from app.core.storage import deletion_queue
+from app.core.cache import response_cache, report_resource, comments_resource
+from app.core.events import event_bus
+from app.crud.revisions import record_revision
+from app.services.project_service import report_visibility_filter
+from app.services import search as search_service
+
+# Hot-path statements are built once at import: SQLAlchemy reuses their
+# compiled SQL and each call only binds parameters. Filtered lists are
+# still built per request.
+GET_REPORT = (
+    select(Report)
+    .options(undefer_group("content"))
+    .where(Report.id == bindparam("report_id"))
+    .limit(1)
+)
+
+REPORT_VERSION = (
+    select(
+        Report.id,
+        Report.user_id,
+        Report.created_at,
+        Report.updated_at,
+        Report.comment_count,
+        Report.last_activity_at,
+        User.username,
+        User.email,
+        User.full_name,
+        User.role,
+        User.is_active,
+        User.is_superuser,
+        func.count(Attachment.id),
+        func.max(Attachment.id),
+    )
+    .outerjoin(User, User.id == Report.user_id)
+    .outerjoin(Attachment, Attachment.report_id == Report.id)
+    .where(Report.id == bindparam("report_id"))
+    .group_by(Report.id, User.id)
+)
+
+def _report_event(report: Report) -> dict:
+    return {"id": report.id, "user_id": report.user_id, "project": report.project}
 
 def create_report(db: Session, report: ReportCreate, user: User) -> Report:
     """Create a new report."""
     db_report = Report(
         title=report.title,
         content=report.content,
+        project=report.project,
         user_id=user.id
     )
     db.add(db_report)
+    db.flush()
+    record_revision(db, db_report, user.id)
+    event_bus.publish(db, "report.created", _report_event(db_report))
     db.commit()
     db.refresh(db_report)
     return db_report
 
 def get_report(db: Session, report_id: int) -> Optional[Report]:
     """Get a specific report by ID."""
-    return db.query(Report).filter(Report.id == report_id).first()
+    return db.execute(GET_REPORT, {"report_id": report_id}).scalars().first()
+
+def get_report_version(db: Session, report_id: int) -> Optional[tuple]:
+    """Get the version of a report: its row, attachment set and author.
+
+    Returns None if the report does not exist; the second element is the
+    owner's user id so callers can check permissions without loading the report.
+    """
+    row = db.execute(REPORT_VERSION, {"report_id": report_id}).first()
+    return tuple(row) if row else None
+
+def get_reports_batch(
+    db: Session,
+    user: User,
+    report_ids: Sequence[int],
+    fields: Sequence[str]
+) -> Tuple[Dict[int, Report], Dict[int, int]]:
+    """Load the reports among ``report_ids`` that ``user`` may see in one IN query.
+
+    Only what ``fields`` needs is loaded: the body for "content", authors
+    and attachments with one extra query each. Returns the visible reports
+    by id, and an HTTP status (403 or 404) for each id that was not returned.
+    """
+    options = []
+    if "content" in fields:
+        options.append(undefer_group("content"))
+    if "user" in fields:
+        options.append(selectinload(Report.user).selectinload(User.projects))
+    if "attachments" in fields:
+        options.append(selectinload(Report.attachments))
+    stmt = (
+        select(Report)
+        .options(*options)
+        .where(Report.id.in_(report_ids), report_visibility_filter(user))
+    )
+    found = {report.id: report for report in db.execute(stmt).scalars()}
+
+    errors = {}
+    missing = set(report_ids) - found.keys()
+    if missing:
+        existing = set(db.execute(select(Report.id).where(Report.id.in_(missing))).scalars())
+        errors = {report_id: 403 if report_id in existing else 404 for report_id in missing}
+    return found, errors
+
+def suggest_report_titles(
+    db: Session,
+    user: User,
+    query: str,
+    limit: int,
+    min_similarity: float
+) -> List[tuple]:
+    """Candidate reports for a title typeahead, best matches first.
+
+    Returns (id, title, project, created_at, similarity) rows for reports
+    ``user`` may see. On PostgreSQL, titles are matched with pg_trgm's
+    word similarity (``query <% title``), which the trigram GIN index on
+    reports.title serves and which tolerates typos; queries under three
+    characters have too few trigrams and match title prefixes instead,
+    newest first. Other databases get the most recent visible titles with
+    a similarity of 0 for the caller to score.
+    """
+    visible = report_visibility_filter(user)
+    columns = (Report.id, Report.title, Report.project, Report.created_at)
+    if db.bind.dialect.name != "postgresql":
+        stmt = select(*columns, literal(0.0)).where(visible).order_by(desc(Report.created_at)).limit(limit)
+        return [tuple(row) for row in db.execute(stmt)]
+
+    if len(query) < 3:
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = (
+            select(*columns, literal(1.0))
+            .where(Report.title.ilike(f"{pattern}%", escape="\\"), visible)
+            .order_by(desc(Report.created_at))
+            .limit(limit)
+        )
+        return [tuple(row) for row in db.execute(stmt)]
+
+    # The operator compares against this setting, for this transaction only
+    db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(min_similarity), True))
+    )
+    similarity = func.word_similarity(query, Report.title)
+    stmt = (
+        select(*columns, similarity)
+        .where(Report.title.op("%>")(query), visible)
+        .order_by(similarity.desc(), desc(Report.created_at))
+        .limit(limit)
+    )
+    return [tuple(row) for row in db.execute(stmt)]
+
+def list_criteria(
+    user: User,
+    search: Optional[str] = None,
+    project: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    updated_since: Optional[datetime] = None,
+    db: Optional[Session] = None
+) -> list:
+    """WHERE clauses for a report list.
+
+    Without a project this is the user's own reports; with one it is every
+    report in that project the user may see. Creation dates are filtered as
+    ``created_from <= created_at < created_to``; ``updated_since`` matches
+    reports created or edited at or after that time. ``search`` matches
+    title substrings, or, once the embedded index is built
+    (app.services.search) and given ``db``, every word of the title, body
+    or comments of the best SEARCH_MAX_RESULTS of the listed reports.
+    """
+    if project:
+        criteria = [Report.project == project, report_visibility_filter(user)]
+    else:
+        criteria = [Report.user_id == user.id]
+    if created_from:
+        criteria.append(Report.created_at >= created_from)
+    if created_to:
+        criteria.append(Report.created_at < created_to)
+    if updated_since:
+        criteria.append(func.coalesce(Report.updated_at, Report.created_at) >= updated_since)
+    if search:
+        if db is not None and search_service.active():
+            criteria.append(Report.id.in_(_search_ids(db, search, criteria)))
+        else:
+            criteria.append(Report.title.ilike(f"%{search}%"))
+    return criteria
+
+def _search_ids(db: Session, search: str, criteria: list) -> List[int]:
+    """The reports matching the other ``criteria`` that best match ``search``, best first."""
+    listed = set(db.execute(select(Report.id).where(*criteria)).scalars())
+    return search_service.search_report_ids(search, listed)
+
+def _version_statement(criteria: list):
+    # Comment and attachment changes show up in the counters, and additions
+    # also in last_activity_at, so the reports table alone versions a list
+    return select(
+        func.count(Report.id),
+        func.max(Report.id),
+        func.max(func.coalesce(Report.updated_at, Report.created_at)),
+        func.max(Report.last_activity_at),
+        func.coalesce(func.sum(Report.comment_count), 0),
+        func.coalesce(func.sum(Report.attachment_count), 0),
+    ).where(*criteria)
+
+# List orders: newest first, or most recently active first
+REPORT_SORTS = {"created": Report.created_at, "activity": Report.last_activity_at}
+
+# The unfiltered "my reports" page, by far the most requested list
+OWN_REPORTS = {
+    sort: (
+        select(Report)
+        .where(Report.user_id == bindparam("user_id"))
+        .order_by(desc(column))
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+    for sort, column in REPORT_SORTS.items()
+}
+OWN_REPORTS_VERSION = _version_statement([Report.user_id == bindparam("user_id")])
+
+def _filtered(filters: dict) -> bool:
+    return any(value is not None for value in filters.values())
+
+def get_user_reports_version(db: Session, user: User, **filters) -> tuple:
+    """Get the collection version of a user's (optionally filtered) reports.
+
+    The first element is the number of matching reports, so the version query
+    doubles as the total count for a list page. ``filters`` are the list
+    filters (search, project, created_from, created_to, updated_since).
+    """
+    if _filtered(filters):
+        stmt, params = _version_statement(list_criteria(user, db=db, **filters)), {}
+    else:
+        stmt, params = OWN_REPORTS_VERSION, {"user_id": user.id}
+    return tuple(db.execute(stmt, params).one())
 
 def get_user_reports(
     db: Session,
     user: User,
     skip: int = 0,
     limit: int = 10,
-    search: Optional[str] = None
+    sort: str = "created",
+    with_content: bool = False,
+    **filters
 ) -> List[Report]:
-    """Get all reports for a user with pagination and search."""
-    query = db.query(Report).filter(Report.user_id == user.id)
-    
-    if search:
-        query = query.filter(Report.title.ilike(f"%{search}%"))
-    
-    return query.order_by(desc(Report.created_at)).offset(skip).limit(limit).all()
+    """Get all reports for a user, or a project, with pagination and filters.
 
-def get_reports_count(db: Session, user: User, search: Optional[str] = None) -> int:
-    """Get total count of user's reports."""
-    query = db.query(Report).filter(Report.user_id == user.id)
-    if search:
-        query = query.filter(Report.title.ilike(f"%{search}%"))
-    return query.count()
+    ``sort`` is a key of REPORT_SORTS, or "relevance" to rank a search
+    by the embedded index (newest first when there is none). The bodies
+    are only loaded, in the same query, ``with_content``.
+    """
+    options = [undefer_group("content")] if with_content else []
+    if sort == "relevance":
+        if filters.get("search") and search_service.active():
+            return _reports_by_relevance(db, user, skip, limit, options, **filters)
+        sort = "created"
+    if not _filtered(filters):
+        params = {"user_id": user.id, "skip": skip, "limit": limit}
+        return list(db.execute(OWN_REPORTS[sort].options(*options), params).scalars())
+    query = user_reports_query(db, user, sort, **filters).options(*options)
+    return query.offset(skip).limit(limit).all()
+
+def _reports_by_relevance(db: Session, user: User, skip: int, limit: int, options: list, **filters) -> List[Report]:
+    search = filters.pop("search")
+    page = _search_ids(db, search, list_criteria(user, **filters))[skip:skip + limit]
+    stmt = select(Report).options(*options).where(Report.id.in_(page))
+    reports = {report.id: report for report in db.execute(stmt).scalars()}
+    return [reports[report_id] for report_id in page if report_id in reports]
+
+def user_reports_query(db: Session, user: User, sort: str = "created", **filters):
+    """Query for a filtered report list, newest or most recently active first."""
+    query = db.query(Report).filter(*list_criteria(user, db=db, **filters))
+    # Newest first on the partition key: Postgres walks the monthly
+    # partitions in order and stops once the page is full. By activity it
+    # merges each partition's (user_id|project, last_activity_at) index.
+    return query.order_by(desc(REPORT_SORTS[sort]))
+
+def iter_user_reports(db: Session, user: User, batch_size: int = 200, **filters) -> Iterator[Report]:
+    """Stream all of a user's (optionally filtered) reports, newest first, in batches."""
+    stmt = (
+        select(Report)
+        .options(undefer_group("content"))
+        .where(*list_criteria(user, db=db, **filters))
+        .order_by(desc(Report.created_at))
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt).scalars()
+
+def get_reports_count(db: Session, user: User, **filters) -> int:
+    """Get total count of user's (optionally filtered) reports."""
+    return db.query(Report).filter(*list_criteria(user, db=db, **filters)).count()
 
 def update_report(
     db: Session,
     db_report: Report,
-    report_update: ReportUpdate
+    report_update: ReportUpdate,
+    user_id: Optional[int] = None
 ) -> Report:
-    """Update a report."""
+    """Update a report, recording a new revision if its title or content changed."""
+    # Reload under the row lock (a no-op on SQLite), so concurrent edits are
+    # numbered and diffed one after the other
+    db.refresh(db_report, with_for_update=True)
+    previous_title, previous_content = db_report.title, db_report.content
     for field, value in report_update.dict(exclude_unset=True).items():
         setattr(db_report, field, value)
+    db_report.last_activity_at = func.now()
+    if (db_report.title, db_report.content) != (previous_title, previous_content):
+        record_revision(db, db_report, user_id, previous_content, previous_title)
+    event_bus.publish(db, "report.updated", _report_event(db_report))
     db.commit()
+    response_cache.invalidate(report_resource(db_report.id))
+    # Cached comment pages carry the project they are authorized against
+    response_cache.invalidate(comments_resource(db_report.id))
     db.refresh(db_report)
     return db_report
 
 def delete_report(db: Session, db_report: Report) -> None:
-    """Delete a report and its attachments."""
-    # Delete all attachments first
-    for attachment in db_report.attachments:
-        delete_upload_file(attachment.file_path)
+    """Delete a report and its attachments.
+
+    Files are removed in the background once the rows are gone.
+    """
+    file_paths = [attachment.file_path for attachment in db_report.attachments]
+    event_bus.publish(db, "report.deleted", _report_event(db_report))
     db.delete(db_report)
     db.commit()
+    deletion_queue.enqueue(file_paths)
+    response_cache.invalidate(report_resource(db_report.id))
+    response_cache.invalidate(comments_resource(db_report.id))
+
+def invalidate_author_reports(db: Session, user_id: int) -> None:
+    """Retire the cached reports of a user whose details (embedded as the author) changed."""
+    for report_id in db.execute(select(Report.id).where(Report.user_id == user_id)).scalars():
+        response_cache.invalidate(report_resource(report_id))
 
 def create_attachment(
     db: Session,
@@ -78,12 +353,16 @@ def create_attachment(
         report_id=report.id
     )
     db.add(attachment)
+    event_bus.publish(db, "report.updated", _report_event(report))
     db.commit()
+    response_cache.invalidate(report_resource(report.id))
     db.refresh(attachment)
     return attachment
 
 def delete_attachment(db: Session, attachment: Attachment) -> None:
     """Delete an attachment."""
-    delete_upload_file(attachment.file_path)
+    event_bus.publish(db, "report.updated", {"id": attachment.report_id})
     db.delete(attachment)
     db.commit()
+    deletion_queue.enqueue([attachment.file_path])
+    response_cache.invalidate(report_resource(attachment.report_id))
@@ -0,0 +1,176 @@
+import difflib
+import json
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.base import Report, ReportRevision
+
+
+def make_delta(old: str, new: str) -> str:
+    """Encode new as a compact line delta against old.
+
+    The delta is a JSON list of ops applied to old's lines in order: a
+    positive int copies that many lines, a negative int skips that many,
+    and a list of strings inserts those lines.
+    """
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return json.dumps(ops, separators=(",", ":"))
+
+
+def apply_delta(old: str, delta: str) -> str:
+    """Rebuild a revision's content from its predecessor and delta."""
+    lines = old.splitlines(keepends=True)
+    out = []
+    pos = 0
+    for op in json.loads(delta):
+        if isinstance(op, list):
+            out.extend(op)
+        elif op > 0:
+            out.extend(lines[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def _latest_revision(db: Session, report_id: int) -> Optional[ReportRevision]:
+    return (
+        db.query(ReportRevision)
+        .filter(ReportRevision.report_id == report_id)
+        .order_by(ReportRevision.revision.desc())
+        .first()
+    )
+
+
+def _chain_length(db: Session, report_id: int, revision: int) -> int:
+    """Number of deltas stacked on the latest snapshot at or below revision."""
+    last_snapshot = (
+        db.query(func.max(ReportRevision.revision))
+        .filter(
+            ReportRevision.report_id == report_id,
+            ReportRevision.is_snapshot.is_(True),
+            ReportRevision.revision <= revision,
+        )
+        .scalar()
+    )
+    return revision - (last_snapshot or 0)
+
+
+def record_revision(
+    db: Session,
+    report: Report,
+    user_id: Optional[int],
+    previous_content: Optional[str] = None,
+    previous_title: Optional[str] = None
+) -> ReportRevision:
+    """Add a revision for the report's current title/content (not committed).
+
+    A full snapshot is stored for the first revision, whenever the delta
+    chain would exceed REVISION_MAX_DELTA_CHAIN, and when the delta is not
+    meaningfully smaller than the content; otherwise a line delta against
+    the latest stored revision is stored. Reports that predate revision
+    history get ``previous_content`` recorded as a snapshot first. The caller
+    must hold the report's row lock, or concurrent edits race for numbers.
+    """
+    latest = _latest_revision(db, report.id)
+    if latest is None and previous_content is not None:
+        latest = ReportRevision(
+            report_id=report.id,
+            revision=1,
+            user_id=report.user_id,
+            title=previous_title or report.title,
+            is_snapshot=True,
+            data=previous_content
+        )
+        db.add(latest)
+        db.flush()
+
+    number = latest.revision + 1 if latest else 1
+    revision = ReportRevision(report_id=report.id, revision=number, user_id=user_id, title=report.title)
+
+    if latest is None or _chain_length(db, report.id, latest.revision) + 1 > settings.REVISION_MAX_DELTA_CHAIN:
+        revision.is_snapshot, revision.data = True, report.content
+    else:
+        stored = get_revision_content(db, report.id, latest.revision)
+        delta = make_delta(stored[1], report.content) if stored else None
+        if delta is None or len(delta) * 2 > len(report.content):
+            revision.is_snapshot, revision.data = True, report.content
+        else:
+            revision.is_snapshot, revision.data = False, delta
+
+    db.add(revision)
+    return revision
+
+
+def list_revisions(db: Session, report_id: int) -> List[ReportRevision]:
+    """Get revision metadata for a report, newest first."""
+    return (
+        db.query(ReportRevision)
+        .filter(ReportRevision.report_id == report_id)
+        .order_by(ReportRevision.revision.desc())
+        .all()
+    )
+
+
+def get_revision_content(db: Session, report_id: int, revision: int) -> Optional[Tuple[str, str]]:
+    """Reconstruct (title, content) of a revision from its snapshot and deltas.
+
+    Reads at most REVISION_MAX_DELTA_CHAIN + 1 rows.
+    """
+    base = (
+        db.query(ReportRevision)
+        .filter(
+            ReportRevision.report_id == report_id,
+            ReportRevision.is_snapshot.is_(True),
+            ReportRevision.revision <= revision,
+        )
+        .order_by(ReportRevision.revision.desc())
+        .first()
+    )
+    if base is None:
+        return None
+
+    deltas = (
+        db.query(ReportRevision)
+        .filter(
+            ReportRevision.report_id == report_id,
+            ReportRevision.revision > base.revision,
+            ReportRevision.revision <= revision,
+        )
+        .order_by(ReportRevision.revision)
+        .all()
+    )
+    if base.revision + len(deltas) != revision:
+        return None
+
+    title, content = base.title, base.data
+    for delta in deltas:
+        title = delta.title
+        content = delta.data if delta.is_snapshot else apply_delta(content, delta.data)
+    return title, content
+
+
+def diff_revisions(db: Session, report_id: int, from_revision: int, to_revision: int) -> Optional[str]:
+    """Unified diff between two revisions' content."""
+    old = get_revision_content(db, report_id, from_revision)
+    new = get_revision_content(db, report_id, to_revision)
+    if old is None or new is None:
+        return None
+    return "".join(difflib.unified_diff(
+        old[1].splitlines(keepends=True),
+        new[1].splitlines(keepends=True),
+        fromfile=f"revision {from_revision}",
+        tofile=f"revision {to_revision}",
+    ))
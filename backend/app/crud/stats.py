@@ -0,0 +1,66 @@
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.base import DailyActivity, User
+from app.services.project_service import activity_visibility_filter
+from app.services.rollups import COUNTERS
+
+GROUPINGS = ("user", "project", "day", "month")
+
+def get_activity(
+    db: Session,
+    viewer: User,
+    group_by: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    project: Optional[str] = None,
+    user_id: Optional[int] = None
+) -> List[dict]:
+    """Sum the activity rollups visible to ``viewer``, grouped by user, project, day or month.
+
+    ``date_from`` and ``date_to`` are inclusive. Months are folded from daily
+    sums here, which keeps the SQL portable.
+    """
+    if group_by == "user":
+        key = User.username
+    elif group_by == "project":
+        key = DailyActivity.project
+    else:
+        key = DailyActivity.day
+
+    stmt = (
+        select(key, *(func.sum(getattr(DailyActivity, counter)) for counter in COUNTERS))
+        .where(activity_visibility_filter(viewer))
+        .group_by(key)
+        .order_by(key)
+    )
+    if group_by == "user":
+        stmt = stmt.join(User, User.id == DailyActivity.user_id)
+    if date_from:
+        stmt = stmt.where(DailyActivity.day >= date_from)
+    if date_to:
+        stmt = stmt.where(DailyActivity.day <= date_to)
+    if project is not None:
+        stmt = stmt.where(DailyActivity.project == project)
+    if user_id is not None:
+        stmt = stmt.where(DailyActivity.user_id == user_id)
+
+    buckets = defaultdict(lambda: [0] * len(COUNTERS))
+    for row in db.execute(stmt):
+        if group_by == "month":
+            label = f"{row[0]:%Y-%m}"
+        elif group_by == "day":
+            label = row[0].isoformat()
+        else:
+            label = row[0]
+        for index, value in enumerate(row[1:]):
+            buckets[label][index] += value or 0
+
+    return [
+        {"key": label, **dict(zip(COUNTERS, counts))}
+        for label, counts in buckets.items()
+        if any(counts)
+    ]
@@ -0,0 +1,228 @@
+"""Resumable attachment uploads: sessions, received chunks and completion.
+
+The bytes live in a preallocated file per session under UPLOAD_PARTIAL_DIR
+(see app.core.storage); chunks are written into it in place by
+app.routers.uploads, and these functions keep the database side in step.
+"""
+import hashlib
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.storage import get_partial_path, get_upload_path, move_into_uploads, upload_relative_path
+from app.crud.reports import create_attachment
+from app.models.base import Attachment, Report, UploadChunk, UploadSession, User
+from app.schemas.upload import UploadCreate
+
+logger = logging.getLogger(__name__)
+
+def partial_file(upload_id: str) -> str:
+    return os.path.join(get_partial_path(), upload_id)
+
+def _expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+
+def is_expired(upload: UploadSession) -> bool:
+    expires_at = upload.expires_at
+    if expires_at.tzinfo is None:  # SQLite
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+def create_upload(db: Session, user: User, report: Report, upload_in: UploadCreate) -> UploadSession:
+    """Open an upload session and preallocate its file."""
+    upload = UploadSession(
+        id=secrets.token_hex(16),
+        user_id=user.id,
+        report_id=report.id,
+        filename=os.path.basename(upload_in.filename),
+        content_type=upload_in.content_type,
+        size=upload_in.size,
+        chunk_size=upload_in.chunk_size,
+        sha256=upload_in.sha256,
+        expires_at=_expiry()
+    )
+    # Sparse until chunks arrive; a file left by a failed commit is
+    # removed by remove_stray_partials
+    with open(partial_file(upload.id), "wb") as f:
+        f.truncate(upload.size)
+    db.add(upload)
+    db.commit()
+    return upload
+
+def get_upload(db: Session, upload_id: str) -> Optional[UploadSession]:
+    return db.get(UploadSession, upload_id)
+
+def received_chunks(db: Session, upload_id: str) -> List[int]:
+    stmt = (
+        select(UploadChunk.index)
+        .where(UploadChunk.session_id == upload_id, UploadChunk.claimed_at.is_(None))
+        .order_by(UploadChunk.index)
+    )
+    return list(db.execute(stmt).scalars())
+
+def count_received_chunks(db: Session, upload_id: str) -> int:
+    stmt = (
+        select(func.count()).select_from(UploadChunk)
+        .where(UploadChunk.session_id == upload_id, UploadChunk.claimed_at.is_(None))
+    )
+    return db.execute(stmt).scalar()
+
+def get_chunk(db: Session, upload_id: str, index: int) -> Optional[UploadChunk]:
+    return db.get(UploadChunk, (upload_id, index))
+
+def _chunk(upload_id: str, index: int):
+    return (UploadChunk.session_id == upload_id, UploadChunk.index == index)
+
+def claim_chunk(db: Session, upload_id: str, index: int, sha256: str) -> Optional[datetime]:
+    """Claim a chunk index for writing, before any bytes are written.
+
+    Returns the claim's timestamp, which record_chunk and release_chunk
+    need, or None if the index is already stored or claimed by another
+    request. A claim older than UPLOAD_CHUNK_CLAIM_TIMEOUT (its request
+    died mid-write) is taken over.
+    """
+    claimed_at = datetime.now(timezone.utc)
+    db.add(UploadChunk(session_id=upload_id, index=index, sha256=sha256, claimed_at=claimed_at))
+    try:
+        db.commit()
+        return claimed_at
+    except IntegrityError:
+        db.rollback()
+    stale = claimed_at - timedelta(seconds=settings.UPLOAD_CHUNK_CLAIM_TIMEOUT)
+    taken = db.execute(
+        update(UploadChunk)
+        .where(*_chunk(upload_id, index), UploadChunk.claimed_at < stale)
+        .values(sha256=sha256, claimed_at=claimed_at)
+    ).rowcount
+    db.commit()
+    return claimed_at if taken else None
+
+def release_chunk(db: Session, upload_id: str, index: int, claimed_at: datetime) -> None:
+    """Give up a claim whose write failed, so the chunk can be sent again."""
+    db.rollback()
+    db.execute(delete(UploadChunk).where(*_chunk(upload_id, index), UploadChunk.claimed_at == claimed_at))
+    db.commit()
+
+def record_chunk(db: Session, upload_id: str, index: int, claimed_at: datetime) -> bool:
+    """Mark a claimed chunk as stored and extend the session's expiry.
+
+    Returns False, releasing the claim, if the session is no longer open;
+    also False if the claim was taken over meanwhile.
+    """
+    touched = db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == "open")
+        .values(expires_at=_expiry())
+    ).rowcount
+    if not touched:
+        release_chunk(db, upload_id, index, claimed_at)
+        return False
+    stored = db.execute(
+        update(UploadChunk)
+        .where(*_chunk(upload_id, index), UploadChunk.claimed_at == claimed_at)
+        .values(claimed_at=None)
+    ).rowcount
+    db.commit()
+    return bool(stored)
+
+def _set_status(db: Session, upload_id: str, old: str, new: str) -> bool:
+    claimed = db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == old)
+        .values(status=new)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+def claim_upload(db: Session, upload_id: str) -> bool:
+    """Move an open session to "completing"; False if another request got there first."""
+    return _set_status(db, upload_id, "open", "completing")
+
+def reopen_upload(db: Session, upload_id: str) -> None:
+    _set_status(db, upload_id, "completing", "open")
+
+def partial_sha256(upload_id: str) -> str:
+    digest = hashlib.sha256()
+    with open(partial_file(upload_id), "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _attachment_path(upload: UploadSession) -> str:
+    relative_path = upload_relative_path(upload.report_id, upload.filename)
+    if os.path.exists(os.path.join(get_upload_path(), relative_path)):
+        stem, ext = os.path.splitext(upload.filename)
+        relative_path = upload_relative_path(upload.report_id, f"{stem}-{upload.id[:8]}{ext}")
+    return relative_path
+
+def finish_upload(db: Session, upload: UploadSession, report: Report) -> Attachment:
+    """Move a claimed upload's file into the upload tree and attach it to ``report``.
+
+    The session is deleted in the attachment's transaction; if that fails
+    the file is moved back and the session reopened.
+    """
+    upload_id = upload.id
+    source = partial_file(upload_id)
+    with open(source, "rb+") as f:
+        os.fsync(f.fileno())
+    relative_path = _attachment_path(upload)
+    move_into_uploads(source, relative_path)
+    try:
+        db.execute(delete(UploadChunk).where(UploadChunk.session_id == upload_id))
+        db.delete(upload)
+        attachment = create_attachment(db, report, relative_path, upload.filename, upload.content_type)
+    except Exception:
+        db.rollback()
+        os.replace(os.path.join(get_upload_path(), relative_path), source)
+        reopen_upload(db, upload_id)
+        raise
+    logger.info(f"Upload {upload_id} attached to report {report.id} as {relative_path}")
+    return attachment
+
+def _remove_partial(upload_id: str) -> None:
+    try:
+        os.remove(partial_file(upload_id))
+    except FileNotFoundError:
+        pass
+
+def abort_upload(db: Session, upload: UploadSession) -> None:
+    """Discard a session and its file."""
+    db.execute(delete(UploadChunk).where(UploadChunk.session_id == upload.id))
+    db.delete(upload)
+    db.commit()
+    _remove_partial(upload.id)
+
+def expire_uploads(db: Session, batch_size: int = 500) -> int:
+    """Discard sessions idle for longer than UPLOAD_SESSION_TTL; returns how many."""
+    expired = 0
+    while True:
+        now = datetime.now(timezone.utc)
+        upload_ids = list(db.execute(
+            select(UploadSession.id).where(UploadSession.expires_at <= now).limit(batch_size)
+        ).scalars())
+        if not upload_ids:
+            return expired
+        db.execute(delete(UploadChunk).where(UploadChunk.session_id.in_(upload_ids)))
+        db.execute(delete(UploadSession).where(UploadSession.id.in_(upload_ids)))
+        db.commit()
+        for upload_id in upload_ids:
+            _remove_partial(upload_id)
+        expired += len(upload_ids)
+
+def remove_stray_partials(db: Session) -> int:
+    """Delete partial files older than UPLOAD_SESSION_TTL that no session owns."""
+    cutoff = datetime.now(timezone.utc).timestamp() - settings.UPLOAD_SESSION_TTL
+    removed = 0
+    for entry in os.scandir(get_partial_path()):
+        if entry.stat().st_mtime > cutoff or get_upload(db, entry.name) is not None:
+            continue
+        _remove_partial(entry.name)
+        removed += 1
+    return removed
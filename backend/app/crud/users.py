@@ -0,0 +1,107 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, or_, select, union_all
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timedelta, timezone
+
+from app.models.base import Comment, Mention, Report, User
+from app.core.security import get_password_hash
+from app.schemas.user import UserUpdate
+from app.core.events import event_bus
+from app.crud.reports import invalidate_author_reports
+
+def user_event(user: User) -> dict:
+    """What the suggestion index (app.services.user_suggest) needs to know about a user."""
+    return {"id": user.id, "username": user.username, "full_name": user.full_name, "is_active": user.is_active}
+
+def get_users(db: Session) -> List[User]:
+    return db.query(User).order_by(User.id).all()
+
+def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    """Update a user; returns None if there is no such user."""
+    db_user = db.get(User, user_id)
+    if db_user is None:
+        return None
+    for field, value in user_update.dict(exclude_unset=True).items():
+        if field == "password":
+            db_user.hashed_password = get_password_hash(value)
+        else:
+            setattr(db_user, field, value)
+    db.flush()
+    event_bus.publish(db, "user.updated", user_event(db_user))
+    db.commit()
+    invalidate_author_reports(db, user_id)
+    db.refresh(db_user)
+    return db_user
+
+def iter_suggestable_users(db: Session, batch_size: int = 1000) -> Iterator[tuple]:
+    """Stream (id, username, full_name, is_active) for every user."""
+    stmt = (
+        select(User.id, User.username, User.full_name, User.is_active)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt)
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def suggest_users(db: Session, prefix: str, limit: int = 10, exclude_id: Optional[int] = None) -> List[tuple]:
+    """Active users whose username, or a word of whose full name, starts with ``prefix``.
+
+    The database fallback for the in-memory index. On PostgreSQL the
+    trigram indexes on lower(username) and lower(full_name) serve the
+    LIKE patterns. Returns (id, username, full_name) rows, username
+    matches first.
+    """
+    pattern = _escape_like(prefix.lower())
+    username_match = func.lower(User.username).like(f"{pattern}%", escape="\\")
+    name_match = or_(
+        func.lower(User.full_name).like(f"{pattern}%", escape="\\"),
+        func.lower(User.full_name).like(f"% {pattern}%", escape="\\"),
+    )
+    stmt = (
+        select(User.id, User.username, User.full_name)
+        .where(User.is_active.isnot(False), or_(username_match, name_match))
+        .order_by(username_match.desc(), func.length(User.username), User.username)
+        .limit(limit)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(User.id != exclude_id)
+    return [tuple(row) for row in db.execute(stmt)]
+
+def user_interactions(db: Session, user_id: int, days: int = 90) -> Dict[int, datetime]:
+    """The users ``user_id`` has recently dealt with, and when they last did.
+
+    Counts users they mentioned, users who commented on their reports, and
+    the authors of reports they commented on, over the last ``days`` days.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    author = aliased(Comment)
+    mentioned = (
+        select(Mention.user_id.label("other_id"), Mention.created_at.label("at"))
+        .outerjoin(author, author.id == Mention.comment_id)
+        .outerjoin(Report, and_(Report.id == Mention.report_id, Mention.comment_id.is_(None)))
+        .where(Mention.created_at >= since, or_(author.user_id == user_id, Report.user_id == user_id))
+    )
+    commented_on_mine = (
+        select(Comment.user_id.label("other_id"), Comment.created_at.label("at"))
+        .join(Report, Report.id == Comment.report_id)
+        .where(Report.user_id == user_id, Comment.created_at >= since)
+    )
+    i_commented_on = (
+        select(Report.user_id.label("other_id"), Comment.created_at.label("at"))
+        .join(Report, Report.id == Comment.report_id)
+        .where(Comment.user_id == user_id, Comment.created_at >= since)
+    )
+    events = union_all(mentioned, commented_on_mine, i_commented_on).subquery()
+    stmt = (
+        select(events.c.other_id, func.max(events.c.at))
+        .where(events.c.other_id != user_id)
+        .group_by(events.c.other_id)
+    )
+    interactions = {}
+    for other_id, at in db.execute(stmt):
+        if isinstance(at, str):  # SQLite returns max() over a union as text
+            at = datetime.fromisoformat(at)
+        if other_id is not None:
+            interactions[other_id] = at
+    return interactions
@@ -1,19 +1,95 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.routing import APIRoute
 import os
 import logging
+from sqlalchemy.exc import OperationalError
 
 # Import routers
-from app.routers import auth, reports, comments
-from app.core.database import Base, engine
+from app.routers import auth, reports, comments, system, stats, users, uploads
+from app.core.database import engine
+from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.admission import AdmissionMiddleware
+from app.services import rollups  # noqa: F401  Registers the activity rollup flush hook
+from app.services import report_counters  # noqa: F401  Registers the report counter flush hook
+from app.services.search import indexer  # Also registers the search queue flush hook
+from app.services import event_handlers  # noqa: F401  Subscribes caches and live streams to the event bus
+from app.core.events import event_bus
+from app.core.replicas import replicas
+from app.services.user_suggest import user_index
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+UPLOAD_DIR = "uploads"
+
+
+def _log_routes(app: FastAPI) -> None:
+    logger.debug("API Routes registered:")
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            logger.debug(f"{route.methods} {route.path}")
+        else:
+            logger.debug(f"Mount: {route.path}")
+
+
+def _ensure_partitions() -> None:
+    from app.core.partitions import ensure_partitions
+    try:
+        with engine.begin() as conn:
+            ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+    except Exception as e:  # Don't refuse to start; the maintenance script can catch up
+        logger.error(f"Could not create upcoming partitions: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Worker startup and shutdown.
+
+    Nothing here runs at import time, so importing the app (for --reload,
+    preloading or tests) never touches the database. An empty database is
+    built from the models and stamped; otherwise the schema is Alembic's,
+    and startup only checks that the migrations have been applied.
+    """
+    from app.core.schema import bootstrap, check_schema
+
+    try:
+        bootstrap(engine)
+    except OperationalError as e:  # Unreachable; check_schema logs it too
+        logger.warning(f"Could not bootstrap the database: {e}")
+    check_schema(engine, settings.SCHEMA_CHECK)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    if engine.dialect.name == "postgresql":
+        _ensure_partitions()
+    event_bus.start(engine)
+    replicas.start()
+    user_index.start()
+    indexer.start()
+    if logger.isEnabledFor(logging.DEBUG):
+        _log_routes(app)
+
+    yield
+
+    from app.core.rendering import shutdown_pool
+    from app.core.storage import deletion_queue
+
+    event_bus.stop()
+    replicas.stop()
+    indexer.stop()
+    shutdown_pool()
+    deletion_queue.drain()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Shed load per route class before it reaches the workers and the DB pool.
+# Added first so CORS headers still go out on 429/503 responses.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -25,29 +101,20 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
+# Compress responses for clients that accept gzip/br/zstd
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
 
-# Mount uploads directory for static file serving
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# Mount uploads directory for static file serving (created at startup)
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 app.include_router(comments.router, prefix="/api/comments", tags=["comments"])
-
-# Log registered routes
-logger.info("API Routes registered:")
-for route in app.routes:
-    if isinstance(route, APIRoute):
-        logger.info(f"{route.methods} {route.path}")
-    else:
-        logger.info(f"Mount: {route.path}")
+app.include_router(users.router, prefix="/api/users", tags=["users"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["uploads"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+app.include_router(system.router, prefix="/api/system", tags=["system"])
 
 @app.get("/")
 async def root():
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, MetaData
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Date, MetaData, UniqueConstraint, LargeBinary, Index, BigInteger
+from sqlalchemy.orm import relationship, backref, deferred
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.content_codec import should_compress, compress_content, decompress_content
 
+EXCERPT_LENGTH = 300
+
+# On PostgreSQL lower(username) and lower(full_name) also have pg_trgm GIN
+# indexes for user suggestions; they are created by migration only.
 class User(Base):
     __tablename__ = "users"
     __table_args__ = {'extend_existing': True}
@@ -24,7 +30,10 @@ class User(Base):
 
 class UserProject(Base):
     __tablename__ = "user_projects"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_user_projects_user_id_project", "user_id", "project"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -33,33 +42,118 @@ class UserProject(Base):
     # Relationship
     user = relationship("User", back_populates="projects")
 
+# reports, comments and mentions are range-partitioned by month on created_at
+# in PostgreSQL (see app.core.partitions). Their primary keys there are
+# (id, created_at), and foreign keys pointing at them exist only in the ORM.
 class Report(Base):
     __tablename__ = "reports"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Project feeds: WHERE project = ? ORDER BY created_at DESC
+        Index("ix_reports_project_created_at", "project", "created_at"),
+        # Per-user lists and date ranges
+        Index("ix_reports_user_id_created_at", "user_id", "created_at"),
+        # Wide date-range scans; tiny since rows arrive in created_at order
+        Index("ix_reports_created_at_brin", "created_at", postgresql_using="brin"),
+        # Lists sorted by recent activity
+        Index("ix_reports_user_id_last_activity_at", "user_id", "last_activity_at"),
+        Index("ix_reports_project_last_activity_at", "project", "last_activity_at"),
+        # Title typeahead (pg_trgm); a plain index elsewhere
+        Index("ix_reports_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    content = Column(String, nullable=False)
+    # Body is stored either as text or, above a size threshold, zstd-compressed.
+    # Both are deferred so list queries never load them; use `content`.
+    _content = deferred(Column("content", String, nullable=True), group="content")
+    content_compressed = deferred(Column(LargeBinary, nullable=True), group="content")
+    content_dict_id = Column(Integer, ForeignKey("compression_dictionaries.id"), nullable=True)
+    excerpt = Column(String(EXCERPT_LENGTH), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    project = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Denormalized for lists; maintained by app.services.report_counters
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    attachment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="reports")
     comments = relationship("Comment", back_populates="report", cascade="all, delete")
     attachments = relationship("Attachment", back_populates="report", cascade="all, delete")
     mentions = relationship("Mention", back_populates="report", cascade="all, delete")
+    revisions = relationship("ReportRevision", back_populates="report", cascade="all, delete")
+
+    @hybrid_property
+    def content(self) -> str:
+        if self.content_compressed is not None:
+            return decompress_content(self.content_compressed, self.content_dict_id)
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self.excerpt = value[:EXCERPT_LENGTH]
+        if should_compress(value):
+            self.content_compressed, self.content_dict_id = compress_content(value)
+            self._content = None
+        else:
+            self._content = value
+            self.content_compressed = None
+            self.content_dict_id = None
+
+    @content.expression
+    def content(cls):
+        return cls._content
+
+class CompressionDictionary(Base):
+    __tablename__ = "compression_dictionaries"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ReportRevision(Base):
+    __tablename__ = "report_revisions"
+    __table_args__ = (
+        UniqueConstraint("report_id", "revision", name="uq_report_revisions_report_revision"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
+    # On PostgreSQL, the referenced row's partition key for the composite
+    # foreign key into the partitioned table; set by a trigger on insert
+    report_created_at = Column(DateTime(timezone=True), nullable=True)
+    revision = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    title = Column(String, nullable=False)
+    # Full content for snapshots, a JSON line delta against the previous revision otherwise
+    is_snapshot = Column(Boolean, nullable=False, default=False)
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationship
+    report = relationship("Report", back_populates="revisions")
 
 class Comment(Base):
     __tablename__ = "comments"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_comments_report_id_created_at", "report_id", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"))
     parent_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by triggers, like ReportRevision.report_created_at
+    report_created_at = Column(DateTime(timezone=True), nullable=True)
+    parent_created_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -81,6 +175,8 @@ class Attachment(Base):
     file_path = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
     report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"))
+    # Set by a trigger, like ReportRevision.report_created_at
+    report_created_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship
@@ -88,15 +184,106 @@ class Attachment(Base):
 
 class Mention(Base):
     __tablename__ = "mentions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_mentions_user_id_created_at", "user_id", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=True)
     comment_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by triggers, like ReportRevision.report_created_at
+    report_created_at = Column(DateTime(timezone=True), nullable=True)
+    comment_created_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="mentions")
     report = relationship("Report", back_populates="mentions")
     comment = relationship("Comment", back_populates="mentions")
+
+class DailyActivity(Base):
+    """Per-day rollup of reports, comments and mentions by user and project.
+
+    Maintained on every flush by app.services.rollups; ``project`` is "" for
+    reports without a project. Counts reflect the rows that currently exist,
+    bucketed by their creation day (UTC).
+    """
+    __tablename__ = "activity_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "user_id", "project", name="uq_activity_daily_day_user_project"),
+        Index("ix_activity_daily_project_day", "project", "day"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    project = Column(String, nullable=False, default="")
+    reports = Column(Integer, nullable=False, default=0)
+    comments = Column(Integer, nullable=False, default=0)
+    mentions = Column(Integer, nullable=False, default=0)
+
+class SearchQueue(Base):
+    """Reports whose search index entry is out of date (app.services.search).
+
+    Rows are added in the same transaction as the report or comment change
+    and removed once the indexer has written the new version.
+    """
+    __tablename__ = "search_queue"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True)
+    report_id = Column(Integer, nullable=False)
+    queued_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class UploadSession(Base):
+    """A resumable attachment upload in progress (app.routers.uploads).
+
+    Chunks are written straight into a preallocated file under
+    UPLOAD_PARTIAL_DIR, named after the session id, which completion moves
+    into the upload tree. ``status`` is "open" until a completion claims it.
+    """
+    __tablename__ = "upload_sessions"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=True)  # of the whole file, if the client sent one
+    status = Column(String(16), nullable=False, default="open", server_default="open")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    chunks = relationship("UploadChunk", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+class UploadChunk(Base):
+    """A chunk of an upload: claimed by the request writing it, then stored.
+
+    The row is inserted before the bytes are written, so the primary key
+    lets only one request write an index; ``claimed_at`` is cleared once
+    the bytes are on disk and match ``sha256``.
+    """
+    __tablename__ = "upload_chunks"
+    __table_args__ = {'extend_existing': True}
+
+    session_id = Column(String(32), ForeignKey("upload_sessions.id", ondelete="CASCADE"), primary_key=True)
+    index = Column(Integer, primary_key=True, autoincrement=False)
+    sha256 = Column(String(64), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # while being written; None once stored
+
+    @property
+    def stored(self) -> bool:
+        return self.claimed_at is None
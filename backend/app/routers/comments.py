@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Optional
 
-from app.core.database import get_db
-from app.core.auth import get_current_active_user
+from app.core.database import get_db, SessionLocal
+from app.core.auth import get_current_active_user, decode_access_token
+from app.core.config import settings
+from app.core.live import live_hub, comments_channel, LAGGED
+from app.core.cache import response_cache, comments_resource, CachedResponse
+from app.core.singleflight import single_flight
 from app.crud import comments as comments_crud
+from app.crud import reports as reports_crud
 from app.crud import mentions as mentions_crud
 from app.models.base import User
+from app.services.project_service import can_view_report
 from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
 
 router = APIRouter()
 
+comment_list_adapter = TypeAdapter(List[CommentResponse])
+
 @router.post("", response_model=CommentResponse)
 async def create_comment(
     comment: CommentCreate,
@@ -24,19 +35,49 @@ async def create_comment(
     mentioned_users = mentions_crud.extract_mentions(comment.content)
     if mentioned_users:
         mentions_crud.create_mentions(db, mentioned_users, comment_id=db_comment.id)
-    
+
     return db_comment
 
+def _load_comments_entry(report_id: int, skip: int, limit: int, key: str) -> Optional[CachedResponse]:
+    """Fetch and serialize a comment page once for all coalesced waiters."""
+    db = SessionLocal()
+    try:
+        report = reports_crud.get_report(db, report_id)
+        if not report:
+            return None
+        comments = comments_crud.get_report_comments(db, report_id, skip, limit, since=report.created_at)
+        entry = CachedResponse(
+            owner_id=report.user_id,
+            project=report.project,
+            etag="",
+            body=comment_list_adapter.dump_json(
+                comment_list_adapter.validate_python(comments, from_attributes=True)
+            )
+        )
+    finally:
+        db.close()
+    response_cache.set(key, entry)
+    return entry
+
 @router.get("/report/{report_id}", response_model=List[CommentResponse])
 async def get_report_comments(
     report_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """Get all comments for a report."""
-    return comments_crud.get_report_comments(db, report_id, skip, limit)
+    key = response_cache.key(comments_resource(report_id), f"{skip}:{limit}")
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = await single_flight.do(key, _load_comments_entry, report_id, skip, limit, key)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+
+    # Comment threads are visible to whoever can see the report
+    if not can_view_report(current_user, entry.owner_id, entry.project):
+        raise HTTPException(status_code=403, detail="Not authorized to access this report")
+    return Response(entry.body, media_type="application/json")
 
 @router.put("/{comment_id}", response_model=CommentResponse)
 async def update_comment(
@@ -58,7 +99,7 @@ async def update_comment(
     mentioned_users = mentions_crud.extract_mentions(comment.content)
     if mentioned_users:
         mentions_crud.create_mentions(db, mentioned_users, comment_id=comment_id)
-    
+
     return updated_comment
 
 @router.delete("/{comment_id}")
@@ -75,4 +116,107 @@ async def delete_comment(
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
     
     comments_crud.delete_comment(db, db_comment)
-    return {"message": "Comment deleted"}
\ No newline at end of file
+    return {"message": "Comment deleted"}
+
+def _authorize_stream(report_id: int, token: str) -> None:
+    """Check a stream's token and access once, up front.
+
+    Uses a short-lived session so a connected stream holds no database connection.
+    """
+    user_id = decode_access_token(token)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None or not user.is_active:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        report = reports_crud.get_report(db, report_id)
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        if not can_view_report(user, report.user_id, report.project):
+            raise HTTPException(status_code=403, detail="Not authorized to access this report")
+    finally:
+        db.close()
+
+@router.get("/report/{report_id}/stream")
+async def stream_report_comments(
+    report_id: int,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)"),
+    last_event_id: Optional[int] = Header(None),
+) -> Any:
+    """Server-Sent Events stream of comment `created`/`updated`/`deleted` events.
+
+    Reconnecting clients resume after `Last-Event-ID`; a `reset` event means
+    events were missed and the thread should be refetched. Comment lines are
+    sent as heartbeats. A client that falls too far behind is disconnected
+    and resumes on reconnect.
+    """
+    _authorize_stream(report_id, token)
+    subscription = live_hub.subscribe(comments_channel(report_id), last_event_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            if subscription.reset:
+                yield "event: reset\ndata: {}\n\n"
+            while True:
+                event = await subscription.get(settings.LIVE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                elif event is LAGGED:
+                    return
+                else:
+                    yield event.to_sse()
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/report/{report_id}/ws")
+async def websocket_report_comments(
+    websocket: WebSocket,
+    report_id: int,
+    token: str = Query(...),
+    last_event_id: Optional[int] = Query(None),
+):
+    """WebSocket fallback for the comment stream, with the same JSON events."""
+    try:
+        _authorize_stream(report_id, token)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code)
+        return
+
+    await websocket.accept()
+    subscription = live_hub.subscribe(comments_channel(report_id), last_event_id)
+
+    async def send_events():
+        if subscription.reset:
+            await websocket.send_json({"type": "reset"})
+        while True:
+            event = await subscription.get(settings.LIVE_HEARTBEAT_SECONDS)
+            if event is None:
+                await websocket.send_json({"type": "ping"})
+            elif event is LAGGED:
+                await websocket.close(code=4008)
+                return
+            else:
+                await websocket.send_json(event.to_dict())
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass  # Clients have nothing to say
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        subscription.close()
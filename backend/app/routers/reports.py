@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Literal, Union
+from datetime import date, datetime, time, timezone
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.auth import get_current_active_user
 from app.core.storage import save_upload_file
+from app.core.http_cache import make_etag, etag_matches, cache_headers, not_modified
+from app.core.cache import response_cache, report_resource, CachedResponse
+from app.core.singleflight import single_flight
+from app.core.rendering import get_rendering, schedule_render
 from app.crud import reports as reports_crud
 from app.crud import mentions as mentions_crud
+from app.crud import revisions as revisions_crud
 from app.models.base import User
+from app.models.enums import Project
+from app.services.project_service import can_view_report, check_project_member
+from app.services.report_suggest import suggest_reports
+from app.services import search as search_service
 from app.schemas.report import (
     ReportCreate,
     ReportUpdate,
     ReportResponse,
-    ReportListResponse
+    ReportRenderedResponse,
+    ReportSummaryResponse,
+    ReportListResponse,
+    ReportBatchRequest,
+    ReportBatchItem,
+    ReportBatchResponse,
+    ReportSuggestion
+)
+from app.schemas.revision import (
+    ReportRevisionResponse,
+    ReportRevisionContent,
+    ReportRevisionDiff
 )
 
 router = APIRouter()
@@ -24,26 +46,84 @@ async def create_report(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """Create a new report."""
+    check_project_member(current_user, report.project)
     db_report = reports_crud.create_report(db, report, current_user)
 
     # Handle Mentions
     mentioned_users = mentions_crud.extract_mentions(report.content)
     if mentioned_users:
         mentions_crud.create_mentions(db, mentioned_users, report_id=db_report.id)
-    
+
+    schedule_render(db_report.content, mentions_crud.resolve_mentions(db, db_report.content))
     return db_report
 
+def _user_version(user: User) -> tuple:
+    projects = sorted(membership.project for membership in user.projects)
+    return (user.id, user.username, user.email, user.full_name, user.role, user.is_active, user.is_superuser, projects)
+
+def _as_datetime(value: Union[datetime, date, None]) -> Optional[datetime]:
+    """Plain dates mean midnight UTC."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.min, tzinfo=timezone.utc)
+
+def report_filters(
+    search: Optional[str] = None,
+    project: Optional[Project] = None,
+    created_from: Union[datetime, date, None] = None,
+    created_to: Union[datetime, date, None] = None,
+    updated_since: Union[datetime, date, None] = None
+) -> dict:
+    """List filters shared by the list and export endpoints."""
+    return {
+        "search": search,
+        "project": project.value if project else None,
+        "created_from": _as_datetime(created_from),
+        "created_to": _as_datetime(created_to),
+        "updated_since": _as_datetime(updated_since),
+    }
+
 @router.get("", response_model=ReportListResponse)
 async def get_reports(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    search: Optional[str] = None,
+    sort: Optional[Literal["created", "activity", "relevance"]] = None,
+    include_content: bool = True,
+    filters: dict = Depends(report_filters),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
-    """Get all reports for current user."""
-    reports = reports_crud.get_user_reports(db, current_user, skip, limit, search)
-    total = reports_crud.get_reports_count(db, current_user, search)
+    """Get all reports for current user.
+
+    With `project`, lists every report in that project the user can see
+    instead: managers see their projects' reports, directors see all.
+    `created_from` (inclusive) and `created_to` (exclusive) bound the
+    creation time; `updated_since` keeps reports created or edited since then.
+    `sort=activity` lists the most recently edited, commented on or
+    attached to first instead of the newest. `sort=relevance`, the
+    default with `search`, ranks matches when the embedded search index
+    is in use.
+
+    Items carry an `excerpt` of the body. The full `content` is deprecated
+    and will be dropped from list items in the next release; pass
+    `include_content=false` to leave it out (and unread) now.
+    """
+    sort = sort or ("relevance" if filters["search"] else "created")
+    version = reports_crud.get_user_reports_version(db, current_user, **filters)
+    if filters["search"] and search_service.active():
+        version += (search_service.search_index.snapshot().generation,)
+    etag = make_etag("reports", _user_version(current_user), skip, limit, sort, include_content, sorted(filters.items()), version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    reports = reports_crud.get_user_reports(db, current_user, skip, limit, sort, include_content, **filters)
+    if not include_content:
+        # Validated without `content`, so the deferred body is never loaded
+        reports = [ReportSummaryResponse.model_validate(report) for report in reports]
+    total = version[0]
+    response.headers.update(cache_headers(etag))
     
     return {
         "items": reports,
@@ -53,19 +133,130 @@ async def get_reports(
         "pages": (total + limit - 1) // limit
     }
 
+@router.get("/export")
+async def export_reports(
+    filters: dict = Depends(report_filters),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Export the current user's reports as newline-delimited JSON.
+
+    Accepts the same filters as the report list.
+    """
+    user = current_user
+
+    def generate():
+        db = SessionLocal()
+        try:
+            for report in reports_crud.iter_user_reports(db, user, **filters):
+                yield ReportResponse.model_validate(report).model_dump_json() + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="reports.ndjson"'}
+    )
+
+@router.get("/suggest", response_model=List[ReportSuggestion])
+def suggest_report_titles(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Suggest reports by title as the user types.
+
+    Tolerates typos ("Monhtly Progress" finds "Monthly Progress Report")
+    and ranks by title similarity, then recency. Only reports the user
+    may see are returned.
+    """
+    return suggest_reports(db, current_user, q, limit)
+
+BATCH_ERRORS = {403: "Not authorized to access this report", 404: "Report not found"}
+
+@router.post("/batch", response_model=ReportBatchResponse)
+async def get_reports_batch(
+    batch: ReportBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get several reports by id in one request.
+
+    `fields` selects what to return for each report (default: everything a
+    single report response has). Reports the user may not see, or that do
+    not exist, are listed under `errors` with a 403 or 404 status.
+    """
+    report_ids = list(dict.fromkeys(batch.ids))
+    fields = batch.fields or list(ReportResponse.model_fields)
+    reports, errors = reports_crud.get_reports_batch(db, current_user, report_ids, fields)
+    return {
+        "items": {
+            report_id: ReportBatchItem.model_validate(
+                {field: getattr(report, field) for field in fields}
+            ).model_dump(mode="json", exclude_unset=True)
+            for report_id, report in reports.items()
+        },
+        "errors": {
+            report_id: {"status": status, "detail": BATCH_ERRORS[status]}
+            for report_id, status in errors.items()
+        },
+    }
+
+def _load_report_entry(report_id: int, format: str, key: str) -> Optional[CachedResponse]:
+    """Fetch and serialize a report once for all coalesced waiters."""
+    db = SessionLocal()
+    try:
+        version = reports_crud.get_report_version(db, report_id)
+        if not version:
+            return None
+        report = reports_crud.get_report(db, report_id)
+        if format == "html":
+            rendering = get_rendering(report.content, mentions_crud.resolve_mentions(db, report.content))
+            body = ReportRenderedResponse(
+                **ReportResponse.model_validate(report).model_dump(),
+                content_html=rendering["html"],
+                toc=rendering["toc"]
+            ).model_dump_json()
+        else:
+            body = ReportResponse.model_validate(report).model_dump_json()
+        entry = CachedResponse(
+            owner_id=report.user_id,
+            project=report.project,
+            etag=make_etag("report", version, format),
+            body=body.encode()
+        )
+    finally:
+        db.close()
+    response_cache.set(key, entry)
+    return entry
+
 @router.get("/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    format: Literal["json", "html"] = "json",
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
-    """Get a specific report."""
-    report = reports_crud.get_report(db, report_id)
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    if report.user_id != current_user.id:
+    """Get a specific report.
+
+    With format=html the response also carries sanitized server-rendered
+    HTML (`content_html`) and a heading table of contents (`toc`).
+    """
+    key = response_cache.key(report_resource(report_id), format)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = await single_flight.do(key, _load_report_entry, report_id, format, key)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+
+    # Authorize every request, cached or not
+    if not can_view_report(current_user, entry.owner_id, entry.project):
         raise HTTPException(status_code=403, detail="Not authorized to access this report")
-    return report
+
+    if etag_matches(request, entry.etag):
+        return not_modified(entry.etag)
+    return Response(entry.body, media_type="application/json", headers=cache_headers(entry.etag))
 
 @router.put("/{report_id}", response_model=ReportResponse)
 async def update_report(
@@ -80,16 +271,89 @@ async def update_report(
         raise HTTPException(status_code=404, detail="Report not found")
     if db_report.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to modify this report")
+    # Moving a report needs membership of the new project; one it already
+    # belongs to may be kept even after the author has left that project
+    if "project" in report.model_fields_set and report.project != db_report.project:
+        check_project_member(current_user, report.project)
     
-    updated_report = reports_crud.update_report(db, db_report, report)
+    updated_report = reports_crud.update_report(db, db_report, report, current_user.id)
     
     # Handle Mentions for updated content
     mentioned_users = mentions_crud.extract_mentions(report.content)
     if mentioned_users:
         mentions_crud.create_mentions(db, mentioned_users, report_id=report_id)
-    
+
+    schedule_render(updated_report.content, mentions_crud.resolve_mentions(db, updated_report.content))
     return updated_report
 
+def _get_own_report(db: Session, report_id: int, user: User):
+    report = reports_crud.get_report(db, report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if report.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this report")
+    return report
+
+@router.get("/{report_id}/revisions", response_model=List[ReportRevisionResponse])
+async def list_report_revisions(
+    report_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """List a report's revisions, newest first."""
+    _get_own_report(db, report_id, current_user)
+    return revisions_crud.list_revisions(db, report_id)
+
+@router.get("/{report_id}/revisions/{revision}", response_model=ReportRevisionContent)
+async def get_report_revision(
+    report_id: int,
+    revision: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get the title and content of a report as of a revision."""
+    _get_own_report(db, report_id, current_user)
+    result = revisions_crud.get_revision_content(db, report_id, revision)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    title, content = result
+    return {"revision": revision, "title": title, "content": content}
+
+@router.get("/{report_id}/revisions/{from_revision}/diff/{to_revision}", response_model=ReportRevisionDiff)
+async def diff_report_revisions(
+    report_id: int,
+    from_revision: int,
+    to_revision: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get a unified diff of report content between two revisions."""
+    _get_own_report(db, report_id, current_user)
+    diff = revisions_crud.diff_revisions(db, report_id, from_revision, to_revision)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return {"from_revision": from_revision, "to_revision": to_revision, "diff": diff}
+
+@router.post("/{report_id}/revisions/{revision}/restore", response_model=ReportResponse)
+async def restore_report_revision(
+    report_id: int,
+    revision: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Restore a report to a previous revision, recorded as a new revision."""
+    db_report = _get_own_report(db, report_id, current_user)
+    result = revisions_crud.get_revision_content(db, report_id, revision)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    title, content = result
+
+    restored = reports_crud.update_report(
+        db, db_report, ReportUpdate(title=title, content=content), current_user.id
+    )
+    schedule_render(restored.content, mentions_crud.resolve_mentions(db, restored.content))
+    return restored
+
 @router.delete("/{report_id}")
 async def delete_report(
     report_id: int,
@@ -115,8 +379,8 @@ async def upload_inline_image(
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    file_path = save_upload_file(file, folder="inline")
-    url = f"/uploads/inline/{file_path.split('/')[-1]}"
+    file_path = save_upload_file(file, "inline")
+    url = f"/uploads/{file_path}"
     return {"url": url}
 
 @router.post("/{report_id}/attachments", response_model=dict)
@@ -133,7 +397,7 @@ async def upload_attachment(
     if report.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to modify this report")
     
-    file_path = save_upload_file(file, folder=str(report_id))
+    file_path = save_upload_file(file, report_id)
     attachment = reports_crud.create_attachment(
         db, report, file_path, file.filename, file.content_type
     )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Any, Literal, Optional
+from datetime import date
+
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.crud import stats as stats_crud
+from app.models.base import User
+from app.models.enums import Project
+from app.schemas.stats import ActivityStatsResponse
+
+router = APIRouter()
+
+@router.get("/activity", response_model=ActivityStatsResponse)
+def get_activity_stats(
+    group_by: Literal["user", "project", "day", "month"] = "month",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    project: Optional[Project] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Report, comment and mention counts from the daily rollups.
+
+    Directors see everyone's activity, managers their own and their
+    projects', everyone else only their own. Dates are inclusive; reports
+    without a project are grouped under an empty project.
+    """
+    items = stats_crud.get_activity(
+        db,
+        current_user,
+        group_by,
+        date_from=date_from,
+        date_to=date_to,
+        project=project.value if project else None,
+        user_id=user_id,
+    )
+    totals = {
+        counter: sum(item[counter] for item in items)
+        for counter in ("reports", "comments", "mentions")
+    }
+    return {
+        "group_by": group_by,
+        "date_from": date_from,
+        "date_to": date_to,
+        "items": items,
+        "totals": {"key": "total", **totals},
+    }
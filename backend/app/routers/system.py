@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends
+from typing import Any
+
+from app.core.auth import get_current_active_superuser
+from app.core.cache import response_cache
+from app.core.compression import compressed_cache
+from app.core.singleflight import single_flight
+from app.core.storage import deletion_queue
+from app.core.live import live_hub
+from app.core.events import event_bus
+from app.core.admission import admission
+from app.core.replicas import replicas
+from app.models.base import User
+from app.services.user_suggest import user_index
+from app.services.report_suggest import suggest_cache
+from app.services.search import indexer
+
+router = APIRouter()
+
+@router.get("/cache")
+def get_cache_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Hit/miss statistics for the server-side caches (admin only)."""
+    return {
+        "responses": response_cache.stats(),
+        "compressed_bodies": compressed_cache.stats(),
+        "single_flight": single_flight.stats(),
+    }
+
+@router.get("/uploads")
+def get_upload_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Background file deletion queue statistics (admin only)."""
+    return {"deletion_queue": deletion_queue.stats()}
+
+@router.get("/live")
+def get_live_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Live comment stream and event bus statistics (admin only)."""
+    return {"hub": live_hub.stats(), "events": event_bus.stats()}
+
+@router.get("/admission")
+def get_admission_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Queue depth, rejections and rate limiting per route class (admin only)."""
+    return admission.stats()
+
+@router.get("/replicas")
+def get_replica_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Read replica health, lag and read routing counts (admin only)."""
+    return replicas.stats()
+
+@router.get("/suggest")
+def get_suggest_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Typeahead index and cache statistics (admin only)."""
+    return {"users": user_index.stats(), "reports": suggest_cache.stats()}
+
+@router.get("/search")
+def get_search_stats(
+    current_user: User = Depends(get_current_active_superuser)
+) -> Any:
+    """Embedded search index segments, cache and indexer statistics (admin only)."""
+    return indexer.stats()
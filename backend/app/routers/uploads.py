@@ -0,0 +1,169 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.orm import Session
+from typing import Any
+import hashlib
+import os
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.crud import reports as reports_crud
+from app.crud import uploads as uploads_crud
+from app.models.base import UploadSession, User
+from app.schemas.attachment import AttachmentResponse
+from app.schemas.upload import SHA256_PATTERN, UploadChunkResponse, UploadCreate, UploadResponse
+
+router = APIRouter()
+
+def _upload_response(upload: UploadSession, received: list) -> UploadResponse:
+    return UploadResponse.model_validate(upload).model_copy(update={"received": received})
+
+def _get_own_upload(db: Session, upload_id: str, user: User, open_only: bool = True) -> UploadSession:
+    upload = uploads_crud.get_upload(db, upload_id)
+    if upload is None or uploads_crud.is_expired(upload):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if upload.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this upload")
+    if open_only and upload.status != "open":
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+    return upload
+
+@router.post("", response_model=UploadResponse, status_code=201)
+def create_upload(
+    upload_in: UploadCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Start a resumable attachment upload.
+
+    Send the file in `chunk_count` pieces with PUT .../chunks/{index}
+    (chunk `index` starts at byte `index * chunk_size`), in any order and
+    in parallel, then POST .../complete. After a dropped connection, GET
+    the upload to see which chunks were `received` and send the rest.
+    Sessions idle for UPLOAD_SESSION_TTL seconds are discarded.
+    """
+    report = reports_crud.get_report(db, upload_in.report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if report.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to modify this report")
+    if upload_in.size > settings.UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Files may be at most {settings.UPLOAD_MAX_SIZE} bytes")
+
+    uploads_crud.expire_uploads(db, batch_size=100)
+    upload = uploads_crud.create_upload(db, current_user, report, upload_in)
+    return _upload_response(upload, [])
+
+@router.get("/{upload_id}", response_model=UploadResponse)
+def get_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Get an upload's progress, including which chunks have been received."""
+    upload = _get_own_upload(db, upload_id, current_user, open_only=False)
+    return _upload_response(upload, uploads_crud.received_chunks(db, upload.id))
+
+async def _write_chunk(request: Request, path: str, offset: int, length: int) -> str:
+    """Stream the request body into ``path`` at ``offset``; returns its SHA-256."""
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    try:
+        async for data in request.stream():
+            if written + len(data) > length:
+                raise HTTPException(status_code=413, detail=f"Chunk is longer than {length} bytes")
+            view = memoryview(data)
+            while view:
+                count = os.pwrite(fd, view, offset + written)
+                view = view[count:]
+                written += count
+            digest.update(data)
+    finally:
+        os.close(fd)
+    if written != length:
+        raise HTTPException(status_code=400, detail=f"Expected {length} bytes, got {written}")
+    return digest.hexdigest()
+
+@router.put("/{upload_id}/chunks/{index}", response_model=UploadChunkResponse)
+async def put_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str = Header(..., pattern=SHA256_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Store one chunk, sent as the raw request body.
+
+    `X-Chunk-SHA256` is the chunk's hex SHA-256; a chunk whose bytes do
+    not match is rejected and must be sent again. Re-sending a chunk that
+    was already stored is a no-op; sending one while another request is
+    still writing that index is a 409.
+    """
+    upload = _get_own_upload(db, upload_id, current_user)
+    if not 0 <= index < upload.chunk_count:
+        raise HTTPException(status_code=400, detail=f"Chunk index must be below {upload.chunk_count}")
+    claimed_at = uploads_crud.claim_chunk(db, upload_id, index, x_chunk_sha256)
+    if claimed_at is None:
+        existing = uploads_crud.get_chunk(db, upload_id, index)
+        if existing is not None and existing.stored and existing.sha256 == x_chunk_sha256:
+            return {"index": index, "sha256": existing.sha256}
+        if existing is not None and existing.stored:
+            raise HTTPException(status_code=409, detail="A different chunk was already stored at this index")
+        raise HTTPException(status_code=409, detail="This chunk is being written by another request")
+
+    offset, length = index * upload.chunk_size, upload.chunk_length(index)
+    # Don't hold a pool connection while the chunk streams in
+    db.rollback()
+    try:
+        digest = await _write_chunk(request, uploads_crud.partial_file(upload_id), offset, length)
+        if digest != x_chunk_sha256:
+            raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+    except BaseException:
+        uploads_crud.release_chunk(db, upload_id, index, claimed_at)
+        raise
+    if not uploads_crud.record_chunk(db, upload_id, index, claimed_at):
+        raise HTTPException(status_code=409, detail="Upload is no longer open, or the chunk write took too long")
+    return {"index": index, "sha256": digest}
+
+@router.post("/{upload_id}/complete", response_model=AttachmentResponse)
+def complete_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Check that every chunk (and the whole-file SHA-256, if given) is in, and attach the file.
+
+    The file is moved into place, not copied, and the attachment is
+    created in the same transaction that closes the session.
+    """
+    upload = _get_own_upload(db, upload_id, current_user)
+    missing = upload.chunk_count - uploads_crud.count_received_chunks(db, upload_id)
+    if missing:
+        raise HTTPException(status_code=409, detail=f"{missing} chunks missing")
+    report = reports_crud.get_report(db, upload.report_id)
+    if not report:
+        uploads_crud.abort_upload(db, upload)
+        raise HTTPException(status_code=404, detail="Report not found")
+    if not uploads_crud.claim_upload(db, upload_id):
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+
+    if upload.sha256 and uploads_crud.partial_sha256(upload_id) != upload.sha256:
+        uploads_crud.reopen_upload(db, upload_id)
+        raise HTTPException(status_code=422, detail="File checksum mismatch")
+    return uploads_crud.finish_upload(db, upload, report)
+
+@router.delete("/{upload_id}")
+def cancel_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Cancel an upload and discard what was received."""
+    upload = _get_own_upload(db, upload_id, current_user)
+    uploads_crud.abort_upload(db, upload)
+    return {"message": "Upload cancelled"}
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
-from app.core.auth import get_current_active_superuser
-from app.schemas.user import UserUpdate, UserResponse
+from app.core.auth import get_current_active_user, get_current_active_superuser
+from app.models.base import User
+from app.schemas.user import UserUpdate, UserResponse, UserSuggestion
 from app.crud import users as users_crud
+from app.services.user_suggest import user_index
 
 router = APIRouter()
 
@@ -16,6 +18,21 @@ def list_users(
     """List all users (admin only)"""
     return users_crud.get_users(db)
 
+@router.get("/suggest", response_model=List[UserSuggestion])
+def suggest_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Suggest users to @mention as the user types.
+
+    Matches the start of usernames and of words in full names, ignoring
+    case and accents. People the current user recently mentioned or
+    exchanged comments with come first.
+    """
+    return user_index.suggest(db, q, current_user.id, limit)
+
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(
     user_id: int,
@@ -24,4 +41,7 @@ def update_user(
     current_user = Depends(get_current_active_superuser)
 ):
     """Update user (admin only)"""
-    return users_crud.update_user(db, user_id, user_update) 
\ No newline at end of file
+    user = users_crud.update_user(db, user_id, user_update)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from pydantic import BaseModel, Field
 
+from app.models.enums import Project
 from .user import UserResponse
 from .attachment import AttachmentResponse
 
@@ -12,12 +13,19 @@ class ReportBase(BaseModel):
 
 class ReportCreate(ReportBase):
     """Schema for creating a new report"""
-    pass
+    project: Optional[Project] = None
+
+    class Config:
+        use_enum_values = True
 
 class ReportUpdate(BaseModel):
     """Schema for updating an existing report"""
     title: str
     content: str
+    project: Optional[Project] = None
+
+    class Config:
+        use_enum_values = True
 
 class ReportResponse(BaseModel):
     """Schema for report response data"""
@@ -25,16 +33,55 @@ class ReportResponse(BaseModel):
     user_id: int
     title: str
     content: str
+    project: Optional[str] = None
+    created_at: datetime
+    comment_count: int = 0
+    attachment_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    user: Optional[UserResponse] = None
+    attachments: List[AttachmentResponse] = []
+
+    class Config:
+        from_attributes = True
+
+class ReportSummaryResponse(BaseModel):
+    """Schema for a report in a list, with an excerpt instead of the full body"""
+    id: int
+    user_id: int
+    title: str
+    excerpt: Optional[str] = None
+    project: Optional[str] = None
     created_at: datetime
+    comment_count: int = 0
+    attachment_count: int = 0
+    last_activity_at: Optional[datetime] = None
     user: Optional[UserResponse] = None
     attachments: List[AttachmentResponse] = []
 
     class Config:
         from_attributes = True
 
+class ReportListItem(ReportSummaryResponse):
+    """Schema for a report in a list response"""
+    # Deprecated: list clients should use `excerpt`. Returned unless the list
+    # is requested with include_content=false; removed in the next release.
+    content: Optional[str] = Field(None, json_schema_extra={"deprecated": True})
+
+class TocEntry(BaseModel):
+    """Schema for a heading in a rendered report's table of contents"""
+    level: int
+    id: str
+    name: str
+    children: List['TocEntry'] = []
+
+class ReportRenderedResponse(ReportResponse):
+    """Schema for a report with server-rendered, sanitized HTML content"""
+    content_html: str
+    toc: List[TocEntry] = []
+
 class ReportListResponse(BaseModel):
     """Schema for paginated report list response"""
-    items: List[ReportResponse]
+    items: List[ReportListItem]
     total: int
     page: int
     size: int
@@ -42,3 +89,48 @@ class ReportListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ReportSuggestion(BaseModel):
+    """Schema for a title typeahead match"""
+    id: int
+    title: str
+    project: Optional[str] = None
+    created_at: datetime
+    score: float
+
+REPORT_BATCH_MAX_IDS = 100
+
+ReportField = Literal[
+    "id", "user_id", "title", "content", "excerpt", "project", "created_at",
+    "comment_count", "attachment_count", "last_activity_at", "user", "attachments"
+]
+
+class ReportBatchRequest(BaseModel):
+    """Schema for fetching several reports at once"""
+    ids: List[int] = Field(..., min_length=1, max_length=REPORT_BATCH_MAX_IDS)
+    fields: Optional[List[ReportField]] = None  # default: the fields of a single report response
+
+class ReportBatchItem(BaseModel):
+    """Schema for a report in a batch response; only the requested fields are set"""
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    excerpt: Optional[str] = None
+    project: Optional[str] = None
+    created_at: Optional[datetime] = None
+    comment_count: Optional[int] = None
+    attachment_count: Optional[int] = None
+    last_activity_at: Optional[datetime] = None
+    user: Optional[UserResponse] = None
+    attachments: Optional[List[AttachmentResponse]] = None
+
+class ReportBatchError(BaseModel):
+    """Schema for a report a batch request could not return"""
+    status: int
+    detail: str
+
+class ReportBatchResponse(BaseModel):
+    """Schema for a batch response, keyed by report id"""
+    items: Dict[int, Dict[str, Any]]
+    errors: Dict[int, ReportBatchError]
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+class ReportRevisionResponse(BaseModel):
+    """Schema for report revision metadata"""
+    revision: int
+    title: str
+    user_id: Optional[int] = None
+    is_snapshot: bool
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ReportRevisionContent(BaseModel):
+    """Schema for a reconstructed report revision"""
+    revision: int
+    title: str
+    content: str
+
+class ReportRevisionDiff(BaseModel):
+    """Schema for a unified diff between two revisions"""
+    from_revision: int
+    to_revision: int
+    diff: str
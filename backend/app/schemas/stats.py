@@ -0,0 +1,18 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+class ActivityBucket(BaseModel):
+    """Schema for activity counts in one group"""
+    key: str
+    reports: int
+    comments: int
+    mentions: int
+
+class ActivityStatsResponse(BaseModel):
+    """Schema for grouped activity statistics"""
+    group_by: str
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    items: List[ActivityBucket]
+    totals: ActivityBucket
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.config import settings
+
+SHA256_PATTERN = "^[0-9a-f]{64}$"
+UPLOAD_MIN_CHUNK_SIZE = 256 * 1024  # only the last chunk may be smaller
+UPLOAD_MAX_CHUNKS = 10000
+
+class UploadCreate(BaseModel):
+    """Start a resumable upload of an attachment to ``report_id``."""
+    report_id: int
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = "application/octet-stream"
+    size: int = Field(..., gt=0)
+    chunk_size: Optional[int] = Field(None, ge=UPLOAD_MIN_CHUNK_SIZE, le=settings.UPLOAD_MAX_CHUNK_SIZE)  # defaults to UPLOAD_CHUNK_SIZE
+    sha256: Optional[str] = Field(None, pattern=SHA256_PATTERN)  # of the whole file, checked on completion
+
+    @model_validator(mode="after")
+    def check_chunk_count(self) -> "UploadCreate":
+        if self.chunk_size is None:
+            self.chunk_size = settings.UPLOAD_CHUNK_SIZE
+        if -(-self.size // self.chunk_size) > UPLOAD_MAX_CHUNKS:
+            raise ValueError(f"At most {UPLOAD_MAX_CHUNKS} chunks: use a larger chunk_size")
+        return self
+
+class UploadResponse(BaseModel):
+    id: str
+    report_id: int
+    filename: str
+    content_type: str
+    size: int
+    chunk_size: int
+    chunk_count: int
+    sha256: Optional[str] = None
+    status: str
+    expires_at: datetime
+    received: List[int] = []  # indexes of the chunks already stored
+
+    class Config:
+        from_attributes = True
+
+class UploadChunkResponse(BaseModel):
+    index: int
+    sha256: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, List
 from datetime import datetime
 from app.models.base import UserProject
@@ -27,5 +27,20 @@ class UserResponse(UserBase):
     is_superuser: bool
     projects: List[str] = []
 
+    @field_validator("projects", mode="before")
+    @classmethod
+    def project_names(cls, v):
+        # ORM users carry UserProject rows; expose just the project names
+        return [getattr(p, "project", p) for p in v or []]
+
+    class Config:
+        from_attributes = True
+
+class UserSuggestion(BaseModel):
+    """Schema for an @mention suggestion"""
+    id: int
+    username: str
+    full_name: str
+
     class Config:
         from_attributes = True
@@ -0,0 +1,105 @@
+"""Compress existing large report bodies in the background.
+
+Trains a zstd dictionary from a sample of large bodies (unless one exists
+or --skip-training is given), then rewrites uncompressed rows above
+REPORT_COMPRESSION_THRESHOLD in small batches so it can run alongside live
+traffic. Use --decompress to reverse it before downgrading the migration.
+
+    python -m app.scripts.compress_reports [--batch-size 100] [--pause 0.5]
+"""
+import argparse
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
+
+from app.core import content_codec
+from app.core.cache import response_cache, report_resource
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.base import Report, CompressionDictionary
+
+def train(db, sample_size: int) -> None:
+    samples = [
+        report.content
+        for report in db.query(Report)
+        .options(undefer_group("content"))
+        .filter(
+            (func.length(Report._content) >= settings.REPORT_COMPRESSION_THRESHOLD) |
+            Report.content_compressed.isnot(None)
+        )
+        .order_by(Report.id.desc())
+        .limit(sample_size)
+    ]
+    data = content_codec.train_dictionary(samples)
+    if data is None:
+        print(f"Not enough samples to train a dictionary ({len(samples)}); compressing without one")
+        return
+    db.add(CompressionDictionary(data=data))
+    db.commit()
+    content_codec.reset_current_dictionary()
+    print(f"Trained a {len(data)} byte dictionary from {len(samples)} samples")
+
+def rewrite(db, batch_size: int, pause: float, decompress: bool) -> None:
+    if decompress:
+        selector = Report.content_compressed.isnot(None)
+    else:
+        selector = func.length(Report._content) >= settings.REPORT_COMPRESSION_THRESHOLD
+        dict_id = content_codec.current_dictionary_id()
+        if dict_id is not None:
+            # Re-encode bodies compressed without the newest dictionary
+            selector = selector | (
+                Report.content_compressed.isnot(None) &
+                ((Report.content_dict_id.is_(None)) | (Report.content_dict_id != dict_id))
+            )
+
+    last_id, total = 0, 0
+    while True:
+        batch = (
+            db.query(Report)
+            .options(undefer_group("content"))
+            .filter(selector, Report.id > last_id)
+            .order_by(Report.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for report in batch:
+            content = report.content
+            if decompress:
+                report._content, report.content_compressed, report.content_dict_id = content, None, None
+            else:
+                report.content = content
+        db.commit()
+        for report in batch:
+            response_cache.invalidate(report_resource(report.id))
+        last_id = batch[-1].id
+        total += len(batch)
+        print(f"Rewrote {total} reports (up to id {last_id})")
+        time.sleep(pause)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--pause", type=float, default=0.5, help="seconds to sleep between batches")
+    parser.add_argument("--sample-size", type=int, default=1000)
+    parser.add_argument("--skip-training", action="store_true")
+    parser.add_argument("--retrain", action="store_true", help="train a new dictionary even if one exists")
+    parser.add_argument("--decompress", action="store_true")
+    args = parser.parse_args()
+
+    if not args.decompress and not content_codec.compression_enabled():
+        print("Set REPORT_COMPRESSION_ENABLED=true (and install zstandard) first")
+        return
+
+    db = SessionLocal()
+    try:
+        if not args.decompress and not args.skip_training:
+            if args.retrain or content_codec.current_dictionary_id() is None:
+                train(db, args.sample_size)
+        rewrite(db, args.batch_size, args.pause, args.decompress)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Reconcile the upload directory against the attachments table.
+
+Reports (and, without --dry-run, deletes) orphaned upload files: files no
+attachment row or report body refers to, e.g. unused inline images or files
+left behind by a crash between write and commit. Attachment rows whose file
+is missing are listed, and removed with --prune-dangling. Resumable upload
+sessions idle past UPLOAD_SESSION_TTL are discarded along with their
+partial files (which live outside the upload tree).
+
+    python -m app.scripts.gc_uploads --dry-run
+    python -m app.scripts.gc_uploads --grace 3600 --batch-size 200 --pause 0.2
+"""
+import argparse
+import json
+
+from app.core.database import SessionLocal
+from app.crud.uploads import expire_uploads, remove_stray_partials
+from app.services.file_gc import reconcile_uploads
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    parser.add_argument("--grace", type=int, default=3600, help="ignore files modified in the last N seconds")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds to sleep between delete batches")
+    parser.add_argument("--prune-dangling", action="store_true", help="delete attachment rows whose file is missing")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = reconcile_uploads(
+            db,
+            dry_run=args.dry_run,
+            grace_seconds=args.grace,
+            batch_size=args.batch_size,
+            pause=args.pause,
+            prune_dangling=args.prune_dangling,
+        )
+        if not args.dry_run:
+            report["expired_uploads"] = expire_uploads(db, batch_size=args.batch_size)
+            report["stray_partials"] = remove_stray_partials(db)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
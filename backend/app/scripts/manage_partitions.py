@@ -0,0 +1,40 @@
+"""Maintain the monthly partitions of reports, comments and mentions.
+
+Creates partitions for the coming months and, with a retention window,
+detaches older partitions into an archive schema. Run it from cron (daily
+is plenty); the API also creates upcoming partitions at startup.
+
+    python -m app.scripts.manage_partitions
+    python -m app.scripts.manage_partitions --months-ahead 6 --retention-months 24
+"""
+import argparse
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.partitions import ensure_partitions, detach_partitions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    parser.add_argument(
+        "--retention-months", type=int, default=settings.PARTITION_RETENTION_MONTHS,
+        help="detach partitions older than this many months (0 keeps everything)"
+    )
+    parser.add_argument("--archive-schema", default=settings.PARTITION_ARCHIVE_SCHEMA)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("Partitioning is only used on PostgreSQL; nothing to do.")
+        return
+
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, args.months_ahead)
+        detached = []
+        if args.retention_months > 0:
+            detached = detach_partitions(conn, args.retention_months, args.archive_schema)
+
+    print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+    print(f"Detached {len(detached)} partitions: {', '.join(detached) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Recompute the daily activity rollups from the reports, comments and mentions tables.
+
+Needed once after the rollup migration, and after any bulk SQL that
+bypassed the ORM. With --since only that day onwards is rebuilt.
+
+    python -m app.scripts.rebuild_rollups
+    python -m app.scripts.rebuild_rollups --since 2026-10-01 --window-days 7
+"""
+import argparse
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.services.rollups import rebuild_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--window-days", type=int, default=31, help="days of raw rows aggregated per query")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, since=args.since, window_days=args.window_days)
+    finally:
+        db.close()
+    print(f"Wrote {written} rollup rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Rebuild the embedded report search index (app.services.search) from the database.
+
+Needed after restoring a backup, after bulk SQL that bypassed the ORM,
+or if the index directory is lost or damaged. If a running server holds
+the index, every report is queued for its indexer instead.
+
+    python -m app.scripts.rebuild_search_index
+"""
+import argparse
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.base import Report, SearchQueue
+from app.services.search import rebuild, search_index
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.SEARCH_INDEX_BATCH_SIZE, help="reports loaded per query")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if search_index.acquire():
+            try:
+                indexed = rebuild(db, args.batch_size)
+            finally:
+                search_index.release()
+            print(f"Indexed {indexed} reports")
+        else:
+            result = db.execute(insert(SearchQueue).from_select(["report_id"], select(Report.id)))
+            db.commit()
+            print(f"The index is in use by a running server: queued {result.rowcount} reports for its indexer")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Recompute reports' comment and attachment counts and last activity time.
+
+Needed once after the counters migration if it was not run with its
+backfill, and after any bulk SQL that bypassed the ORM. Safe to run
+while the app is serving: only reports whose counters are wrong are
+written, a batch at a time.
+
+    python -m app.scripts.repair_report_counters
+    python -m app.scripts.repair_report_counters --report-id 12 --report-id 40
+"""
+import argparse
+
+from app.core.database import SessionLocal
+from app.services.report_counters import repair_report_counters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report-id", type=int, action="append", dest="report_ids", help="only repair this report (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="reports checked per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repaired = repair_report_counters(db, report_ids=args.report_ids, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Repaired {repaired} reports")
+
+if __name__ == "__main__":
+    main()
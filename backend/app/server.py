@@ -0,0 +1,127 @@
+"""Production entry point: a preloaded, multi-worker gunicorn master with uvicorn workers.
+
+    python -m app.server
+    python -m app.server --workers 4 --bind 0.0.0.0:8000
+
+The app is imported once in the master and forked into the workers, so
+code and module state are shared copy-on-write; the collector is frozen
+before forking so collections in the workers don't write to those pages.
+Each worker runs the app's lifespan itself (database checks, the event
+listener). Workers are recycled after SERVER_MAX_REQUESTS (plus jitter,
+so they don't all restart at once) or when their RSS exceeds
+SERVER_MAX_WORKER_RSS_MB. On SIGTERM, workers stop accepting connections
+and finish in-flight requests, uploads included, for up to
+SERVER_GRACEFUL_TIMEOUT seconds.
+"""
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.server")
+
+
+def default_workers() -> int:
+    """2 x CPUs + 1, capped so every worker's pool fits in the database's connection budget.
+
+    Each worker can open DB_POOL_SIZE + DB_MAX_OVERFLOW pooled connections
+    plus one for the event listener.
+    """
+    by_cpu = 2 * multiprocessing.cpu_count() + 1
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW + 1
+    by_pool = max(1, settings.DB_MAX_CONNECTIONS // per_worker)
+    return max(1, min(by_cpu, by_pool))
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:  # Not Linux: fall back to the peak
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker that drains within gunicorn's graceful timeout and restarts on memory growth."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Leave a few seconds of gunicorn's deadline for the lifespan shutdown
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - 5)
+        self.recycling = False
+
+    async def callback_notify(self) -> None:
+        self.notify()
+        limit = settings.SERVER_MAX_WORKER_RSS_MB
+        if limit and not self.recycling and rss_mb() > limit:
+            self.recycling = True
+            logger.warning(f"Worker {self.pid} is using {rss_mb():.0f}MB (limit {limit}MB), restarting")
+            # Uvicorn's SIGTERM handler shuts down gracefully; the master starts a replacement
+            os.kill(self.pid, signal.SIGTERM)
+
+
+def when_ready(server) -> None:
+    # Everything imported so far is shared with the workers; keep the
+    # collector from touching (and so copying) those pages.
+    gc.freeze()
+
+
+def post_fork(server, worker) -> None:
+    from app.core.database import engine
+    # Never share pooled connections across processes
+    engine.dispose(close=False)
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def options(workers: int = None, bind: str = None) -> dict:
+    return {
+        "bind": bind or f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": workers or settings.SERVER_WORKERS or default_workers(),
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "accesslog": "-" if settings.SERVER_ACCESS_LOG else None,
+        "errorlog": "-",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with gunicorn and uvicorn workers.")
+    parser.add_argument("--workers", type=int, help="default: SERVER_WORKERS, or derived from CPUs and the DB pool")
+    parser.add_argument("--bind", help="host:port (default: SERVER_HOST:SERVER_PORT)")
+    args = parser.parse_args()
+    Server(options(args.workers, args.bind)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Subscribers that keep per-process state in step with the event bus.
+
+Imported for its side effects (see app.main). Handlers run for every
+committed change, including those made by other workers, so in-process
+caches and live streams stay coherent across a multi-worker deployment.
+"""
+from app.core.cache import MemoryCache, response_cache, report_resource, comments_resource
+from app.core.database import SessionLocal
+from app.core.events import DomainEvent, event_bus
+from app.crud.reports import invalidate_author_reports
+from app.core.live import live_hub, comments_channel
+from app.services.user_suggest import user_index
+from app.services.report_suggest import suggest_cache
+from app.services.search import indexer
+
+def _cache_is_local() -> bool:
+    # A shared (Redis) cache was already invalidated by the writing worker
+    return isinstance(response_cache.backend, MemoryCache)
+
+def invalidate_report(domain_event: DomainEvent) -> None:
+    if _cache_is_local():
+        response_cache.invalidate(report_resource(domain_event.data["id"]))
+        # Comment pages are authorized against the report's owner and
+        # project as cached, which an update may change
+        if domain_event.type in ("report.updated", "report.deleted"):
+            response_cache.invalidate(comments_resource(domain_event.data["id"]))
+
+def invalidate_comments(domain_event: DomainEvent) -> None:
+    if _cache_is_local():
+        response_cache.invalidate(comments_resource(domain_event.data["report_id"]))
+
+def invalidate_commented_report(domain_event: DomainEvent) -> None:
+    """New and deleted comments change the report's comment_count."""
+    if _cache_is_local() and domain_event.type in ("comment.created", "comment.deleted"):
+        response_cache.invalidate(report_resource(domain_event.data["report_id"]))
+
+def forward_comment(domain_event: DomainEvent) -> None:
+    """Push comment changes to the report's live stream subscribers."""
+    action = domain_event.type.split(".", 1)[1]
+    live_hub.publish(
+        comments_channel(domain_event.data["report_id"]),
+        action,
+        domain_event.data,
+        event_id=domain_event.id
+    )
+
+def invalidate_report_suggestions(domain_event: DomainEvent) -> None:
+    """Titles or visibility may have changed: start a new typeahead cache generation."""
+    suggest_cache.invalidate()
+
+def invalidate_authored_reports(domain_event: DomainEvent) -> None:
+    """Cached reports embed their author's name, role and projects."""
+    if _cache_is_local() and domain_event.type == "user.updated":
+        db = SessionLocal()
+        try:
+            invalidate_author_reports(db, domain_event.data["id"])
+        finally:
+            db.close()
+
+def index_user(domain_event: DomainEvent) -> None:
+    """Keep the @mention suggestion index in step with user changes."""
+    user_index.apply(domain_event.data)
+
+def wake_indexer(domain_event: DomainEvent) -> None:
+    """Index the change now rather than at the next poll (if this worker is the indexer)."""
+    indexer.wake()
+
+event_bus.subscribe("report.", invalidate_report)
+event_bus.subscribe("report.", invalidate_report_suggestions)
+event_bus.subscribe("comment.", invalidate_comments)
+event_bus.subscribe("comment.", invalidate_commented_report)
+event_bus.subscribe("comment.", forward_comment)
+event_bus.subscribe("report.", wake_indexer)
+event_bus.subscribe("comment.", wake_indexer)
+event_bus.subscribe("user.", index_user)
+event_bus.subscribe("user.", invalidate_authored_reports)
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import time
+import logging
+from typing import Iterator, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer_group
+
+from app.core.storage import get_upload_path, iter_upload_files, delete_upload_files
+from app.models.base import Attachment, Comment, Report, ReportRevision
+
+logger = logging.getLogger(__name__)
+
+INLINE_REFERENCE = re.compile(r'/uploads/([^\s)"\'<>]+)')
+
+def _iter_attachment_paths(db: Session, batch_size: int) -> Iterator[tuple]:
+    """Stream (file_path, attachment id) ordered byte-wise by path."""
+    path = Attachment.file_path
+    if db.bind.dialect.name == "postgresql":
+        path = path.collate("C")
+    stmt = (
+        select(Attachment.file_path, Attachment.id)
+        .order_by(path, Attachment.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in db.execute(stmt):
+        yield row.file_path, row.id
+
+def _revision_text(is_snapshot: bool, data: str) -> str:
+    """A revision's content, or for a delta the lines it inserts."""
+    if is_snapshot:
+        return data
+    return "".join(line for op in json.loads(data) if isinstance(op, list) for line in op)
+
+def _inline_references(db: Session, batch_size: int) -> Set[str]:
+    """Upload paths referenced from markdown (inline images).
+
+    Covers report bodies, every stored revision (so restoring one never
+    points at a deleted file) and comments.
+    """
+    referenced = set()
+    stmt = (
+        select(Report)
+        .options(undefer_group("content"))
+        .execution_options(yield_per=batch_size)
+    )
+    for report in db.execute(stmt).scalars():
+        referenced.update(INLINE_REFERENCE.findall(report.content or ""))
+        db.expunge(report)
+
+    stmt = select(ReportRevision.is_snapshot, ReportRevision.data).execution_options(yield_per=batch_size)
+    for is_snapshot, data in db.execute(stmt):
+        referenced.update(INLINE_REFERENCE.findall(_revision_text(is_snapshot, data)))
+
+    stmt = select(Comment.content).execution_options(yield_per=batch_size)
+    for content in db.execute(stmt).scalars():
+        referenced.update(INLINE_REFERENCE.findall(content or ""))
+    return referenced
+
+def reconcile_uploads(
+    db: Session,
+    dry_run: bool = True,
+    grace_seconds: int = 3600,
+    batch_size: int = 500,
+    pause: float = 0.1,
+    prune_dangling: bool = False,
+    root: Optional[str] = None
+) -> dict:
+    """Find and remove upload files no row or report refers to.
+
+    The upload tree and the attachments table are both streamed in path
+    order and merge-joined, so memory stays flat regardless of size (only
+    inline-image references from reports, their revisions and comments
+    are held as a set). Files younger than ``grace_seconds`` are skipped:
+    they may belong to an upload whose transaction has not committed yet.
+    Orphans are deleted in batches of ``batch_size`` with ``pause`` seconds
+    between batches. Attachment rows whose file is missing are reported,
+    and deleted if ``prune_dangling``.
+    """
+    root = root or get_upload_path()
+    referenced = _inline_references(db, batch_size)
+    cutoff = time.time() - grace_seconds
+
+    report = {
+        "dry_run": dry_run,
+        "files_scanned": 0,
+        "orphans": [],
+        "orphan_bytes": 0,
+        "skipped_recent": 0,
+        "dangling_attachments": [],
+        "deleted_files": 0,
+        "deleted_attachments": 0,
+    }
+    pending = []
+
+    def flush():
+        if pending and not dry_run:
+            report["deleted_files"] += delete_upload_files(list(pending))
+            time.sleep(pause)
+        pending.clear()
+
+    def orphan(path: str, mtime: float):
+        if path in referenced:
+            return
+        if mtime > cutoff:
+            report["skipped_recent"] += 1
+            return
+        report["orphans"].append(path)
+        try:
+            report["orphan_bytes"] += os.path.getsize(os.path.join(root, path))
+        except OSError:
+            pass
+        pending.append(path)
+        if len(pending) >= batch_size:
+            flush()
+
+    files = iter_upload_files(root)
+    rows = _iter_attachment_paths(db, batch_size)
+    current_file = next(files, None)
+    current_row = next(rows, None)
+
+    while current_file is not None or current_row is not None:
+        file_key = current_file[0].encode() if current_file else None
+        row_key = current_row[0].encode() if current_row else None
+
+        if row_key is None or (file_key is not None and file_key < row_key):
+            report["files_scanned"] += 1
+            orphan(*current_file)
+            current_file = next(files, None)
+        elif file_key is None or row_key < file_key:
+            report["dangling_attachments"].append(current_row[1])
+            current_row = next(rows, None)
+        else:
+            report["files_scanned"] += 1
+            current_file = next(files, None)
+            # Several rows may share one file
+            while current_row is not None and current_row[0].encode() == row_key:
+                current_row = next(rows, None)
+    flush()
+
+    dangling = report["dangling_attachments"]
+    if dangling and prune_dangling and not dry_run:
+        for start in range(0, len(dangling), batch_size):
+            chunk = dangling[start:start + batch_size]
+            db.query(Attachment).filter(Attachment.id.in_(chunk)).delete(synchronize_session=False)
+            db.commit()
+            report["deleted_attachments"] += len(chunk)
+
+    logger.info(
+        f"Upload reconcile: {len(report['orphans'])} orphans, "
+        f"{len(dangling)} dangling attachments, dry_run={dry_run}"
+    )
+    return report
@@ -1,11 +1,62 @@
-from typing import List
+from typing import List, Optional
+from sqlalchemy import select, true
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.models.base import User, UserProject, UserRole, Project
+from app.models.base import User, UserProject, Report, DailyActivity
+from app.models.enums import UserRole, Project
 
 def can_manage_projects(user: User) -> bool:
     return user.is_superuser or user.role in [UserRole.DIRECTOR, UserRole.MANAGER]
 
+def sees_all_projects(user: User) -> bool:
+    return user.is_superuser or user.role in [UserRole.ADMIN, UserRole.DIRECTOR]
+
+def report_visibility_filter(user: User):
+    """SQL predicate for the reports a user may see.
+
+    Everyone sees their own reports; directors and admins see all reports;
+    managers also see reports in the projects they are assigned to.
+    """
+    if sees_all_projects(user):
+        return true()
+    own = Report.user_id == user.id
+    if not can_manage_projects(user):
+        return own
+    member_projects = select(UserProject.project).where(UserProject.user_id == user.id)
+    return own | Report.project.in_(member_projects)
+
+def activity_visibility_filter(user: User):
+    """report_visibility_filter for activity rollup rows."""
+    if sees_all_projects(user):
+        return true()
+    own = DailyActivity.user_id == user.id
+    if not can_manage_projects(user):
+        return own
+    member_projects = select(UserProject.project).where(UserProject.user_id == user.id)
+    return own | DailyActivity.project.in_(member_projects)
+
+def can_view_report(user: User, owner_id: int, project: Optional[str]) -> bool:
+    """Python-side counterpart of report_visibility_filter for a loaded/cached report."""
+    if owner_id == user.id or sees_all_projects(user):
+        return True
+    if project is None or not can_manage_projects(user):
+        return False
+    return any(membership.project == project for membership in user.projects)
+
+def is_project_member(user: User, project: str) -> bool:
+    """Whether a user may file reports into a project: directors and admins
+    belong to every project, everyone else to the ones they are assigned."""
+    if sees_all_projects(user):
+        return True
+    return any(membership.project == project for membership in user.projects)
+
+def check_project_member(user: User, project: Optional[str]) -> None:
+    if project is not None and not is_project_member(user, project):
+        raise HTTPException(
+            status_code=403,
+            detail="You are not a member of this project"
+        )
+
 def assign_projects(db: Session, user_id: int, projects: List[Project], assigner: User):
     if not can_manage_projects(assigner):
         raise HTTPException(
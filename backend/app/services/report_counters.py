@@ -0,0 +1,141 @@
+"""Denormalized per-report counters: ``comment_count``, ``attachment_count`` and ``last_activity_at``.
+
+A ``before_flush`` hook on SessionLocal turns every comment and attachment
+insert/delete (including ORM cascades such as reply deletion) into one
+``UPDATE reports SET x = x + delta`` per affected report, on the same
+connection, so the counters commit or roll back with the rows they count
+and concurrent writers never lose an increment. Adding a comment or an
+attachment also moves ``last_activity_at`` to now; editing a report does
+the same (app.crud.reports.update_report). Bulk SQL that bypasses the ORM
+is not tracked; ``repair_report_counters`` recomputes the counters.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.orm import Session, attributes
+
+from app.core.database import SessionLocal
+from app.models.base import Attachment, Comment, Report
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = {Comment: "comment_count", Attachment: "attachment_count"}
+COUNTER_FIELDS = ("comment_count", "attachment_count", "last_activity_at")
+
+
+class _Change:
+    def __init__(self):
+        self.comment_count = 0
+        self.attachment_count = 0
+        self.active = False
+
+
+def _collect(session: Session) -> Dict[int, _Change]:
+    changes: Dict[int, _Change] = defaultdict(_Change)
+    # Rows deleted along with their report need no bookkeeping
+    gone = {obj.id for obj in session.deleted if isinstance(obj, Report)}
+    for objects, delta in ((session.new, 1), (session.deleted, -1)):
+        for obj in objects:
+            counter = COUNTERS.get(type(obj))
+            if counter is None or obj.report_id is None or obj.report_id in gone:
+                continue
+            change = changes[obj.report_id]
+            setattr(change, counter, getattr(change, counter) + delta)
+            change.active = change.active or delta > 0
+    return changes
+
+
+def _expire(session: Session, report_ids) -> None:
+    """Drop stale counter values from reports loaded in this session."""
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Report) and obj.id in report_ids:
+            fields = [name for name in COUNTER_FIELDS if not attributes.get_history(obj, name).has_changes()]
+            session.expire(obj, fields)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _track_counters(session: Session, flush_context, instances) -> None:
+    changes = _collect(session)
+    if not changes:
+        return
+    conn = session.connection()
+    table = Report.__table__
+    # Lock the report rows in id order so concurrent flushes can't deadlock
+    for report_id in sorted(changes):
+        change = changes[report_id]
+        values = {
+            # Keep the onupdate hook from treating this as an edit
+            "updated_at": table.c.updated_at,
+            "comment_count": table.c.comment_count + change.comment_count,
+            "attachment_count": table.c.attachment_count + change.attachment_count,
+        }
+        if change.active:
+            values["last_activity_at"] = func.now()
+        conn.execute(update(table).where(table.c.id == report_id).values(values))
+    _expire(session, changes.keys())
+
+
+def _latest(dialect_name: str, *columns):
+    if dialect_name == "postgresql":
+        return func.greatest(*columns)
+    return func.max(*columns)  # SQLite's scalar max()
+
+
+def repair_report_counters(db: Session, report_ids: Optional[List[int]] = None, batch_size: int = 1000) -> int:
+    """Recompute the counters from the comments and attachments tables.
+
+    Counts are set to the actual number of rows; ``last_activity_at`` is
+    moved forward if a report, comment or attachment is newer than it (it
+    is never moved back). Works through the reports ``batch_size`` ids at a
+    time, committing after each batch, and only writes rows that were
+    wrong. Returns the number of reports repaired.
+    """
+    dialect = db.bind.dialect.name
+    table = Report.__table__
+    comments = (
+        select(func.count(Comment.id)).where(Comment.report_id == table.c.id).scalar_subquery()
+    )
+    attachments = (
+        select(func.count(Attachment.id)).where(Attachment.report_id == table.c.id).scalar_subquery()
+    )
+    latest = _latest(
+        dialect,
+        table.c.created_at,
+        func.coalesce(table.c.updated_at, table.c.created_at),
+        func.coalesce(
+            select(func.max(Comment.created_at)).where(Comment.report_id == table.c.id).scalar_subquery(),
+            table.c.created_at
+        ),
+        func.coalesce(
+            select(func.max(Attachment.created_at)).where(Attachment.report_id == table.c.id).scalar_subquery(),
+            table.c.created_at
+        ),
+    )
+    stale = or_(
+        table.c.comment_count != comments,
+        table.c.attachment_count != attachments,
+        table.c.last_activity_at < latest,
+    )
+    repair = update(table).values(
+        updated_at=table.c.updated_at,
+        comment_count=comments,
+        attachment_count=attachments,
+        last_activity_at=_latest(dialect, table.c.last_activity_at, latest),
+    )
+
+    repaired = 0
+    if report_ids is not None:
+        repaired = db.execute(repair.where(table.c.id.in_(report_ids), stale)).rowcount
+        db.commit()
+    else:
+        low, high = db.execute(select(func.min(table.c.id), func.max(table.c.id))).one()
+        start = low
+        while start is not None and start <= high:
+            stop = start + batch_size
+            repaired += db.execute(repair.where(table.c.id >= start, table.c.id < stop, stale)).rowcount
+            db.commit()
+            start = stop
+    logger.info(f"Repaired the counters of {repaired} reports")
+    return repaired
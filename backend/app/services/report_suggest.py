@@ -0,0 +1,159 @@
+"""Typo-tolerant report title typeahead (GET /api/reports/suggest).
+
+Candidates come from app.crud.reports.suggest_report_titles: on
+PostgreSQL a trigram word-similarity search served by the GIN index on
+reports.title, so "Monhtly Progress" still finds "Monthly Progress
+Report". Elsewhere the most recent visible titles are scored here with
+the same trigram measure. Candidates are then ranked by similarity plus
+a small bonus for recent reports, which decays by half every
+REPORT_SUGGEST_RECENCY_HALF_LIFE_DAYS.
+
+Each user's recent queries are cached (as they type, backspace and
+retype) for REPORT_SUGGEST_CACHE_TTL seconds. Any report change starts a
+new cache generation, so titles and visibility are never staler than the
+event bus (see app.services.event_handlers).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import reports as reports_crud
+from app.models.base import User
+
+# Candidates fetched before re-ranking by recency
+CANDIDATES = 50
+# Titles scored in Python when the database has no trigram support
+FALLBACK_SCAN = 20000
+RECENCY_WEIGHT = 0.1
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """pg_trgm's trigrams: each lowercased word padded with two spaces before and one after."""
+    found = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(found)
+
+
+def word_similarity(query: FrozenSet[str], title: str) -> float:
+    """Share of the query's trigrams found in the title (close to pg_trgm's word_similarity)."""
+    if not query:
+        return 0.0
+    return len(query & trigrams(title)) / len(query)
+
+
+def _age_days(created_at) -> float:
+    if isinstance(created_at, str):  # SQLite
+        created_at = datetime.fromisoformat(created_at)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - created_at).total_seconds() / 86400)
+
+
+def score(similarity: float, created_at) -> float:
+    half_life = settings.REPORT_SUGGEST_RECENCY_HALF_LIFE_DAYS
+    return similarity + RECENCY_WEIGHT * 0.5 ** (_age_days(created_at) / half_life)
+
+
+class SuggestCache:
+    """Recent query results per user, LRU over users and over each user's queries."""
+
+    def __init__(self, max_users: int, per_user: int):
+        self.max_users = max_users
+        self.per_user = per_user
+        self.generation = 0
+        self._users: "OrderedDict[int, OrderedDict[tuple, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, key: tuple) -> Optional[list]:
+        now = time.monotonic()
+        with self._lock:
+            entries = self._users.get(user_id)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or entry[0] != self.generation or entry[1] < now:
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, user_id: int, key: tuple, results: list, generation: int) -> None:
+        expires_at = time.monotonic() + settings.REPORT_SUGGEST_CACHE_TTL
+        with self._lock:
+            entries = self._users.setdefault(user_id, OrderedDict())
+            self._users.move_to_end(user_id)
+            entries[key] = (generation, expires_at, results)
+            entries.move_to_end(key)
+            while len(entries) > self.per_user:
+                entries.popitem(last=False)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._users.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "users": len(self._users),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+suggest_cache = SuggestCache(settings.REPORT_SUGGEST_CACHE_USERS, settings.REPORT_SUGGEST_CACHE_PER_USER)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def suggest_reports(db: Session, user: User, query: str, limit: int = 8) -> List[Dict]:
+    """Ranked {id, title, project, created_at, score} for the reports ``user`` may see."""
+    query = _normalize(query)
+    if not query:
+        return []
+    key = (query, limit)
+    cached = suggest_cache.get(user.id, key)
+    if cached is not None:
+        return cached
+    generation = suggest_cache.generation
+
+    min_similarity = settings.REPORT_SUGGEST_MIN_SIMILARITY
+    postgres = db.bind.dialect.name == "postgresql"
+    rows = reports_crud.suggest_report_titles(
+        db, user, query, CANDIDATES if postgres else FALLBACK_SCAN, min_similarity
+    )
+    candidates: List[Tuple[float, tuple]] = []
+    if postgres:
+        candidates = [(row[4], row) for row in rows]
+    else:
+        query_trigrams = trigrams(query)
+        for row in rows:
+            similarity = word_similarity(query_trigrams, row[1])
+            if similarity >= min_similarity or row[1].lower().startswith(query):
+                candidates.append((similarity, row))
+
+    ranked = sorted(candidates, key=lambda item: score(item[0], item[1][3]), reverse=True)[:limit]
+    results = [
+        {"id": row[0], "title": row[1], "project": row[2], "created_at": row[3], "score": round(score(similarity, row[3]), 4)}
+        for similarity, row in ranked
+    ]
+    suggest_cache.set(user.id, key, results, generation)
+    return results
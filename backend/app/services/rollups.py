@@ -0,0 +1,240 @@
+"""Incrementally maintained activity rollups (the ``activity_daily`` table).
+
+A ``before_flush`` hook on SessionLocal turns every report, comment and
+mention insert/delete (including ORM cascades) and every change of a
+report's project into counter deltas, and upserts them on the same
+connection, so rollups commit or roll back with the writes that caused
+them. Bulk SQL that bypasses the ORM is not tracked; ``rebuild_rollups``
+recomputes everything from the raw tables.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, cast, delete, event, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+
+from app.core.database import SessionLocal
+from app.models.base import Comment, DailyActivity, Mention, Report
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("reports", "comments", "mentions")
+
+
+def _utc_day(value: Optional[datetime]) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _committed(obj, name: str):
+    """The value of an attribute as of the last load/flush."""
+    history = attributes.get_history(obj, name)
+    values = history.unchanged or history.deleted
+    return values[0] if values else None
+
+
+class _Deltas:
+    def __init__(self):
+        self.counts: Dict[tuple, List[int]] = defaultdict(lambda: [0] * len(COUNTERS))
+
+    def add(self, day: date, user_id: Optional[int], project: Optional[str], counter: str, n: int = 1) -> None:
+        if user_id is not None and n:
+            self.counts[(day, user_id, project or "")][COUNTERS.index(counter)] += n
+
+    def rows(self) -> List[dict]:
+        return [
+            {"day": day, "user_id": user_id, "project": project, **dict(zip(COUNTERS, counts))}
+            for (day, user_id, project), counts in self.counts.items()
+            if any(counts)
+        ]
+
+
+def _upsert(conn: Connection, rows: List[dict]) -> None:
+    """Add the rows' counters to existing rollup rows, inserting missing ones."""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        logger.warning(f"Activity rollups are not maintained on {conn.dialect.name}")
+        return
+    table = DailyActivity.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "user_id", "project"],
+        set_={counter: table.c[counter] + stmt.excluded[counter] for counter in COUNTERS}
+    )
+    conn.execute(stmt, rows)
+
+
+def _report_projects(session: Session, report_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """Current project of each report, preferring in-session state over the database."""
+    projects = {}
+    for obj in list(session.identity_map.values()) + list(session.new):
+        if isinstance(obj, Report) and obj.id is not None and "project" in obj.__dict__:
+            projects[obj.id] = obj.project
+    missing = {report_id for report_id in report_ids if report_id is not None} - projects.keys()
+    if missing:
+        rows = session.connection().execute(select(Report.id, Report.project).where(Report.id.in_(missing)))
+        projects.update({row.id: row.project for row in rows})
+    return projects
+
+
+def _comment_reports(session: Session, comment_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    reports = {}
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Comment) and "report_id" in obj.__dict__:
+            reports[obj.id] = obj.report_id
+    missing = {comment_id for comment_id in comment_ids if comment_id is not None} - reports.keys()
+    if missing:
+        rows = session.connection().execute(select(Comment.id, Comment.report_id).where(Comment.id.in_(missing)))
+        reports.update({row.id: row.report_id for row in rows})
+    return reports
+
+
+def _move_report_activity(session: Session, deltas: _Deltas, report: Report, old: Optional[str], new: Optional[str]) -> None:
+    """Re-bucket a report's comments and mentions after its project changed."""
+    conn = session.connection()
+    comments = conn.execute(
+        select(Comment.created_at, Comment.user_id).where(Comment.report_id == report.id)
+    )
+    for row in comments:
+        deltas.add(_utc_day(row.created_at), row.user_id, old, "comments", -1)
+        deltas.add(_utc_day(row.created_at), row.user_id, new, "comments", 1)
+
+    comment_ids = select(Comment.id).where(Comment.report_id == report.id)
+    mentions = conn.execute(
+        select(Mention.created_at, Mention.user_id).where(
+            (Mention.report_id == report.id) | Mention.comment_id.in_(comment_ids)
+        )
+    )
+    for row in mentions:
+        deltas.add(_utc_day(row.created_at), row.user_id, old, "mentions", -1)
+        deltas.add(_utc_day(row.created_at), row.user_id, new, "mentions", 1)
+
+
+def _collect(session: Session) -> _Deltas:
+    deltas = _Deltas()
+    today = _utc_day(None)
+    new = [obj for obj in session.new if isinstance(obj, (Report, Comment, Mention))]
+    deleted = [obj for obj in session.deleted if isinstance(obj, (Report, Comment, Mention))]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Report) and attributes.get_history(obj, "project").has_changes()
+    ]
+    if not (new or deleted or moved):
+        return deltas
+
+    mentions = [obj for obj in new + deleted if isinstance(obj, Mention)]
+    comment_reports = _comment_reports(session, [m.comment_id for m in mentions if m.comment_id])
+
+    def mention_report(mention: Mention) -> Optional[int]:
+        return mention.report_id or comment_reports.get(mention.comment_id)
+
+    report_ids = [obj.report_id for obj in new + deleted if isinstance(obj, Comment)]
+    report_ids += [mention_report(m) for m in mentions]
+    projects = _report_projects(session, report_ids)
+
+    for obj in new:
+        if isinstance(obj, Report):
+            deltas.add(today, obj.user_id, obj.project, "reports")
+        elif isinstance(obj, Comment):
+            deltas.add(today, obj.user_id, projects.get(obj.report_id), "comments")
+        else:
+            deltas.add(today, obj.user_id, projects.get(mention_report(obj)), "mentions")
+
+    for obj in deleted:
+        day = _utc_day(obj.created_at)
+        if isinstance(obj, Report):
+            deltas.add(day, obj.user_id, _committed(obj, "project"), "reports", -1)
+        elif isinstance(obj, Comment):
+            deltas.add(day, obj.user_id, projects.get(obj.report_id), "comments", -1)
+        else:
+            deltas.add(day, obj.user_id, projects.get(mention_report(obj)), "mentions", -1)
+
+    for report in moved:
+        old, new_project = _committed(report, "project"), report.project
+        day = _utc_day(report.created_at)
+        deltas.add(day, report.user_id, old, "reports", -1)
+        deltas.add(day, report.user_id, new_project, "reports", 1)
+        _move_report_activity(session, deltas, report, old, new_project)
+
+    return deltas
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _track_activity(session: Session, flush_context, instances) -> None:
+    _upsert(session.connection(), _collect(session).rows())
+
+
+def _day_expr(column, dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return func.date(column)
+
+
+def rebuild_rollups(db: Session, since: Optional[date] = None, window_days: int = 31) -> int:
+    """Recompute the rollups from the raw tables, from ``since`` or from the beginning.
+
+    Every source is aggregated with one GROUP BY per ``window_days`` window
+    of creation time, so the database does the counting and only aggregate
+    rows come back. Runs in one transaction: readers keep seeing the old
+    rollups until it commits. Returns the number of rollup rows written.
+    """
+    dialect = db.bind.dialect.name
+    conn = db.connection()
+
+    if since is None:
+        oldest = [
+            conn.execute(select(func.min(model.created_at))).scalar()
+            for model in (Report, Comment, Mention)
+        ]
+        oldest = [value for value in oldest if value is not None]
+        since = min(_utc_day(value) for value in oldest) if oldest else _utc_day(None)
+        conn.execute(delete(DailyActivity))
+    else:
+        conn.execute(delete(DailyActivity).where(DailyActivity.day >= since))
+
+    mention_report = func.coalesce(Mention.report_id, Comment.report_id)
+    written = 0
+    start = datetime.combine(since, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(_utc_day(None) + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    while start < end:
+        stop = min(start + timedelta(days=window_days), end)
+        sources = {
+            "reports": select(
+                _day_expr(Report.created_at, dialect), Report.user_id, Report.project, func.count()
+            ).where(Report.created_at >= start, Report.created_at < stop),
+            "comments": select(
+                _day_expr(Comment.created_at, dialect), Comment.user_id, Report.project, func.count()
+            ).outerjoin(Report, Report.id == Comment.report_id)
+             .where(Comment.created_at >= start, Comment.created_at < stop),
+            "mentions": select(
+                _day_expr(Mention.created_at, dialect), Mention.user_id, Report.project, func.count()
+            ).outerjoin(Comment, Comment.id == Mention.comment_id)
+             .outerjoin(Report, Report.id == mention_report)
+             .where(Mention.created_at >= start, Mention.created_at < stop),
+        }
+        deltas = _Deltas()
+        for counter, stmt in sources.items():
+            columns = list(stmt.selected_columns)[:3]
+            for day, user_id, project, count in conn.execute(stmt.group_by(*columns)):
+                if isinstance(day, str):  # SQLite returns date() as text
+                    day = date.fromisoformat(day)
+                deltas.add(day, user_id, project, counter, count)
+        rows = deltas.rows()
+        _upsert(conn, rows)
+        written += len(rows)
+        start = stop
+
+    db.commit()
+    logger.info(f"Rebuilt activity rollups since {since}: {written} rows")
+    return written
@@ -0,0 +1,228 @@
+"""Full-text report search on the embedded index (app.core.search_index).
+
+Used for the report list's ``search`` filter when SEARCH_BACKEND is
+"index", or "auto" on SQLite, where the alternative is an unranked
+ILIKE scan. A report's document is its title, body and comments.
+
+An ``after_flush`` hook queues every report whose title or body changed,
+or whose comments were added, edited or deleted, in the search_queue
+table, in the same transaction as the change. One process (whichever
+holds the index directory's write lock) runs the indexer thread: it
+turns queued reports into a new segment every SEARCH_INDEX_INTERVAL
+seconds, sooner when this process made the change, and merges segments
+in the background. A queue row is only deleted once its segment is on
+disk, so nothing is lost if the indexer stops halfway. Every process
+reads the segments directly.
+
+If the index has never been built, the indexer builds it on startup;
+``python -m app.scripts.rebuild_search_index`` rebuilds it on demand.
+"""
+import logging
+import os
+import threading
+from typing import AbstractSet, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session, attributes, undefer_group
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.search_index import PART_GAP, SearchIndex, tokenize
+from app.models.base import Comment, Report, SearchQueue
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+def enabled() -> bool:
+    if settings.SEARCH_BACKEND == "auto":
+        return engine.dialect.name == "sqlite"
+    return settings.SEARCH_BACKEND == "index"
+
+
+search_index = SearchIndex(
+    os.path.join(BACKEND_DIR, settings.SEARCH_INDEX_DIR),
+    max_segments=settings.SEARCH_INDEX_MAX_SEGMENTS
+)
+
+
+def active() -> bool:
+    """Whether searches go to the index: enabled, and built at least once."""
+    return enabled() and os.path.exists(search_index.manifest_path)
+
+
+def search_report_ids(query: str, allowed: AbstractSet[int]) -> List[int]:
+    """Ids of the ``allowed`` reports matching every word and "phrase" in ``query``, best first.
+
+    ``allowed`` is applied before the SEARCH_MAX_RESULTS cap, so reports
+    the caller can't see never crowd out ones they can.
+    """
+    results = search_index.search(query, settings.SEARCH_MAX_RESULTS, allowed=allowed)
+    return [report_id for report_id, _ in results]
+
+
+# Documents
+
+def document(title: str, content: Optional[str], comments: Sequence[str]) -> List[str]:
+    tokens = []
+    for part in (title, content or "", *comments):
+        tokens.extend(tokenize(part))
+        tokens.extend([""] * PART_GAP)
+    return tokens
+
+
+def load_documents(db: Session, report_ids: Sequence[int]) -> Tuple[Dict[int, List[str]], List[int]]:
+    """Documents for the reports that exist, and the ids of those that don't."""
+    reports = db.execute(
+        select(Report).options(undefer_group("content")).where(Report.id.in_(report_ids))
+    ).scalars().all()
+    comments: Dict[int, List[str]] = {report.id: [] for report in reports}
+    rows = db.execute(
+        select(Comment.report_id, Comment.content)
+        .where(Comment.report_id.in_(list(comments)))
+        .order_by(Comment.id)
+    )
+    for report_id, content in rows:
+        comments[report_id].append(content)
+    docs = {report.id: document(report.title, report.content, comments[report.id]) for report in reports}
+    db.expunge_all()
+    return docs, [report_id for report_id in report_ids if report_id not in docs]
+
+
+def iter_documents(db: Session, batch_size: int) -> Iterator[Dict[int, List[str]]]:
+    """Every report's document, in batches by id."""
+    last_id = 0
+    while True:
+        report_ids = db.execute(
+            select(Report.id).where(Report.id > last_id).order_by(Report.id).limit(batch_size)
+        ).scalars().all()
+        if not report_ids:
+            return
+        docs, _ = load_documents(db, report_ids)
+        yield docs
+        last_id = report_ids[-1]
+
+
+# Change tracking
+
+def _changed(obj, *names) -> bool:
+    return any(attributes.get_history(obj, name).has_changes() for name in names)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _queue_changes(session: Session, flush_context) -> None:
+    if not enabled():
+        return
+    report_ids = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Report):
+            report_ids.add(obj.id)
+        elif isinstance(obj, Comment):
+            report_ids.add(obj.report_id)
+    for obj in session.dirty:
+        if isinstance(obj, Report) and _changed(obj, "title", "_content", "content_compressed"):
+            report_ids.add(obj.id)
+        elif isinstance(obj, Comment) and _changed(obj, "content"):
+            report_ids.add(obj.report_id)
+    report_ids.discard(None)
+    if report_ids:
+        session.connection().execute(
+            insert(SearchQueue.__table__), [{"report_id": report_id} for report_id in sorted(report_ids)]
+        )
+
+
+# Indexing
+
+def index_queued(db: Session, batch_size: int) -> int:
+    """Index up to ``batch_size`` queued reports as one segment; returns how many."""
+    rows = db.execute(
+        select(SearchQueue.id, SearchQueue.report_id).order_by(SearchQueue.id).limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+    report_ids = list(dict.fromkeys(report_id for _, report_id in rows))
+    docs, deleted = load_documents(db, report_ids)
+    search_index.add(docs, deleted)
+    # Exactly the rows read: ids are allocated before commit, so a lower one
+    # can still be in flight and must be left for the next pass
+    db.execute(delete(SearchQueue).where(SearchQueue.id.in_([row.id for row in rows])))
+    db.commit()
+    return len(report_ids)
+
+
+def rebuild(db: Session, batch_size: int = 500) -> int:
+    """Index every report from scratch and swap the result in; returns the number indexed.
+
+    Changes queued after the rebuild starts are indexed afterwards as usual.
+    """
+    covered = db.execute(select(SearchQueue.id)).scalars().all()
+    count = search_index.replace_all(iter_documents(db, batch_size))
+    for start in range(0, len(covered), batch_size):
+        db.execute(delete(SearchQueue).where(SearchQueue.id.in_(covered[start:start + batch_size])))
+    db.commit()
+    logger.info(f"Rebuilt the search index: {count} reports")
+    return count
+
+
+class Indexer:
+    """Background thread that keeps the index current, in the process holding its lock."""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.indexed = 0
+        self.errors = 0
+
+    def wake(self) -> None:
+        """Index soon: this process just queued a change."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if not enabled() or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        search_index.release()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Another worker may hold the lock; retry in case it exits
+            if search_index.acquire():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Search indexing failed: {e}")
+            self._wake.wait(settings.SEARCH_INDEX_INTERVAL)
+            self._wake.clear()
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            if not os.path.exists(search_index.manifest_path):
+                self.indexed += rebuild(db, settings.SEARCH_INDEX_BATCH_SIZE)
+            while not self._stop.is_set():
+                count = index_queued(db, settings.SEARCH_INDEX_BATCH_SIZE)
+                self.indexed += count
+                if count < settings.SEARCH_INDEX_BATCH_SIZE:
+                    break
+        finally:
+            db.close()
+        while search_index.merge():
+            pass
+
+    def stats(self) -> dict:
+        return {"enabled": enabled(), "indexed": self.indexed, "errors": self.errors, **search_index.stats()}
+
+
+indexer = Indexer()
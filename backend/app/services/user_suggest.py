@@ -0,0 +1,272 @@
+"""In-memory prefix index for @mention suggestions (GET /api/users/suggest).
+
+Every active user is indexed under their username and each word of their
+full name, lowercased and with accents stripped, in one sorted array of
+(token, user_id, is_username). A lookup bisects to the first token >= the query and
+walks forward while tokens still start with it, so a keystroke costs
+microseconds whatever the number of users.
+
+``start`` loads the index on a background thread at worker startup;
+until it is ready, or when there are more than USER_SUGGEST_INDEX_MAX_USERS
+users, suggestions come from the database (app.crud.users.suggest_users).
+``user.created`` and ``user.updated`` events keep it current in every
+worker (see app.services.event_handlers).
+
+Results are ranked: an exact username first, then people the requester
+recently interacted with (most recent first), then username prefixes
+before name-word prefixes, shortest username first. Interactions are
+loaded with one query per requester and cached for
+USER_SUGGEST_INTERACTION_TTL seconds.
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import auth as auth_crud
+from app.crud import users as users_crud
+
+logger = logging.getLogger(__name__)
+
+# Matches examined per lookup before ranking; interacted users are always considered
+MAX_CANDIDATES = 200
+MAX_CACHED_INTERACTIONS = 10000
+
+
+def normalize(value: str) -> str:
+    """Lowercase and strip accents, so "José" is found by "jose"."""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+@dataclass(frozen=True)
+class IndexedUser:
+    id: int
+    username: str
+    full_name: str
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Normalized username first, then the words of the full name."""
+        words = normalize(self.full_name).split()
+        return list(dict.fromkeys([normalize(self.username), *words]))
+
+
+def _entries(user: IndexedUser) -> List[Tuple[str, int, bool]]:
+    return [(token, user.id, i == 0) for i, token in enumerate(user.tokens)]
+
+
+class UserSuggestIndex:
+    def __init__(self):
+        self._entries: List[Tuple[str, int, bool]] = []
+        self._users: Dict[int, IndexedUser] = {}
+        self._lock = threading.Lock()
+        self._pending: Optional[List[dict]] = None  # events received while loading
+        self._interactions: "OrderedDict[int, Tuple[float, Dict[int, float]]]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.index_lookups = 0
+        self.db_lookups = 0
+
+    # Maintenance
+
+    def _add(self, user: IndexedUser) -> None:
+        self._users[user.id] = user
+        for entry in _entries(user):
+            bisect.insort(self._entries, entry)
+
+    def _remove(self, user_id: int) -> None:
+        user = self._users.pop(user_id, None)
+        if user is None:
+            return
+        for token in user.tokens:
+            i = bisect.bisect_left(self._entries, (token, user_id))
+            if i < len(self._entries) and self._entries[i][:2] == (token, user_id):
+                del self._entries[i]
+
+    def _apply(self, data: dict) -> None:
+        self._remove(data["id"])
+        if data.get("is_active", True) is not False:
+            self._add(IndexedUser(data["id"], data["username"], data["full_name"]))
+
+    def apply(self, data: dict) -> None:
+        """Add, replace or (if inactive) drop a user, from a user event's data."""
+        if "username" not in data:  # Trimmed event: reload the row
+            db = SessionLocal()
+            try:
+                user = auth_crud.get_user(db, data["id"])
+            finally:
+                db.close()
+            if user is None:
+                return
+            data = users_crud.user_event(user)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(data)
+            elif self.ready:
+                self._apply(data)
+
+    def build(self, rows: Iterable[tuple]) -> bool:
+        """Replace the index with (id, username, full_name, is_active) rows.
+
+        Returns False, leaving the index unused, if there are more than
+        USER_SUGGEST_INDEX_MAX_USERS rows. Events applied while the rows
+        are read are replayed on top.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        users, entries = {}, []
+        limit = settings.USER_SUGGEST_INDEX_MAX_USERS
+        try:
+            for user_id, username, full_name, is_active in rows:
+                if len(users) >= limit:
+                    logger.info(f"More than {limit} users: @mention suggestions will use the database")
+                    users = None
+                    break
+                if is_active is False:
+                    continue
+                user = IndexedUser(user_id, username, full_name)
+                users[user_id] = user
+                entries.extend(_entries(user))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        entries.sort()
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if users is None:
+                self._users, self._entries, self.ready = {}, [], False
+                return False
+            self._users, self._entries = users, entries
+            for data in pending:
+                self._apply(data)
+            self.ready = True
+            self.loaded_at = time.time()
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Indexed {len(users)} users for @mention suggestions in {self.load_seconds:.3f}s")
+        return True
+
+    def load(self) -> bool:
+        """Build the index from the users table."""
+        db = SessionLocal()
+        try:
+            return self.build(users_crud.iter_suggestable_users(db))
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Load the index in the background; lookups use the database until it is ready."""
+        if not settings.USER_SUGGEST_INDEX_MAX_USERS or self._thread is not None:
+            return
+
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning(f"Could not load the user suggestion index, using the database: {e}")
+
+        self._thread = threading.Thread(target=run, name="user-suggest-index", daemon=True)
+        self._thread.start()
+
+    # Lookups
+
+    def interactions(self, db: Session, user_id: int) -> Dict[int, float]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._interactions.get(user_id)
+            if cached is not None and cached[0] > now:
+                self._interactions.move_to_end(user_id)
+                return cached[1]
+        found = users_crud.user_interactions(db, user_id, settings.USER_SUGGEST_INTERACTION_DAYS)
+        scores = {other_id: at.timestamp() for other_id, at in found.items()}
+        with self._lock:
+            self._interactions[user_id] = (now + settings.USER_SUGGEST_INTERACTION_TTL, scores)
+            self._interactions.move_to_end(user_id)
+            while len(self._interactions) > MAX_CACHED_INTERACTIONS:
+                self._interactions.popitem(last=False)
+        return scores
+
+    def _matches(self, prefix: str) -> Dict[int, bool]:
+        """Users with a token starting with ``prefix``, and whether their username does."""
+        matches: Dict[int, bool] = {}
+        i = bisect.bisect_left(self._entries, (prefix,))
+        entries = self._entries
+        while i < len(entries) and len(matches) < MAX_CANDIDATES:
+            token, user_id, is_username = entries[i]
+            if not token.startswith(prefix):
+                break
+            matches[user_id] = matches.get(user_id, False) or is_username
+            i += 1
+        return matches
+
+    def suggest(self, db: Session, query: str, requester_id: int, limit: int = 10) -> List[IndexedUser]:
+        """Ranked users matching ``query``, from the index when it is loaded, else the database."""
+        if not self.ready:
+            return self._suggest_from_db(db, query, requester_id, limit)
+        prefix = normalize(query.strip().lstrip("@"))
+        if not prefix:
+            return []
+        recent = self.interactions(db, requester_id)
+        with self._lock:
+            matches = self._matches(prefix)
+            # Interacted users may sit past the candidate cap on short prefixes
+            for user_id in recent:
+                user = self._users.get(user_id)
+                if user is not None and user_id not in matches:
+                    tokens = user.tokens
+                    if any(token.startswith(prefix) for token in tokens):
+                        matches[user_id] = tokens[0].startswith(prefix)
+            matches.pop(requester_id, None)
+            users = [(self._users[user_id], on_username) for user_id, on_username in matches.items()]
+            self.index_lookups += 1
+
+        def rank(item):
+            user, on_username = item
+            username = user.tokens[0]
+            return (
+                username != prefix,
+                -recent.get(user.id, float("-inf")),
+                not on_username,
+                len(username),
+                username,
+            )
+
+        return [user for user, _ in heapq.nsmallest(limit, users, key=rank)]
+
+    def _suggest_from_db(self, db: Session, query: str, requester_id: int, limit: int = 10) -> List[IndexedUser]:
+        prefix = query.strip().lstrip("@")
+        if not prefix:
+            return []
+        self.db_lookups += 1
+        rows = users_crud.suggest_users(db, prefix, limit, exclude_id=requester_id)
+        return [IndexedUser(*row) for row in rows]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "users": len(self._users),
+            "tokens": len(self._entries),
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "index_lookups": self.index_lookups,
+            "db_lookups": self.db_lookups,
+            "cached_interactions": len(self._interactions),
+        }
+
+
+user_index = UserSuggestIndex()
@@ -0,0 +1,105 @@
+"""Measure worker cold start: interpreter launch, app import and lifespan startup.
+
+Boots the app in fresh interpreters several times and reports the median
+time of each phase, then the slowest imports (from ``python -X importtime``)
+by module and by top-level package. Exits non-zero if the median boot
+exceeds --budget. Startup runs against the configured database, so point
+SQLALCHEMY_DATABASE_URI at a reachable, migrated one.
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10 --top 30 --budget 1.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+BOOT = """
+import asyncio, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(imported - started, ready - imported)
+"""
+
+
+def run(args: list) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, env=os.environ.copy()
+    )
+
+
+def boot_once() -> tuple:
+    started = time.perf_counter()
+    result = run(["-c", BOOT])
+    total = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(f"App failed to start:\n{result.stderr}")
+    import_seconds, startup_seconds = map(float, result.stdout.split()[-2:])
+    return total, import_seconds, startup_seconds
+
+
+def import_times() -> dict:
+    """Self and cumulative import time of each module, in seconds."""
+    result = run(["-X", "importtime", "-c", "import app.main"])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="slowest modules to list")
+    parser.add_argument("--budget", type=float, default=None, help="fail if the median boot takes longer (seconds)")
+    args = parser.parse_args()
+
+    boots = [boot_once() for _ in range(args.runs)]
+    total, imported, startup = (statistics.median(phase) for phase in zip(*boots))
+    print(f"boot (median of {args.runs}): {total:.3f}s")
+    print(f"  interpreter  {total - imported - startup:.3f}s")
+    print(f"  import app   {imported:.3f}s")
+    print(f"  lifespan     {startup:.3f}s")
+
+    samples = defaultdict(list)
+    for _ in range(args.runs):
+        for name, times in import_times().items():
+            samples[name].append(times)
+    modules = {
+        name: (statistics.median(t[0] for t in times), statistics.median(t[1] for t in times))
+        for name, times in samples.items()
+    }
+
+    print("\nslowest imports (self / cumulative):")
+    for name, (self_s, cumulative_s) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_s * 1000:8.1f}ms {cumulative_s * 1000:8.1f}ms  {name}")
+
+    packages = defaultdict(float)
+    for name, (self_s, _) in modules.items():
+        packages[name.split(".")[0]] += self_s
+    print("\nby package (self time):")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {seconds * 1000:8.1f}ms  {package}")
+
+    if args.budget is not None and total > args.budget:
+        sys.exit(f"Median boot {total:.3f}s is over the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
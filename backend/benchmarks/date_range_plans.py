@@ -0,0 +1,133 @@
+"""Check that report date-range queries are served by indexes (PostgreSQL).
+
+EXPLAINs the list, count and export queries built by app.crud.reports for a
+few date ranges, plus a wide all-users range scan, and exits non-zero if any
+plan contains a sequential scan. With --seed it first loads a benchmark
+dataset: point SQLALCHEMY_DATABASE_URI at a scratch database for that.
+
+    python -m benchmarks.date_range_plans --seed --users 200 --reports 500000
+    python -m benchmarks.date_range_plans
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+
+from app.core.database import SessionLocal, engine
+from app.core.partitions import ensure_partitions
+from app.crud import reports as reports_crud
+from app.models.base import Report, User
+from app.models.enums import Project
+
+def seed(conn, users: int, reports: int, days: int) -> None:
+    """Insert users and reports spread evenly (in created_at order) over ``days``."""
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    ensure_partitions(conn, 1, since=start.date())
+    conn.execute(
+        text(
+            "INSERT INTO users (email, username, full_name, hashed_password, role, is_active, is_superuser) "
+            "SELECT 'bench' || g || '@example.com', 'bench' || g, 'Bench User ' || g, '-', 'developer', true, false "
+            "FROM generate_series(1, :users) g"
+        ),
+        {"users": users}
+    )
+    conn.execute(
+        text(
+            "INSERT INTO reports (title, content, excerpt, user_id, project, created_at) "
+            "SELECT 'Report ' || g, repeat('lorem ipsum ', 40), 'lorem ipsum', u.id, "
+            "(:projects)[1 + g % cardinality(:projects)], "
+            ":start + (g * (:days * interval '1 day') / :reports) "
+            "FROM generate_series(1, :reports) g "
+            "JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM users WHERE username LIKE 'bench%') u "
+            "ON u.n = g % :users"
+        ),
+        {
+            "users": users,
+            "reports": reports,
+            "days": days,
+            "start": start,
+            "projects": [project.value for project in Project],
+        }
+    )
+    conn.execute(text("ANALYZE users"))
+    conn.execute(text("ANALYZE reports"))
+
+def explain(db, stmt) -> dict:
+    compiled = stmt.compile(dialect=engine.dialect)
+    result = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+    return result.scalar()[0]["Plan"]
+
+def seq_scans(plan: dict) -> list:
+    found = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="load the benchmark dataset first")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--reports", type=int, default=500000)
+    parser.add_argument("--days", type=int, default=730, help="span of the seeded created_at values")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs PostgreSQL.")
+
+    if args.seed:
+        with engine.begin() as conn:
+            seed(conn, args.users, args.reports, args.days)
+
+    db = SessionLocal()
+    try:
+        user = db.execute(
+            select(User).join(Report, Report.user_id == User.id).limit(1)
+        ).scalars().first()
+        if user is None:
+            sys.exit("No reports to query; run with --seed.")
+
+        now = datetime.now(timezone.utc)
+        ranges = {
+            "last week": {"created_from": now - timedelta(days=7)},
+            "last month": {"created_from": now - timedelta(days=30), "created_to": now},
+            "a year ago": {"created_from": now - timedelta(days=395), "created_to": now - timedelta(days=365)},
+        }
+        queries = {}
+        for label, filters in ranges.items():
+            queries[f"list, {label}"] = reports_crud.user_reports_query(db, user, **filters).limit(10).statement
+            queries[f"count, {label}"] = (
+                select(func.count()).select_from(Report).where(*reports_crud.list_criteria(user, **filters))
+            )
+            queries[f"project list, {label}"] = (
+                select(Report.id)
+                .where(*reports_crud.list_criteria(user, project=Project.HIMS.value, **filters))
+                .order_by(Report.created_at.desc())
+                .limit(10)
+            )
+            queries[f"all users, {label}"] = select(func.count()).where(
+                Report.created_at >= filters["created_from"],
+                Report.created_at < filters.get("created_to", now),
+            )
+        queries["updated since, last week"] = reports_crud.user_reports_query(
+            db, user, updated_since=now - timedelta(days=7)
+        ).limit(10).statement
+
+        failures = []
+        for label, stmt in queries.items():
+            plan = explain(db, stmt)
+            scans = seq_scans(plan)
+            status = "SEQ SCAN on " + ", ".join(sorted(set(scans))) if scans else "ok"
+            print(f"{label:32} cost={plan['Total Cost']:>12.1f}  {status}")
+            if scans:
+                failures.append(label)
+                print(json.dumps(plan, indent=2))
+    finally:
+        db.close()
+
+    if failures:
+        sys.exit(f"{len(failures)} queries used a sequential scan")
+
+if __name__ == "__main__":
+    main()
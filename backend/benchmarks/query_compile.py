@@ -0,0 +1,164 @@
+"""CPU spent building and compiling the hot-path queries, before and after prebuilding.
+
+For each hot query this times, in CPU microseconds per call:
+
+- build: constructing the statement the old way (ORM Query / select() per call)
+- compile: compiling that statement without SQLAlchemy's compiled cache
+- before: a full call the old way (build + cache key + cached compile + execute)
+- after: a full call through app.crud with the prebuilt statement
+
+Runs against an in-memory SQLite database by default so only client-side
+work differs between the columns; pass --url to use a real database.
+
+    python -m benchmarks.query_compile
+    python -m benchmarks.query_compile --iterations 20000 --url postgresql://...
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, desc, func, select
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.crud import auth as auth_crud
+from app.crud import comments as comments_crud
+from app.crud import reports as reports_crud
+from app.models.base import Attachment, Comment, Report, User
+
+
+def seed(db: Session) -> dict:
+    user = User(email="bench@example.com", username="bench", full_name="Bench", hashed_password="-", role="developer")
+    db.add(user)
+    db.flush()
+    reports = [Report(title=f"Report {i}", content="lorem ipsum " * 50, user_id=user.id) for i in range(50)]
+    db.add_all(reports)
+    db.flush()
+    comments = [Comment(content=f"Comment {i}", report_id=reports[0].id, user_id=user.id) for i in range(20)]
+    db.add_all(comments)
+    db.commit()
+    return {"user": user, "user_id": user.id, "report_id": reports[0].id, "comment_id": comments[0].id}
+
+
+# The statements as they were built on every call before
+def old_get_report(db, ids):
+    return db.query(Report).options(undefer_group("content")).filter(Report.id == ids["report_id"])
+
+def old_get_comment(db, ids):
+    return db.query(Comment).filter(Comment.id == ids["comment_id"])
+
+def old_get_user(db, ids):
+    return db.query(User).filter(User.id == ids["user_id"])
+
+def old_report_comments(db, ids):
+    return (
+        db.query(Comment)
+        .filter(Comment.report_id == ids["report_id"], Comment.parent_id.is_(None))
+        .offset(0)
+        .limit(50)
+    )
+
+def old_report_list(db, ids):
+    return db.query(Report).filter(Report.user_id == ids["user_id"]).order_by(desc(Report.created_at)).offset(0).limit(10)
+
+def old_report_version(db, ids):
+    reports = select(Report.id, Report.created_at, Report.updated_at).where(Report.user_id == ids["user_id"]).subquery()
+    report_stats = select(
+        func.count(reports.c.id),
+        func.max(reports.c.id),
+        func.max(func.coalesce(reports.c.updated_at, reports.c.created_at)),
+    )
+    attachment_stats = select(
+        func.count(Attachment.id),
+        func.max(Attachment.id),
+    ).where(Attachment.report_id.in_(select(reports.c.id)))
+    return report_stats, attachment_stats
+
+
+QUERIES = {
+    "get_report": (
+        lambda db, ids: old_get_report(db, ids).first(),
+        old_get_report,
+        lambda db, ids: reports_crud.get_report(db, ids["report_id"]),
+    ),
+    "get_comment": (
+        lambda db, ids: old_get_comment(db, ids).first(),
+        old_get_comment,
+        lambda db, ids: comments_crud.get_comment(db, ids["comment_id"]),
+    ),
+    "get_current_user": (
+        lambda db, ids: old_get_user(db, ids).first(),
+        old_get_user,
+        lambda db, ids: auth_crud.get_user(db, ids["user_id"]),
+    ),
+    "report_comments": (
+        lambda db, ids: old_report_comments(db, ids).all(),
+        old_report_comments,
+        lambda db, ids: comments_crud.get_report_comments(db, ids["report_id"], 0, 50),
+    ),
+    "report_list": (
+        lambda db, ids: old_report_list(db, ids).all(),
+        old_report_list,
+        lambda db, ids: reports_crud.get_user_reports(db, ids["user"], 0, 10),
+    ),
+    "report_list_version": (
+        lambda db, ids: [db.execute(stmt).one() for stmt in old_report_version(db, ids)],
+        old_report_version,
+        lambda db, ids: reports_crud.get_user_reports_version(db, ids["user"]),
+    ),
+}
+
+
+def cpu_us(fn, iterations: int) -> float:
+    for _ in range(min(200, iterations)):  # Warm the compiled cache
+        fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--url", default="sqlite://", help="database to run against (default: in-memory SQLite)")
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite"):
+        engine = create_engine(args.url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+    else:
+        engine = create_engine(args.url)
+    db = Session(bind=engine)
+    ids = seed(db) if args.url.startswith("sqlite") else {
+        "user": db.execute(select(User).join(Report, Report.user_id == User.id).limit(1)).scalars().one(),
+    }
+    if "user_id" not in ids:
+        ids.update(
+            user_id=ids["user"].id,
+            report_id=db.execute(select(Report.id).where(Report.user_id == ids["user"].id).limit(1)).scalar(),
+            comment_id=db.execute(select(func.min(Comment.id))).scalar(),
+        )
+
+    print(f"{'query':22} {'build':>8} {'compile':>8} {'before':>8} {'after':>8}  (CPU us per call)")
+    for name, (old_call, old_build, new_call) in QUERIES.items():
+        def build_statements():
+            built = old_build(db, ids)
+            if isinstance(built, tuple):
+                return list(built)
+            return [getattr(built, "statement", built)]
+
+        build = cpu_us(build_statements, args.iterations)
+        statements = build_statements()
+        compile_ = cpu_us(
+            lambda: [statement.compile(dialect=engine.dialect) for statement in statements],
+            max(1, args.iterations // 10)
+        )
+        before = cpu_us(lambda: (old_call(db, ids), db.expunge_all()), args.iterations)
+        after = cpu_us(lambda: (new_call(db, ids), db.expunge_all()), args.iterations)
+        print(f"{name:22} {build:8.1f} {compile_:8.1f} {before:8.1f} {after:8.1f}  {before / after:4.1f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Compare request throughput across production server worker configurations.
+
+For each worker count, starts ``python -m app.server`` on a local port, waits
+for it to answer, and drives it with keep-alive HTTP clients for a fixed
+time, then prints requests/second and latency percentiles per
+configuration. Runs against the configured database; with --username and
+--password it logs in and also loads the authenticated report list.
+Admission control and request-count recycling are disabled in the servers
+under test so the numbers show raw capacity.
+
+    python -m benchmarks.throughput --workers 1 2 4 8
+    python -m benchmarks.throughput --workers 2 4 --clients 64 --seconds 20 --username a@example.com --password pw
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "ADMISSION_ENABLED": "false", "SERVER_MAX_REQUESTS": "0"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited during startup:\n{process.stderr.read().decode()}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                # Give the other workers time to finish booting too
+                time.sleep(1)
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit("Server did not come up within 60s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def login(port: int, username: str, password: str) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    body = urllib.parse.urlencode({"username": username, "password": password})
+    conn.request("POST", "/api/auth/login", body, {"Content-Type": "application/x-www-form-urlencoded"})
+    response = conn.getresponse()
+    if response.status != 200:
+        sys.exit(f"Login failed: {response.status} {response.read().decode()}")
+    return json.loads(response.read())["access_token"]
+
+
+def load(port: int, paths: list, headers: dict, clients: int, seconds: float) -> dict:
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(index: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed, n = [], 0, index
+        while time.monotonic() < deadline:
+            path = paths[n % len(paths)]
+            n += 1
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0,
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", help="log in as this user to include authenticated reads")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        process = start_server(workers, args.port)
+        try:
+            paths, headers = ["/"], {}
+            if args.username:
+                headers["Authorization"] = f"Bearer {login(args.port, args.username, args.password)}"
+                paths = ["/", "/api/auth/me", "/api/reports?limit=10"]
+            result = load(args.port, paths, headers, args.clients, args.seconds)
+        finally:
+            stop_server(process)
+        print(
+            f"{workers:>7} {result['requests']:>9} {result['rps']:>9.1f} "
+            f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
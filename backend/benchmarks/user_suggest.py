@@ -0,0 +1,69 @@
+"""Latency of @mention suggestions from the in-memory prefix index.
+
+Builds the index from synthetic users (no database), then times lookups
+for 1-4 character prefixes of real usernames and names, as typed one
+keystroke at a time, and prints percentiles in microseconds along with
+the build time and index size. Interaction ranking is included with a
+pre-warmed set of recent contacts.
+
+    python -m benchmarks.user_suggest
+    python -m benchmarks.user_suggest --users 200000 --lookups 50000
+"""
+import argparse
+import random
+import string
+import time
+
+from app.services.user_suggest import UserSuggestIndex
+
+FIRST = ["Ana", "Bo", "Chen", "Dmitri", "Élodie", "Farah", "Giulia", "Hiro", "Ines", "José", "Kai", "Lena", "Mateo", "Noor", "Olu", "Priya"]
+LAST = ["Alvarez", "Brown", "Costa", "Dubois", "Eriksen", "Fischer", "García", "Haddad", "Ito", "Jones", "Kowalski", "Lee", "Müller", "Nguyen"]
+
+
+def users(count: int, rng: random.Random):
+    for user_id in range(1, count + 1):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        suffix = "".join(rng.choices(string.ascii_lowercase + string.digits, k=4))
+        yield user_id, f"{first.lower()}.{last.lower()}{suffix}", f"{first} {last}", True
+
+
+def percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = list(users(args.users, rng))
+    index = UserSuggestIndex()
+    index.build(rows)
+    print(f"built {index.stats()['users']} users / {index.stats()['tokens']} tokens in {index.load_seconds * 1000:.0f}ms")
+
+    requester = 1
+    contacts = {user_id: time.time() - rng.random() * 86400 for user_id, *_ in rng.sample(rows, 50)}
+    index._interactions[requester] = (float("inf"), contacts)
+
+    queries = []
+    while len(queries) < args.lookups:
+        _, username, full_name, _ = rng.choice(rows)
+        word = rng.choice([username, *full_name.split()])
+        queries.extend(word[:n] for n in range(1, 5))
+    queries = queries[:args.lookups]
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.suggest(None, query, requester)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    print(f"{'lookups':>8} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+    print(f"{len(timings):>8} {percentile(timings, 0.5):>8.1f} {percentile(timings, 0.99):>8.1f} {timings[-1]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
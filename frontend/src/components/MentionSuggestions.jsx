@@ -1,15 +1,14 @@
 import { useState, useEffect } from 'react';
 import { useQuery } from '@tanstack/react-query';
-import api from '../services/api';
+import { users as usersApi } from '../services/api';
 
 export function MentionSuggestions({ query, onSelect }) {
   const { data: users, isLoading } = useQuery({
-    queryKey: ['users', query],
-    queryFn: async () => {
-      const response = await api.users.search(query);
-      return response;
-    },
-    enabled: query.length > 0
+    queryKey: ['users', 'suggest', query],
+    queryFn: () => usersApi.suggest(query),
+    enabled: query.length > 0,
+    staleTime: 30000,
+    keepPreviousData: true
   });
 
   if (!query || isLoading || !users?.length) return null;
@@ -1,14 +1,56 @@
-import { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { CommentItem } from './CommentItem';
 import { CommentForm } from './CommentForm';
 import { comments as commentsApi } from '../../services/api';
 
+const COMMENT_EVENTS = ['created', 'updated', 'deleted', 'reset'];
+
+// Refetch the thread only when the server reports a change
+function useCommentStream(reportId) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const refresh = () => queryClient.invalidateQueries({ queryKey: ['comments', reportId] });
+
+    if (typeof EventSource !== 'undefined') {
+      const source = new EventSource(commentsApi.streamUrl(reportId));
+      COMMENT_EVENTS.forEach(type => source.addEventListener(type, refresh));
+      return () => source.close();
+    }
+
+    let socket;
+    let lastEventId;
+    let retry;
+    let closed = false;
+    const connect = () => {
+      socket = new WebSocket(commentsApi.socketUrl(reportId, lastEventId));
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.id) lastEventId = event.id;
+        if (COMMENT_EVENTS.includes(event.type)) refresh();
+      };
+      socket.onclose = () => {
+        if (!closed) retry = setTimeout(connect, 3000);
+      };
+    };
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socket.close();
+    };
+  }, [reportId, queryClient]);
+}
+
 export default function CommentList({ reportId }) {
   const [replyTo, setReplyTo] = useState(null);
+  useCommentStream(reportId);
   
   const { data: comments, isLoading, error } = useQuery({
     queryKey: ['comments', reportId],
+    // Kept fresh by the live stream instead of refetching on focus/mount
+    staleTime: Infinity,
     queryFn: async () => {
       try {
         const response = await commentsApi.getReportComments(reportId);
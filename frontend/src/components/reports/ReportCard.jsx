@@ -1,5 +1,5 @@
 import { Link } from 'react-router-dom';
-import { CalendarIcon, DocumentIcon } from '@heroicons/react/24/outline';
+import { CalendarIcon, ChatBubbleLeftIcon, DocumentIcon, PaperClipIcon } from '@heroicons/react/24/outline';
 import MDEditor from '@uiw/react-md-editor';
 
 export default function ReportCard({ report }) {
@@ -21,13 +21,20 @@ export default function ReportCard({ report }) {
               {report.title}
             </Link>
           </h3>
-          <span className="inline-flex items-center rounded-full bg-primary-50 px-2 py-1 text-xs font-medium text-primary-700">
-            {report.attachments?.length || 0} attachments
-          </span>
+          <div className="flex items-center gap-2">
+            <span className="inline-flex items-center rounded-full bg-primary-50 px-2 py-1 text-xs font-medium text-primary-700">
+              <ChatBubbleLeftIcon className="mr-1 h-3.5 w-3.5" />
+              {report.comment_count ?? 0}
+            </span>
+            <span className="inline-flex items-center rounded-full bg-primary-50 px-2 py-1 text-xs font-medium text-primary-700">
+              <PaperClipIcon className="mr-1 h-3.5 w-3.5" />
+              {report.attachment_count ?? report.attachments?.length ?? 0}
+            </span>
+          </div>
         </div>
         <div className="mt-2">
           <MDEditor.Markdown 
-            source={report.content} 
+            source={report.excerpt ?? report.content}
             style={{ whiteSpace: 'pre-line' }}
             className="!bg-transparent text-sm text-gray-600 line-clamp-3"
           />
@@ -1,9 +1,25 @@
+import { useState } from 'react';
+import { Link } from 'react-router-dom';
+import { useQuery } from '@tanstack/react-query';
 import { MagnifyingGlassIcon } from '@heroicons/react/24/outline';
+import { reports } from '../../services/api';
 
 export default function SearchInput({ value, onChange, onSearch }) {
+  const [focused, setFocused] = useState(false);
+  const query = value.trim();
+
+  // Typeahead: matching titles, typos included, while the user types
+  const { data: suggestions } = useQuery({
+    queryKey: ['reports', 'suggest', query],
+    queryFn: () => reports.suggest(query),
+    enabled: focused && query.length > 0,
+    staleTime: 30000,
+    keepPreviousData: true,
+  });
+
   const handleSubmit = (e) => {
     e.preventDefault();
-    onSearch(value);
+    onSearch?.(value);
   };
 
   return (
@@ -18,9 +34,28 @@ export default function SearchInput({ value, onChange, onSearch }) {
         type="text"
         value={value}
         onChange={(e) => onChange(e.target.value)}
+        onFocus={() => setFocused(true)}
+        onBlur={() => setTimeout(() => setFocused(false), 150)}
         className="block w-full rounded-md border-0 py-1.5 pl-10 pr-3 text-gray-900 ring-1 ring-inset ring-gray-300 placeholder:text-gray-400 focus:ring-2 focus:ring-inset focus:ring-primary-600 sm:text-sm sm:leading-6"
         placeholder="Search reports..."
       />
+      {focused && query && suggestions?.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-full overflow-hidden rounded-md bg-white shadow-lg ring-1 ring-black ring-opacity-5">
+          {suggestions.map((report) => (
+            <li key={report.id}>
+              <Link
+                to={`/reports/${report.id}`}
+                className="block px-4 py-2 text-sm text-gray-900 hover:bg-gray-50"
+              >
+                {report.title}
+                {report.project && (
+                  <span className="ml-2 text-xs text-gray-500">{report.project}</span>
+                )}
+              </Link>
+            </li>
+          ))}
+        </ul>
+      )}
     </form>
   );
 }
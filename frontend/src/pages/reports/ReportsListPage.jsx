@@ -14,6 +14,7 @@ export default function ReportsListPage() {
   const [page, setPage] = useState(1);
   const [searchTerm, setSearchTerm] = useState('');
   const [debouncedSearch, setDebouncedSearch] = useState('');
+  const [sort, setSort] = useState('created');
 
   // Force refresh when navigating back to this page
   useEffect(() => {
@@ -32,10 +33,10 @@ export default function ReportsListPage() {
   };
 
   const { data, isLoading, error } = useQuery({
-    queryKey: ['reports', page, debouncedSearch],
+    queryKey: ['reports', page, debouncedSearch, sort],
     queryFn: () => {
-      console.log('Fetching reports:', { page, limit: ITEMS_PER_PAGE, search: debouncedSearch });
-      return reports.list(page, ITEMS_PER_PAGE, debouncedSearch);  
+      console.log('Fetching reports:', { page, limit: ITEMS_PER_PAGE, search: debouncedSearch, sort });
+      return reports.list(page, ITEMS_PER_PAGE, debouncedSearch, sort);
     },
     keepPreviousData: false, // Don't keep previous data
     staleTime: 0, // Consider data always stale
@@ -81,8 +82,21 @@ export default function ReportsListPage() {
           </div>
         </div>
 
-        <div className="mt-8">
-          <SearchInput value={searchTerm} onChange={handleSearch} />
+        <div className="mt-8 flex items-center gap-4">
+          <div className="flex-1">
+            <SearchInput value={searchTerm} onChange={handleSearch} />
+          </div>
+          <select
+            value={sort}
+            onChange={(e) => {
+              setSort(e.target.value);
+              setPage(1);
+            }}
+            className="rounded-md border-gray-300 text-sm text-gray-700 shadow-sm focus:border-primary-500 focus:ring-primary-500"
+          >
+            <option value="created">Newest</option>
+            <option value="activity">Recent activity</option>
+          </select>
         </div>
 
         {isLoading ? (
@@ -46,9 +46,10 @@ export const auth = {
 
 // Reports API
 export const reports = {
-  list: async (page = 1, limit = 10, search = '') => {
+  // sort: 'created' (newest first) or 'activity' (most recently active first)
+  list: async (page = 1, limit = 10, search = '', sort = 'created') => {
     const { data } = await api.get('/reports', {
-      params: { skip: (page - 1) * limit, limit, search },
+      params: { skip: (page - 1) * limit, limit, search, sort, include_content: false },
     });
     return data;
   },
@@ -58,6 +59,18 @@ export const reports = {
     return data;
   },
 
+  // Title typeahead, typo tolerant: [{ id, title, project, created_at, score }]
+  suggest: async (query, limit = 8) => {
+    const { data } = await api.get('/reports/suggest', { params: { q: query, limit } });
+    return data;
+  },
+
+  // Several reports in one request: { items: { [id]: report }, errors: { [id]: { status, detail } } }
+  getMany: async (ids, fields) => {
+    const { data } = await api.post('/reports/batch', { ids, fields });
+    return data;
+  },
+
   create: async ({ title, content, files }) => {
     const formData = new FormData();
     formData.append('title', title);
@@ -99,7 +112,11 @@ export const reports = {
     return data;
   },
 
-  uploadAttachment: async (reportId, file) => {
+  uploadAttachment: async (reportId, file, options) => {
+    // Large files go in resumable chunks, so a dropped connection only costs one chunk
+    if (file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+      return uploads.upload(reportId, file, options);
+    }
     const formData = new FormData();
     formData.append('file', file);
     const { data } = await api.post(`/reports/${reportId}/attachments`, formData, {
@@ -114,6 +131,87 @@ export const reports = {
   },
 };
 
+const RESUMABLE_UPLOAD_THRESHOLD = 16 * 1024 * 1024;
+
+const sha256Hex = async (buffer) => {
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Retry a request the server shed under load (429/503), waiting as long as its Retry-After says
+const withRetry = async (request, attempts = 8) => {
+  for (let attempt = 1; ; attempt += 1) {
+    try {
+      return await request();
+    } catch (error) {
+      const status = error.response?.status;
+      if ((status !== 429 && status !== 503) || attempt >= attempts) throw error;
+      const retryAfter = Number(error.response.headers?.['retry-after']);
+      await sleep((Number.isFinite(retryAfter) && retryAfter > 0 ? retryAfter : attempt) * 1000);
+    }
+  }
+};
+
+// Resumable attachment uploads
+export const uploads = {
+  create: async (reportId, file) => {
+    const { data } = await api.post('/uploads', {
+      report_id: reportId,
+      filename: file.name,
+      content_type: file.type || 'application/octet-stream',
+      size: file.size,
+    });
+    return data;
+  },
+
+  get: async (uploadId) => {
+    const { data } = await api.get(`/uploads/${uploadId}`);
+    return data;
+  },
+
+  putChunk: async (upload, file, index) => {
+    const start = index * upload.chunk_size;
+    const body = await file.slice(start, start + upload.chunk_size).arrayBuffer();
+    const { data } = await api.put(`/uploads/${upload.id}/chunks/${index}`, body, {
+      headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-SHA256': await sha256Hex(body) },
+    });
+    return data;
+  },
+
+  complete: async (uploadId) => {
+    const { data } = await api.post(`/uploads/${uploadId}/complete`);
+    return data;
+  },
+
+  cancel: async (uploadId) => {
+    const { data } = await api.delete(`/uploads/${uploadId}`);
+    return data;
+  },
+
+  // Sends the chunks not yet received (all of them for a new upload),
+  // `parallel` at a time; pass `uploadId` to resume an earlier attempt.
+  upload: async (reportId, file, { uploadId, parallel = 3, onProgress } = {}) => {
+    const upload = uploadId ? await uploads.get(uploadId) : await uploads.create(reportId, file);
+    const received = new Set(upload.received);
+    const pending = [];
+    for (let i = 0; i < upload.chunk_count; i += 1) {
+      if (!received.has(i)) pending.push(i);
+    }
+    const worker = async () => {
+      while (pending.length) {
+        const index = pending.shift();
+        await withRetry(() => uploads.putChunk(upload, file, index));
+        received.add(index);
+        onProgress?.({ uploadId: upload.id, loaded: received.size, total: upload.chunk_count });
+      }
+    };
+    await Promise.all(Array.from({ length: Math.min(parallel, pending.length) }, worker));
+    return withRetry(() => uploads.complete(upload.id));
+  },
+};
+
 // Comments API
 export const comments = {
   getReportComments: async (reportId, params = {}) => {
@@ -134,12 +232,27 @@ export const comments = {
   delete: async (commentId) => {
     const { data } = await api.delete(`/comments/${commentId}`);
     return data;
+  },
+
+  // Live updates: SSE stream, or WebSocket where EventSource is unavailable
+  streamUrl: (reportId) => {
+    const token = encodeURIComponent(localStorage.getItem('token') || '');
+    return `${API_URL}/comments/report/${reportId}/stream?token=${token}`;
+  },
+
+  socketUrl: (reportId, lastEventId) => {
+    const token = encodeURIComponent(localStorage.getItem('token') || '');
+    const url = new URL(`${API_URL}/comments/report/${reportId}/ws`, window.location.href);
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+    url.search = `token=${token}` + (lastEventId ? `&last_event_id=${lastEventId}` : '');
+    return url.toString();
   }
 };
 
 export const users = {
-  search: async (query) => {
-    const { data } = await api.get('/users/search', { params: { q: query } });
+  // @mention typeahead: [{ id, username, full_name }], best matches first
+  suggest: async (query, limit = 10) => {
+    const { data } = await api.get('/users/suggest', { params: { q: query, limit } });
     return data;
   }
 };